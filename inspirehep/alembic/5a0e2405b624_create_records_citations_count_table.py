@@ -0,0 +1,42 @@
+#
+# This file is part of Invenio.
+# Copyright (C) 2016-2018 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create records_citations_count table"""
+
+from __future__ import absolute_import, division, print_function
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy_utils.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '5a0e2405b624'
+down_revision = '2dd443feeb63'
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_table(
+        'records_citations_count',
+        sa.Column(
+            'record_id',
+            UUIDType,
+            sa.ForeignKey('records_metadata.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('citation_count', sa.Integer, default=0, nullable=False),
+        sa.Column('updated', sa.DateTime, nullable=False),
+        sa.PrimaryKeyConstraint('record_id'),
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_table('records_citations_count')
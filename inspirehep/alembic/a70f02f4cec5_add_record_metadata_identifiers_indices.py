@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Add record metadata identifiers indices."""
+
+from __future__ import absolute_import, division, print_function
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a70f02f4cec5'
+down_revision = '5a0e2405b624'
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    op.execute(
+        "CREATE INDEX ix_records_metadata_json_arxiv_eprints ON records_metadata USING gin ((json -> 'arxiv_eprints'))"
+    )
+    op.execute(
+        "CREATE INDEX ix_records_metadata_json_dois ON records_metadata USING gin ((json -> 'dois'))"
+    )
+    op.execute(
+        "CREATE INDEX ix_records_metadata_json_isbns ON records_metadata USING gin ((json -> 'isbns'))"
+    )
+    op.execute(
+        "CREATE INDEX ix_records_metadata_json_report_numbers ON records_metadata USING gin ((json -> 'report_numbers'))"
+    )
+    op.execute(
+        "CREATE INDEX ix_records_metadata_updated ON records_metadata (updated)"
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.execute("DROP INDEX IF EXISTS ix_records_metadata_json_arxiv_eprints")
+    op.execute("DROP INDEX IF EXISTS ix_records_metadata_json_dois")
+    op.execute("DROP INDEX IF EXISTS ix_records_metadata_json_isbns")
+    op.execute("DROP INDEX IF EXISTS ix_records_metadata_json_report_numbers")
+    op.execute("DROP INDEX IF EXISTS ix_records_metadata_updated")
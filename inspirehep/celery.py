@@ -29,7 +29,7 @@ import os
 import signal
 
 from celery import bootsteps
-from celery.signals import worker_ready, worker_shutdown
+from celery.signals import worker_process_init, worker_ready, worker_shutdown
 from flask_celeryext import AppContextTask, create_celery_app
 from psycopg2 import OperationalError as Psycopg2OperationalError
 from sqlalchemy.exc import InvalidRequestError, OperationalError
@@ -89,6 +89,12 @@ def worker_ready(**_):
         open(READINESS_FILE, 'w').close()
 
 
+@worker_process_init.connect
+def warm_up_parsed_query_cache(**_):
+    flask_app = celery.flask_app
+    flask_app.extensions['inspire-search'].warm_up_parsed_query_cache(flask_app)
+
+
 @worker_shutdown.connect
 def worker_shutdown(**_):
     try:
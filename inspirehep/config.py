@@ -28,6 +28,7 @@ from logging.config import dictConfig
 import os
 import sys
 import pkg_resources
+from datetime import timedelta
 
 from celery.schedules import crontab
 
@@ -52,6 +53,9 @@ FEATURE_FLAG_ENABLE_ORCID_PUSH = False
 #   none -> "^$"
 #   some ORCIDs -> "^(0000-0002-7638-5686|0000-0002-7638-5687)$"
 FEATURE_FLAG_ORCID_PUSH_WHITELIST_REGEX = '.*'
+# Coalesce the ORCID pushes of each ORCID in a queue flushed every
+# ``ORCID_PUSH_QUEUE_WINDOW`` seconds, instead of one task per record.
+FEATURE_FLAG_ENABLE_ORCID_PUSH_QUEUE = False
 FEATURE_FLAG_ENABLE_MERGER = True
 FEATURE_FLAG_ENABLE_UPDATE_TO_LEGACY = False
 FEATURE_FLAG_ENABLE_SEND_TO_LEGACY = True
@@ -59,6 +63,15 @@ FEATURE_FLAG_ENABLE_SEND_TO_LEGACY = True
 FEATURE_FLAG_USE_ROOT_TABLE_ON_HEP = False
 FEATURE_FLAG_ENABLE_SNOW = False
 FEATURE_FLAG_ENABLE_SAVE_WORFLOW_ON_DOWNLOAD_DOCUMENTS = True
+# Collect the records whose citations changed and reindex them together
+# with ``inspirehep.modules.records.tasks.reindex_pending_citations``.
+FEATURE_FLAG_ENABLE_CITATIONS_REINDEX_COALESCING = False
+# Cache the results of the REST searches and facets in Redis, until the
+# searched index is written to or ``SEARCH_RESULTS_CACHE_TIMEOUT`` expires.
+FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE = False
+# Make ``checkpoint_workflow`` commit the workflows only when they changed,
+# and reindex them in the holdingpen only at the closing ``save_workflow``.
+FEATURE_FLAG_ENABLE_WORKFLOW_CHECKPOINTS = False
 # Default language and timezone
 # =============================
 BABEL_DEFAULT_LANGUAGE = 'en'
@@ -91,11 +104,19 @@ CELERY_ACCEPT_CONTENT = ['json', 'msgpack', 'yaml']
 # Default UTC timezone for celery because of https://github.com/inveniosoftware/invenio-celery/issues/53
 # CELERY_TIMEZONE = 'Europe/Amsterdam'
 CELERY_WORKER_DISABLE_RATE_LIMITS = True
+RECORDS_CITATIONS_REINDEX_WINDOW = 60
+"""Seconds during which the reindexes of records with modified citations
+are coalesced, when ``FEATURE_FLAG_ENABLE_CITATIONS_REINDEX_COALESCING`` is
+enabled."""
 CELERY_BEAT_SCHEDULE = {
     'journal_kb_builder': {
         'task': 'inspirehep.modules.refextract.tasks.create_journal_kb_file',
         'schedule': crontab(minute='0', hour='*/1'),
-    }
+    },
+    'citations_reindex': {
+        'task': 'inspirehep.modules.records.tasks.reindex_pending_citations',
+        'schedule': timedelta(seconds=RECORDS_CITATIONS_REINDEX_WINDOW),
+    },
 }
 
 # GROBID
@@ -111,6 +132,14 @@ ACCOUNTS_SESSION_REDIS_URL = "redis://localhost:6379/2"
 ACCESS_CACHE = "invenio_cache:current_cache"
 RT_USERS_CACHE_TIMEOUT = 86400
 RT_QUEUES_CACHE_TIMEOUT = 86400
+AJAX_CITATIONS_CACHE_TIMEOUT = 24 * 60 * 60
+"""Seconds during which the citations table of a record is cached, as long as
+its citation count doesn't change."""
+INSTITUTIONS_AJAX_CACHE_TIMEOUT = 5 * 60
+"""Seconds during which the people, experiments and papers tables of an
+institution are cached."""
+INSTITUTIONS_PEOPLE_MAX_AUTHORS = 1000
+"""Maximum number of authors listed in the people table of an institution."""
 
 # Files
 # =====
@@ -213,6 +242,25 @@ SEARCH_TYPEAHEAD_HINT_URL = '/search/suggest?field=%TYPE&query=%QUERY'
 SEARCH_TYPEAHEAD_DEFAULT_SET = 'invenio'
 
 SEARCH_ELASTIC_HOSTS = ['localhost']
+SEARCH_QUERY_CACHE_MAX_ENTRIES = 10000
+"""Maximum number of queries kept parsed in each process."""
+SEARCH_QUERY_CACHE_MAX_BYTES = 50 * 1024 * 1024
+"""Maximum size of the parsed queries kept in each process."""
+SEARCH_QUERY_CACHE_WARM_UP_FILE = None
+"""Log of the most frequent queries, parsed when the web and Celery workers
+start.
+
+Each line contains a query, optionally preceded by the name of its search
+class, e.g. ``AuthorsSearch``, and a tab. The queries without a search class
+are parsed for ``LiteratureSearch``.
+"""
+SEARCH_RESULTS_CACHE_TIMEOUT = 5 * 60
+"""Seconds during which the results of a search are cached, see
+``FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE``."""
+SEARCH_RESULTS_CACHE_REFRESH_DELAY = 5
+"""Seconds after a write when the cached search results of the index are
+invalidated again. It must be longer than the ``refresh_interval`` of the
+indexes, so that the written documents are visible by then."""
 SEARCH_UI_BASE_TEMPLATE = BASE_TEMPLATE
 SEARCH_UI_SEARCH_TEMPLATE = 'search/search.html'
 SEARCH_UI_SEARCH_API = '/api/literature/'
@@ -1121,6 +1169,17 @@ Note:
   ``InspireRecord.update`` takes precedence on this config variable.
 
 """
+RECORDS_EXPORT_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+"""Time in seconds after which a cached BibTeX or LaTeX export of a record
+revision expires."""
+RECORDS_EXPORT_CACHE_FILL_ON_INDEX = False
+"""Cache the BibTeX and LaTeX exports of the literature records when they
+are reindexed by ``batch_reindex``."""
+RECORDS_EXPORT_CHUNK_SIZE = 100
+"""Number of records serialized at once by the streaming export endpoint."""
+RECORDS_EXPORT_SCROLL_KEEPALIVE = '5m'
+"""Time for which the streaming export keeps its Elasticsearch scroll alive
+between two chunks."""
 RECORDS_MIGRATION_SKIP_FILES = False
 """Disable the downloading of files at record migration time.
 
@@ -1129,6 +1188,14 @@ Note:
   This variable takes precedence over ``RECORDS_SKIP_FILES``, but can be
   overriden by the tasks in the ``inspirehep.modules.migrator.tasks`` module.
 """
+RECORDS_MIGRATION_CONTINUOUS_BATCH_SIZE = 100
+"""Maximum number of records pushed by Legacy that ``continuous_migration``
+migrates in a single transaction.
+"""
+RECORDS_MIGRATION_CONTINUOUS_THREADS = 4
+"""Number of threads decompressing and converting the records pushed by
+Legacy in ``continuous_migration``.
+"""
 
 JSONSCHEMAS_HOST = "localhost:5000"
 JSONSCHEMAS_REPLACE_REFS = True
@@ -1170,6 +1237,10 @@ ORCID_APP_CREDENTIALS = {
     'consumer_secret': 'CHANGE_ME',
 }
 
+ORCID_PUSH_QUEUE_WINDOW = 30
+"""Seconds the ORCID push queue of an author waits for more records before
+being pushed in a single batch."""
+
 # Error Pages
 # ========
 THEME_401_TEMPLATE = "inspirehep_theme/errors/401.html"
@@ -1667,6 +1738,24 @@ BATCHUPLOADER_WEB_ROBOT_TOKEN = 'change me'
 # ==========
 FEATURE_FLAG_ENABLE_REFEXTRACT_SERVICE = False
 REFEXTRACT_SERVICE_URL = 'http://example_refextract_url.cern.ch'
+FEATURE_FLAG_ENABLE_REFEXTRACT_SERVICE_JOURNAL_KB_VERSION = False
+"""Send only the version of the journal KB to the refextract service.
+
+The full KB is sent only when the service replies that it does not know
+this version yet.
+"""
+REFEXTRACT_JOURNAL_KB_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+"""Time in seconds after which a version of the journal KB expires from Redis."""
+FEATURE_FLAG_ENABLE_REFERENCES_LOCAL_RESOLUTION = False
+"""Resolve the references by their unique identifiers in the database before
+sending the remaining ones to the reference matcher.
+
+The references extracted from the PDF and from the text are then deduplicated
+and matched together, in requests of ``REFEXTRACT_MATCHER_CHUNK_SIZE``
+references.
+"""
+REFEXTRACT_MATCHER_CHUNK_SIZE = 200
+"""Maximum number of references sent in a single request to the reference matcher."""
 
 # logging
 # ==========
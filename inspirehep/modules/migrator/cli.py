@@ -81,11 +81,17 @@ def migrate():
               help='Wait for migration to complete. This only has an effect if the -w flag is not set.')
 @click.option('-f', '--force', is_flag=True, default=False,
               help='Force the task to run even in debug mode.')
+@click.option('--bulk', is_flag=True, default=False,
+              help='Migrate the records in bulk from this process instead of using the migrator queue.')
+@click.option('--processes', '-p', type=int, default=None,
+              help='Number of processes converting the records in bulk mode, the number of CPUs by default.')
 @with_appcontext
 def migrate_file(file_name,
                  mirror_only=False,
                  wait=False,
-                 force=False):
+                 force=False,
+                 bulk=False,
+                 processes=None):
     """Migrate the records in the provided file.
 
     The file can be an (optionally-gzipped) XML file containing MARCXML, or a
@@ -94,9 +100,9 @@ def migrate_file(file_name,
     halt_if_debug_mode(force=force)
     click.echo("Migrating records from file: {0}".format(file_name))
 
-    populate_mirror_from_file(file_name)
+    populate_mirror_from_file(file_name, bulk=bulk)
     if not mirror_only:
-        migrate_from_mirror(wait_for_results=wait)
+        migrate_from_mirror(wait_for_results=wait, bulk=bulk, processes=processes)
 
 
 @migrate.command()
@@ -108,16 +114,27 @@ def migrate_file(file_name,
               help='Wait for migration to complete. This only has an effect if the -w flag is not set.')
 @click.option('-f', '--force', is_flag=True, default=False,
               help='Force the task to run even in debug mode.')
+@click.option('--bulk', is_flag=True, default=False,
+              help='Migrate the records in bulk from this process instead of using the migrator queue.')
+@click.option('--processes', '-p', type=int, default=None,
+              help='Number of processes converting the records in bulk mode, the number of CPUs by default.')
 @with_appcontext
 def mirror(also_migrate=None,
            wait=False,
-           force=False):
+           force=False,
+           bulk=False,
+           processes=None):
     """Migrate records from the mirror.
 
     By default, only records that have not been migrated yet are migrated.
     """
     halt_if_debug_mode(force=force)
-    migrate_from_mirror(also_migrate=also_migrate, wait_for_results=wait)
+    migrate_from_mirror(
+        also_migrate=also_migrate,
+        wait_for_results=wait,
+        bulk=bulk,
+        processes=processes,
+    )
 
 
 @migrate.command()
@@ -35,6 +35,15 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from .utils import get_collection_from_marcxml
 
 
+def decompress_marcxml(value):
+    """Decompress the MARCXML stored in the ``marcxml`` column."""
+    try:
+        return decompress(value)
+    except error:
+        # Legacy uncompress data?
+        return value
+
+
 class LegacyRecordsMirror(db.Model):
     __tablename__ = 'legacy_records_mirror'
 
@@ -54,11 +63,7 @@ class LegacyRecordsMirror(db.Model):
     @hybrid_property
     def marcxml(self):
         """marcxml column wrapper to compress/decompress on the fly."""
-        try:
-            return decompress(self._marcxml)
-        except error:
-            # Legacy uncompress data?
-            return self._marcxml
+        return decompress_marcxml(self._marcxml)
 
     @marcxml.setter
     def marcxml(self, value):
@@ -29,6 +29,11 @@ import re
 import tarfile
 import zlib
 from contextlib import closing
+from datetime import datetime
+from functools import partial
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from time import time
 
 import click
 import requests
@@ -41,6 +46,7 @@ from functools import wraps
 from jsonschema import ValidationError
 from redis import StrictRedis
 from redis_lock import Lock
+from sqlalchemy.dialects.postgresql import insert
 
 from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier
@@ -48,20 +54,27 @@ from invenio_search import current_search_client as es
 
 from inspire_dojson import marcxml2record
 from inspire_utils.logging import getStackTraceLogger
-from inspirehep.modules.records.api import InspireRecord
+from inspirehep.modules.records.api import InspireRecord, prefetch_enhancement_data
 from inspirehep.modules.pidstore.utils import (
+    get_pid_type_from_schema,
     get_pid_types_from_endpoints,
 )
 from inspirehep.modules.records.receivers import index_after_commit
+from inspirehep.modules.records.tasks import index_modified_citations_from_record
+from inspirehep.modules.search.cache import bump_search_generations
 from inspirehep.utils.schema import ensure_valid_schema
-from inspirehep.utils.record import create_index_op
+from inspirehep.utils.record import create_delete_op, create_index_op
 
-from .models import LegacyRecordsMirror
+from .models import LegacyRecordsMirror, decompress_marcxml
 
 LOGGER = getStackTraceLogger(__name__)
 
 CHUNK_SIZE = 100
 LARGE_CHUNK_SIZE = 2000
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+RECORD_OPENING_TAG = b'<record'
+RECORD_CLOSING_TAG = b'</record>'
 
 split_marc = re.compile('<record.*?>.*?</record>', re.DOTALL)
 
@@ -105,40 +118,73 @@ def split_blob(blob):
 
 
 def split_stream(stream):
-    """Split the stream using <record.*?>.*?</record> as pattern.
+    """Split a stream of bytes in the MARCXML records it contains.
 
-    This operates line by line in order not to load the entire file in memory.
+    The stream can be cut anywhere, e.g. in lines or in blocks of fixed size.
+    The bytes are buffered until a chunk contains a closing tag, then all the
+    complete records of the buffer are yielded, so that every byte is scanned
+    only once and the records are never decoded.
     """
-    len_closing_tag = len('</record>')
     buf = []
-    for row in stream:
-        row = row.decode('utf8')
-        index = row.rfind('</record>')
-        if index >= 0:
-            buf.append(row[:index + len_closing_tag])
-            for blob in split_blob(''.join(buf)):
-                yield blob.encode('utf8')
-            buf = [row[index + len_closing_tag:]]
+    tail = b''
+    len_tail = len(RECORD_CLOSING_TAG) - 1
+    for chunk in stream:
+        buf.append(chunk)
+        if RECORD_CLOSING_TAG not in tail + chunk[:len_tail] and RECORD_CLOSING_TAG not in chunk:
+            tail = (tail + chunk)[-len_tail:]
+            continue
+
+        data = b''.join(buf)
+        start = data.find(RECORD_OPENING_TAG)
+        while start >= 0:
+            end = data.find(RECORD_CLOSING_TAG, start)
+            if end < 0:
+                break
+            end += len(RECORD_CLOSING_TAG)
+            yield data[start:end]
+            start = data.find(RECORD_OPENING_TAG, end)
+
+        if start >= 0:
+            data = data[start:]
         else:
-            buf.append(row)
+            # keep what could be the beginning of an opening tag
+            data = data[-(len(RECORD_OPENING_TAG) - 1):]
+        buf = [data]
+        tail = data[-len_tail:]
+
+
+def _iter_file(fd, block_size):
+    if block_size:
+        return iter(partial(fd.read, block_size), b'')
+    return fd
+
+
+def read_file(source, block_size=None):
+    """Read a MARCXML file, a gzipped one or a prodsync tarball.
 
+    Args:
+        source(str): path of the file.
+        block_size(Optional[int]): if given, the uncompressed content is
+            yielded in blocks of this size instead of line by line.
 
-def read_file(source):
+    Yields:
+        str: the lines or the blocks of the file.
+    """
     if source.endswith('.gz'):
         with gzip.open(source, 'rb') as fd:
-            for line in fd:
-                yield line
+            for data in _iter_file(fd, block_size):
+                yield data
     elif source.endswith('.tar'):  # assuming prodsync tarball
         with closing(tarfile.open(source)) as tar:
             for file_ in tar:
                 print('Processing {}'.format(file_.name))
                 unzipped = gzip.GzipFile(fileobj=tar.extractfile(file_), mode='rb')
-                for line in unzipped:
-                    yield line
+                for data in _iter_file(unzipped, block_size):
+                    yield data
     else:
         with open(source, 'rb') as fd:
-            for line in fd:
-                yield line
+            for data in _iter_file(fd, block_size):
+                yield data
 
 
 def migrate_record_from_legacy(recid):
@@ -148,10 +194,13 @@ def migrate_record_from_legacy(recid):
     db.session.commit()
 
 
-def migrate_from_mirror(also_migrate=None, wait_for_results=False, skip_files=None):
+def migrate_from_mirror(also_migrate=None, wait_for_results=False, skip_files=None,
+                        bulk=False, processes=None):
     """Migrate legacy records from the local mirror.
 
     By default, only the records that have not been migrated yet are migrated.
+    In bulk mode, the records are migrated by the current process instead of
+    being sent to the ``migrator`` queue, see :func:`migrate_mirror_in_bulk`.
 
     Args:
         also_migrate(Optional[string]): if set to ``'broken'``, also broken
@@ -164,6 +213,10 @@ def migrate_from_mirror(also_migrate=None, wait_for_results=False, skip_files=No
         wait_for_results(bool): flag indicating whether the task should wait
             for the migration to finish (if True) or fire and forget the migration
             tasks (if False).
+        bulk(bool): flag indicating whether the records should be migrated
+            in bulk by the current process.
+        processes(Optional[int]): number of processes converting the records
+            in bulk mode. If None, the number of CPUs is used.
     """
     if skip_files is None:
         skip_files = current_app.config.get(
@@ -179,6 +232,11 @@ def migrate_from_mirror(also_migrate=None, wait_for_results=False, skip_files=No
     elif also_migrate != 'all':
         raise ValueError('"also_migrate" should be either None, "all" or "broken"')
 
+    if bulk:
+        recids = [res.recid for res in query.yield_per(LARGE_CHUNK_SIZE)]
+        migrate_mirror_in_bulk(recids, skip_files=skip_files, processes=processes)
+        return
+
     if wait_for_results:
         # if the wait_for_results is true we enable returning results from the
         # migrate_recids_from_mirror task so that we could use them to
@@ -203,15 +261,123 @@ def migrate_from_mirror(also_migrate=None, wait_for_results=False, skip_files=No
         print('All migration tasks have been completed.')
 
 
-def migrate_from_file(source, wait_for_results=False):
-    populate_mirror_from_file(source)
-    migrate_from_mirror(wait_for_results=wait_for_results)
+def migrate_from_file(source, wait_for_results=False, bulk=False):
+    populate_mirror_from_file(source, bulk=bulk)
+    migrate_from_mirror(wait_for_results=wait_for_results, bulk=bulk)
 
 
-def populate_mirror_from_file(source):
-    for i, chunk in enumerate(chunker(split_stream(read_file(source)), CHUNK_SIZE)):
+def populate_mirror_from_file(source, bulk=False):
+    chunk_size = LARGE_CHUNK_SIZE if bulk else CHUNK_SIZE
+    start = time()
+    inserted = 0
+    records = split_stream(read_file(source, block_size=READ_BLOCK_SIZE))
+    for chunk in chunker(records, chunk_size):
         insert_into_mirror(chunk)
-        print("Inserted {} records into mirror".format(i * CHUNK_SIZE + len(chunk)))
+        inserted += len(chunk)
+        print("Inserted {} records into mirror ({:.1f} records/sec)".format(
+            inserted, inserted / (time() - start)))
+
+
+def _marcxml2record_or_exception(marcxml):
+    """Convert the MARCXML of a record, returning the exception on failure.
+
+    Used by the worker processes of :func:`migrate_mirror_in_bulk`, which
+    cannot log the error in the mirror themselves.
+    """
+    try:
+        return marcxml2record(marcxml)
+    except Exception as exc:
+        return exc
+
+
+def _read_marcxml_of_mirror_records(recids):
+    query = db.session.query(
+        LegacyRecordsMirror.recid,
+        LegacyRecordsMirror._marcxml,
+    ).filter(LegacyRecordsMirror.recid.in_(recids))
+    marcxml_by_recid = {
+        recid: decompress_marcxml(marcxml) for recid, marcxml in query
+    }
+    return [(recid, marcxml_by_recid[recid]) for recid in recids if recid in marcxml_by_recid]
+
+
+def _insert_converted_records(recids, converted_records, skip_files=False):
+    prod_records = {
+        prod_record.recid: prod_record
+        for prod_record in LegacyRecordsMirror.query.filter(
+            LegacyRecordsMirror.recid.in_(recids))
+    }
+
+    records = []
+    for recid, json_record in zip(recids, converted_records):
+        with db.session.begin_nested():
+            record = migrate_record_from_mirror(
+                prod_records[recid],
+                skip_files=skip_files,
+                json_record=json_record,
+            )
+            if record:
+                records.append(record)
+    db.session.commit()
+
+    _index_migrated_records(records)
+
+
+def _convert_mirror_records_in_pool(pool, recids):
+    """Yield the recids of every chunk with the async result of its conversion.
+
+    The conversion of a chunk is started before the previous chunk is
+    yielded, so that it runs while the previous chunk is being inserted.
+    """
+    converting = None
+    for chunk in chunker(recids, CHUNK_SIZE):
+        recids_and_marcxml = _read_marcxml_of_mirror_records(chunk)
+        next_converting = (
+            [recid for recid, _ in recids_and_marcxml],
+            pool.map_async(
+                _marcxml2record_or_exception,
+                [marcxml for _, marcxml in recids_and_marcxml],
+            ),
+        )
+        if converting:
+            yield converting
+        converting = next_converting
+
+    if converting:
+        yield converting
+
+
+@disable_orcid_push
+def migrate_mirror_in_bulk(recids, skip_files=False, processes=None):
+    """Migrate records from the mirror in the current process.
+
+    The MARCXML of every chunk of records is converted by a pool of worker
+    processes, while the records of the previous chunk are being written to
+    the database and indexed.
+
+    Args:
+        recids(List[int]): the recids of the records to migrate.
+        skip_files(bool): flag indicating whether the files in the record
+            metadata should be copied over from legacy and attach to the
+            record.
+        processes(Optional[int]): number of worker processes. If None, the
+            number of CPUs is used.
+    """
+    models_committed.disconnect(index_after_commit)
+
+    pool = Pool(processes)
+    start = time()
+    migrated = 0
+    try:
+        for chunk_recids, result in _convert_mirror_records_in_pool(pool, recids):
+            _insert_converted_records(chunk_recids, result.get(), skip_files=skip_files)
+            migrated += len(chunk_recids)
+            print("Migrated {} records ({:.1f} records/sec)".format(
+                migrated, migrated / (time() - start)))
+    finally:
+        pool.close()
+        pool.join()
+        models_committed.connect(index_after_commit)
 
 
 @shared_task(ignore_result=True)
@@ -222,26 +388,120 @@ def continuous_migration(skip_files=None):
             'RECORDS_MIGRATION_SKIP_FILES',
             False,
         )
+    batch_size = current_app.config.get('RECORDS_MIGRATION_CONTINUOUS_BATCH_SIZE', 100)
+    threads = current_app.config.get('RECORDS_MIGRATION_CONTINUOUS_THREADS', 4)
     redis_url = current_app.config.get('CACHE_REDIS_URL')
     r = StrictRedis.from_url(redis_url)
     lock = Lock(r, 'continuous_migration', expire=120, auto_renewal=True)
     if lock.acquire(blocking=False):
+        pool = ThreadPool(threads)
         try:
             while r.llen('legacy_records'):
-                raw_record = r.lrange('legacy_records', 0, 0)
-                if raw_record:
-                    migrate_and_insert_record(
-                        zlib.decompress(raw_record[0]),
+                # The records stay in the list until they are committed, so
+                # that they are migrated again if the task dies before. Only
+                # this task removes records from the list, and Legacy pushes
+                # at its end, so the first records are still the ones read.
+                raw_records = r.lrange('legacy_records', 0, batch_size - 1)
+                if raw_records:
+                    migrate_and_insert_records(
+                        raw_records,
                         skip_files=skip_files,
+                        pool=pool,
                     )
-                    db.session.commit()
-                r.lpop('legacy_records')
+                r.ltrim('legacy_records', len(raw_records), -1)
         finally:
+            pool.close()
+            pool.join()
             lock.release()
     else:
         LOGGER.info("Continuous_migration already executed. Skipping.")
 
 
+def _decompress_and_convert(compressed_record):
+    marcxml = zlib.decompress(compressed_record)
+    return marcxml, _marcxml2record_or_exception(marcxml)
+
+
+def migrate_and_insert_records(compressed_records, skip_files=False, pool=None):
+    """Migrate and insert a batch of records pushed by Legacy.
+
+    The records are decompressed and converted by the threads of the
+    ``pool``, inserted in a single transaction and then indexed in bulk.
+    A record failing to migrate is logged in the mirror, like in
+    :func:`migrate_and_insert_record`, without affecting the others.
+
+    Args:
+        compressed_records(List[str]): the zlib compressed MARCXML records, in
+            the order in which they were pushed.
+        skip_files(bool): flag indicating whether the files in the record
+            metadata should be copied over from legacy and attach to the
+            record.
+        pool(Optional[multiprocessing.pool.ThreadPool]): the pool converting
+            the records. If None, they are converted by the current thread.
+    """
+    map_ = pool.map if pool else map
+    converted_records = map_(_decompress_and_convert, compressed_records)
+
+    models_committed.disconnect(index_after_commit)
+    try:
+        records = {}
+        for marcxml, json_record in converted_records:
+            try:
+                prod_record = LegacyRecordsMirror.from_marcxml(marcxml)
+            except ValueError:
+                LOGGER.exception('Migrator Record Without Recid Error')
+                continue
+            with db.session.begin_nested():
+                prod_record = db.session.merge(prod_record)
+                record = migrate_record_from_mirror(
+                    prod_record,
+                    skip_files=skip_files,
+                    json_record=json_record,
+                )
+            if record:
+                records[record.id] = record
+        db.session.commit()
+    finally:
+        models_committed.connect(index_after_commit)
+
+    _index_migrated_records(list(records.values()))
+
+
+def _index_migrated_records(records):
+    """Index the records in bulk and reindex the records they cite.
+
+    This does in bulk what ``index_after_commit`` does for every record.
+    """
+    records_to_index = [record for record in records if not record.get('deleted')]
+    prefetched = prefetch_enhancement_data(records_to_index)
+
+    index_ops = []
+    for record in records:
+        if record.get('deleted'):
+            index_ops.append(create_delete_op(record))
+        else:
+            index_ops.append(create_index_op(record, prefetched=prefetched))
+
+    req_timeout = current_app.config['INDEXER_BULK_REQUEST_TIMEOUT']
+    success, failures = es_bulk(
+        es,
+        index_ops,
+        stats_only=True,
+        raise_on_error=False,
+        request_timeout=req_timeout,
+    )
+    if failures:
+        LOGGER.warning('%s of the migrated records could not be indexed', failures)
+    bump_search_generations(index_op['_index'] for index_op in index_ops)
+
+    for record in records:
+        index_modified_citations_from_record.delay(
+            get_pid_type_from_schema(record['$schema']),
+            record['control_number'],
+            record.model.version_id,
+        )
+
+
 @shared_task(ignore_result=False, queue='migrator')
 @disable_orcid_push
 def migrate_recids_from_mirror(prod_recids, skip_files=False):
@@ -249,10 +509,18 @@ def migrate_recids_from_mirror(prod_recids, skip_files=False):
 
     index_queue = []
 
+    prod_records = {
+        prod_record.recid: prod_record
+        for prod_record in LegacyRecordsMirror.query.filter(
+            LegacyRecordsMirror.recid.in_(prod_recids))
+    }
     for recid in prod_recids:
+        if recid not in prod_records:
+            LOGGER.warning('Record %s is not in the mirror, skipping it.', recid)
+            continue
         with db.session.begin_nested():
             record = migrate_record_from_mirror(
-                LegacyRecordsMirror.query.get(recid),
+                prod_records[recid],
                 skip_files=skip_files,
             )
             if record and not record.get('deleted'):
@@ -283,9 +551,32 @@ def _build_recid_to_uuid_map(citations_lookup):
 
 
 def insert_into_mirror(raw_records):
+    """Insert or update the given MARCXML records in the mirror.
+
+    All the records are upserted with a single multi-row statement. If the
+    same recid appears several times, only its last record is kept.
+    """
+    rows = {}
+    now = datetime.utcnow()
     for raw_record in raw_records:
         prod_record = LegacyRecordsMirror.from_marcxml(raw_record)
-        db.session.merge(prod_record)
+        rows[prod_record.recid] = {
+            'recid': prod_record.recid,
+            'marcxml': prod_record._marcxml,
+            'valid': None,
+            'last_updated': now,
+        }
+
+    if rows:
+        insert_stmt = insert(LegacyRecordsMirror.__table__).values(list(rows.values()))
+        db.session.execute(insert_stmt.on_conflict_do_update(
+            index_elements=[LegacyRecordsMirror.recid],
+            set_={
+                'marcxml': insert_stmt.excluded.marcxml,
+                'valid': insert_stmt.excluded.valid,
+                'last_updated': insert_stmt.excluded.last_updated,
+            },
+        ))
     db.session.commit()
 
 
@@ -296,7 +587,7 @@ def migrate_and_insert_record(raw_record, skip_files=False):
     return migrate_record_from_mirror(prod_record, skip_files=skip_files)
 
 
-def migrate_record_from_mirror(prod_record, skip_files=False):
+def migrate_record_from_mirror(prod_record, skip_files=False, json_record=None):
     """Migrate a mirrored legacy record into an Inspire record.
 
     Args:
@@ -304,12 +595,18 @@ def migrate_record_from_mirror(prod_record, skip_files=False):
         skip_files(bool): flag indicating whether the files in the record
             metadata should be copied over from legacy and attach to the
             record.
+        json_record(Optional[Union[dict, Exception]]): the result of the
+            conversion of the MARCXML of the record, if it was already done.
+            If None, the MARCXML is converted here.
 
     Returns:
         dict: the migrated record metadata, which is also inserted into the database.
     """
     try:
-        json_record = marcxml2record(prod_record.marcxml)
+        if json_record is None:
+            json_record = marcxml2record(prod_record.marcxml)
+        elif isinstance(json_record, Exception):
+            raise json_record
     except Exception as exc:
         LOGGER.exception('Migrator DoJSON Error')
         prod_record.error = exc
@@ -48,23 +48,71 @@ class OrcidCache(object):
         self.recid = recid
         self._cached_hash_value = None
         self._new_hash_value = None
+        self._is_read = False
 
     @property
     def redis(self):
-        redis = getattr(flask.g, 'redis_client', None)
-        if redis is None:
-            url = app.config.get('CACHE_REDIS_URL')
-            redis = StrictRedis.from_url(url)
-            flask.g.redis_client = redis
-        return redis
+        return _get_redis()
 
     @property
     def _key(self):
         """Return the string '`CACHE_PREFIX`:orcidcache:`orcid_value`:`recid`'"""
-        prefix = ''
-        if CACHE_PREFIX:
-            prefix = '{}:'.format(CACHE_PREFIX)
-        return '{}orcidcache:{}:{}'.format(prefix, self.orcid, self.recid)
+        return _get_key(self.orcid, self.recid)
+
+    @classmethod
+    @time_execution
+    def read_works_putcodes(cls, orcid, recids):
+        """
+        Read the putcodes and hashes for many recids of the same orcid.
+
+        All the reads are sent to Redis in a single pipeline.
+
+        Args:
+            orcid (string): orcid identifier.
+            recids (List[string]): inspire record ids.
+
+        Returns:
+            dict: a mapping from each recid to a ``(putcode, cache)`` tuple,
+            where ``putcode`` is ``None`` when not cached and ``cache`` is an
+            ``OrcidCache`` whose cached hash is already loaded.
+        """
+        recids = list(recids)
+        pipeline = _get_redis().pipeline(transaction=False)
+        for recid in recids:
+            pipeline.hgetall(_get_key(orcid, recid))
+
+        result = {}
+        for recid, value in zip(recids, pipeline.execute()):
+            cache = cls(orcid, recid)
+            cache._cached_hash_value = value.get('hash')
+            cache._is_read = True
+            result[recid] = (value.get('putcode'), cache)
+        return result
+
+    @classmethod
+    @time_execution
+    def write_works_putcodes(cls, orcid, putcodes_by_recid):
+        """
+        Write the putcodes for many recids of the same orcid.
+
+        All the writes are sent to Redis in a single pipeline. As in
+        ``write_work_putcode`` without ``inspire_record``, any cached hash is
+        left untouched.
+
+        Args:
+            orcid (string): orcid identifier.
+            putcodes_by_recid (dict): mapping from recids to putcodes.
+
+        Raises:
+            ValueError: when a putcode is empty.
+        """
+        if not all(putcodes_by_recid.values()):
+            raise ValueError('Empty putcode not allowed')
+
+        pipeline = _get_redis().pipeline(transaction=False)
+        for recid, putcode in putcodes_by_recid.items():
+            pipeline.hmset(_get_key(orcid, recid), {'putcode': putcode})
+        pipeline.execute()
 
     @time_execution
     def write_work_putcode(self, putcode, inspire_record=None):
@@ -96,6 +144,7 @@ class OrcidCache(object):
         """Read the putcode for the given (orcid, recid)."""
         value = self.redis.hgetall(self._key)
         self._cached_hash_value = value.get('hash')
+        self._is_read = True
         return value.get('putcode')
 
     @time_execution
@@ -112,13 +161,29 @@ class OrcidCache(object):
             inspire_record (InspireRecord): InspireRecord instance. If provided,
              the hash for the record content is re-computed.
         """
-        if not self._cached_hash_value:
+        if not self._is_read:
             self.read_work_putcode()
         if not self._new_hash_value:
             self._new_hash_value = _OrcidHasher(inspire_record).compute_hash()
         return self._cached_hash_value != self._new_hash_value
 
 
+def _get_redis():
+    redis = getattr(flask.g, 'redis_client', None)
+    if redis is None:
+        url = app.config.get('CACHE_REDIS_URL')
+        redis = StrictRedis.from_url(url)
+        flask.g.redis_client = redis
+    return redis
+
+
+def _get_key(orcid, recid):
+    prefix = ''
+    if CACHE_PREFIX:
+        prefix = '{}:'.format(CACHE_PREFIX)
+    return '{}orcidcache:{}:{}'.format(prefix, orcid, recid)
+
+
 class _OrcidHasher(object):
     def __init__(self, inspire_record):
         self.inspire_record = inspire_record
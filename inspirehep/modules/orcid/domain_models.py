@@ -23,13 +23,18 @@
 from __future__ import absolute_import, division, print_function
 
 import logging
+from contextlib import contextmanager
 
+from celery.exceptions import SoftTimeLimitExceeded
 from flask import current_app
+from requests.exceptions import RequestException
 from time_execution import time_execution
 
 from inspire_service_orcid import exceptions as orcid_client_exceptions
 from inspire_service_orcid.client import OrcidClient
 
+from invenio_pidstore.models import PersistentIdentifier
+
 from inspirehep.utils.lock import distributed_lock
 from inspirehep.utils.record_getter import (
     RecordGetterError,
@@ -44,18 +49,25 @@ from .putcode_getter import OrcidPutcodeGetter
 
 logger = logging.getLogger(__name__)
 
+NETWORK_EXCEPTIONS = (RequestException, SoftTimeLimitExceeded)
+"""Exceptions failing a whole batch push, as they would fail every record."""
+
 
 class OrcidPusher(object):
     def __init__(self, orcid, recid, oauth_token,
-                 do_fail_if_duplicated_identifier=False, record_db_version=None):
+                 do_fail_if_duplicated_identifier=False, record_db_version=None,
+                 inspire_record=None, cache=None, is_lock_acquired=False):
         self.orcid = orcid
         self.recid = recid
         self.oauth_token = oauth_token
         self.do_fail_if_duplicated_identifier = do_fail_if_duplicated_identifier
         self.record_db_version = record_db_version
-        self.inspire_record = self._get_inspire_record()
-        self.cache = OrcidCache(orcid, recid)
+        self.inspire_record = inspire_record or self._get_inspire_record()
+        self.cache = cache or OrcidCache(orcid, recid)
         self.lock_name = 'orcid:{}'.format(self.orcid)
+        # When the caller already holds the orcid lock (fi. OrcidBatchPusher),
+        # the pusher must not try to acquire it again.
+        self.is_lock_acquired = is_lock_acquired
         self.client = OrcidClient(self.oauth_token, self.orcid)
         self.converter = None
 
@@ -105,6 +117,16 @@ class OrcidPusher(object):
                 return True
         return self.inspire_record.get('deleted', False)
 
+    @contextmanager
+    def _orcid_lock(self):
+        # ORCID API allows 1 non-idempotent call only for the same orcid at
+        # the same time. Using `distributed_lock` to achieve this.
+        if self.is_lock_acquired:
+            yield
+            return
+        with distributed_lock(self.lock_name, blocking=True):
+            yield
+
     @time_execution
     def push(self):
         putcode = None
@@ -117,7 +139,19 @@ class OrcidPusher(object):
                 return putcode
         logger.info('OrcidPusher cache miss for recid={} and orcid={}'.format(
             self.recid, self.orcid))
+        return self.push_work(putcode)
+
+    @time_execution
+    def push_work(self, putcode=None):
+        """Push the work to ORCID, bypassing the cache check.
 
+        Args:
+            putcode (string): the putcode of the work in ORCID, if known.
+
+        Returns:
+            string: the putcode of the pushed work, or ``None`` if the work
+            was deleted.
+        """
         # If the record is deleted, then delete it.
         if self._is_record_deleted:
             self._delete_work(putcode)
@@ -176,9 +210,7 @@ class OrcidPusher(object):
         # putcode).
 
         xml_element = self.converter.get_xml(do_add_bibtex_citation=True)
-        # ORCID API allows 1 non-idempotent call only for the same orcid at
-        # the same time. Using `distributed_lock` to achieve this.
-        with distributed_lock(self.lock_name, blocking=True):
+        with self._orcid_lock():
             if putcode:
                 response = self.client.put_updated_work(xml_element, putcode)
             else:
@@ -192,14 +224,11 @@ class OrcidPusher(object):
     def _cache_all_author_putcodes(self):
         logger.info('New OrcidPusher cache all author putcodes for orcid={}'.format(self.orcid))
         putcode_getter = OrcidPutcodeGetter(self.orcid, self.oauth_token)
-        putcodes_recids = list(putcode_getter.get_all_inspire_putcodes_and_recids_iter())  # Can raise exceptions.InputDataInvalidException.
+        putcodes_by_recid = putcode_getter.warm_up_putcodes_cache()  # Can raise exceptions.InputDataInvalidException.
 
-        putcode = None
-        for fetched_putcode, fetched_recid in putcodes_recids:
-            if fetched_recid == str(self.recid):
-                putcode = int(fetched_putcode)
-            cache = OrcidCache(self.orcid, fetched_recid)
-            cache.write_work_putcode(fetched_putcode)
+        putcode = putcodes_by_recid.get(str(self.recid))
+        if putcode:
+            putcode = int(putcode)
 
         # Ensure the putcode is actually in cache.
         # Note: this step is not really necessary and it can be skipped, but
@@ -219,9 +248,7 @@ class OrcidPusher(object):
             # Such recid does not exists (anymore?) in ORCID API.
             return
 
-        # ORCID API allows 1 non-idempotent call only for the same orcid at
-        # the same time. Using `distributed_lock` to achieve this.
-        with distributed_lock(self.lock_name, blocking=True):
+        with self._orcid_lock():
             response = self.client.delete_work(putcode)
         try:
             response.raise_for_result()
@@ -263,3 +290,144 @@ class OrcidPusher(object):
                 countdown=backoff,
                 time_limit=10 * 60,
             )
+
+
+class OrcidBatchPusher(object):
+    """Push many records to the same ORCID under a single lock acquisition.
+
+    The cached putcodes and hashes of all the records are read in one Redis
+    pipeline and only the works whose content changed are pushed. Records
+    which cannot be handled within the batch (not found, stale db version or
+    clashing external identifiers) are returned as deferred, so that the
+    caller can push them one by one with ``orcid_push``.
+    """
+
+    def __init__(self, orcid, oauth_token, recids_and_versions):
+        """
+        Args:
+            orcid (string): an orcid identifier.
+            oauth_token (string): orcid token.
+            recids_and_versions (dict): mapping from the recids to push to the
+                minimum db version of each record (or ``None``).
+        """
+        self.orcid = orcid
+        self.oauth_token = oauth_token
+        self.recids_and_versions = {
+            str(recid): version for recid, version in recids_and_versions.items()
+        }
+        self.lock_name = 'orcid:{}'.format(self.orcid)
+        self.deferred = {}
+
+    @time_execution
+    def _get_inspire_records(self):
+        # Local import to avoid import error.
+        from inspirehep.modules.records.api import InspireRecord
+
+        pids = PersistentIdentifier.query.filter(
+            PersistentIdentifier.pid_type == 'lit',
+            PersistentIdentifier.object_type == 'rec',
+            PersistentIdentifier.pid_value.in_(list(self.recids_and_versions)),
+        ).all()
+        recids_by_uuid = {pid.object_uuid: pid.pid_value for pid in pids}
+
+        inspire_records = {}
+        for inspire_record in InspireRecord.get_records(list(recids_by_uuid)):
+            recid = recids_by_uuid[inspire_record.id]
+            record_db_version = self.recids_and_versions[recid]
+            # See `OrcidPusher._get_inspire_record`.
+            if record_db_version and inspire_record.model.version_id < record_db_version:
+                continue
+            inspire_records[recid] = inspire_record
+
+        for recid, record_db_version in self.recids_and_versions.items():
+            if recid not in inspire_records:
+                self.deferred[recid] = record_db_version
+        return inspire_records
+
+    @time_execution
+    def push(self):
+        """Push all the changed works.
+
+        Returns:
+            dict: mapping from each pushed or cache-hit recid to its putcode.
+        """
+        inspire_records = self._get_inspire_records()
+        cached = OrcidCache.read_works_putcodes(self.orcid, inspire_records.keys())
+
+        putcodes = {}
+        pushers_and_putcodes = []
+        for recid, inspire_record in inspire_records.items():
+            putcode, cache = cached[recid]
+            try:
+                pusher = OrcidPusher(
+                    self.orcid, recid, self.oauth_token,
+                    do_fail_if_duplicated_identifier=True,
+                    record_db_version=self.recids_and_versions[recid],
+                    inspire_record=inspire_record,
+                    cache=cache,
+                    is_lock_acquired=True,
+                )
+                if pusher._do_force_cache_miss:
+                    putcode = None
+                elif not pusher._is_record_deleted and \
+                        not cache.has_work_content_changed(inspire_record):
+                    putcodes[recid] = putcode
+                    continue
+            except NETWORK_EXCEPTIONS:
+                raise
+            except Exception:
+                self._defer_failed(recid)
+                continue
+            pushers_and_putcodes.append((pusher, putcode))
+
+        logger.info('OrcidBatchPusher cache hit for {} and cache miss for {} recids'
+                    ' for orcid={}'.format(len(putcodes), len(pushers_and_putcodes), self.orcid))
+        if not pushers_and_putcodes:
+            return putcodes
+
+        with distributed_lock(self.lock_name, blocking=True):
+            # When several works lack a putcode (fi. the cache was flushed),
+            # it is cheaper to fetch the works summary once now than letting
+            # every POST fail with WorkAlreadyExistsException and fetch it
+            # again.
+            if sum(1 for _, putcode in pushers_and_putcodes if not putcode) > 1:
+                all_putcodes = self._cache_all_author_putcodes()
+                pushers_and_putcodes = [
+                    (pusher, putcode or all_putcodes.get(pusher.recid))
+                    for pusher, putcode in pushers_and_putcodes
+                ]
+
+            for pusher, putcode in pushers_and_putcodes:
+                try:
+                    putcodes[pusher.recid] = pusher.push_work(putcode)
+                except exceptions.DuplicatedExternalIdentifierPusherException:
+                    # Pushing the clashing work requires the lock we are
+                    # holding: leave it to a standalone push.
+                    self.deferred[pusher.recid] = pusher.record_db_version
+                except (exceptions.InputDataInvalidException,
+                        exceptions.PutcodeNotFoundInOrcidException):
+                    logger.exception('OrcidBatchPusher failed for recid={} and orcid={}'.format(
+                        pusher.recid, self.orcid))
+                except NETWORK_EXCEPTIONS:
+                    # The whole batch is retried by `orcid_push_batch`.
+                    raise
+                except Exception:
+                    self._defer_failed(pusher.recid)
+
+        return putcodes
+
+    def _defer_failed(self, recid):
+        """Leave a record which failed to a standalone push.
+
+        The ORCID push queue was already emptied, thus the record would be
+        lost if its error aborted the whole batch.
+        """
+        logger.exception('OrcidBatchPusher failed for recid={} and orcid={}, deferring it'.format(
+            recid, self.orcid))
+        self.deferred[recid] = self.recids_and_versions[recid]
+
+    @time_execution
+    def _cache_all_author_putcodes(self):
+        logger.info('New OrcidBatchPusher cache all author putcodes for orcid={}'.format(self.orcid))
+        putcode_getter = OrcidPutcodeGetter(self.orcid, self.oauth_token)
+        return putcode_getter.warm_up_putcodes_cache()
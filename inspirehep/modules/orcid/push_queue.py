@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+"""Per-ORCID queue coalescing the records to be pushed."""
+
+from __future__ import absolute_import, division, print_function
+
+import flask
+from flask import current_app as app
+from redis import StrictRedis
+from time_execution import time_execution
+
+
+CACHE_PREFIX = None
+
+
+class OrcidPushQueue(object):
+    def __init__(self, orcid):
+        """
+        Records waiting to be pushed to the given ORCID.
+
+        The queue is a Redis hash mapping each recid to the minimum db version
+        of the record to be pushed, so that many updates of the same record
+        within the same window result in a single push.
+
+        Args:
+            orcid (string): orcid identifier.
+        """
+        self.orcid = orcid
+
+    @property
+    def redis(self):
+        redis = getattr(flask.g, 'redis_client', None)
+        if redis is None:
+            url = app.config.get('CACHE_REDIS_URL')
+            redis = StrictRedis.from_url(url)
+            flask.g.redis_client = redis
+        return redis
+
+    @property
+    def _key(self):
+        """Return the string '`CACHE_PREFIX`:orcidpushqueue:`orcid_value`'"""
+        prefix = ''
+        if CACHE_PREFIX:
+            prefix = '{}:'.format(CACHE_PREFIX)
+        return '{}orcidpushqueue:{}'.format(prefix, self.orcid)
+
+    @property
+    def _scheduled_key(self):
+        return '{}:scheduled'.format(self._key)
+
+    @time_execution
+    def enqueue(self, recid, record_db_version=None, window=None):
+        """
+        Add a record to the queue.
+
+        Args:
+            recid (int): the record id.
+            record_db_version (int): the db version of the record to be pushed.
+            window (int): the seconds the queue waits for more records before
+                being flushed.
+
+        Returns:
+            bool: ``True`` if the caller has to schedule the flush of the
+            queue, ``False`` if a flush is already scheduled.
+        """
+        if window is None:
+            window = app.config['ORCID_PUSH_QUEUE_WINDOW']
+
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.hset(self._key, recid, record_db_version or '')
+        # Let the flag outlive the window a bit, so that a flush task waiting
+        # in a busy Celery queue does not get scheduled twice. Should the task
+        # be lost, the next record enqueued after the expiry schedules it anew.
+        pipeline.set(self._scheduled_key, 1, nx=True, ex=window + 60)
+        _, is_scheduled_now = pipeline.execute()
+        return bool(is_scheduled_now)
+
+    @time_execution
+    def pop_all(self):
+        """
+        Empty the queue.
+
+        The scheduled flag is cleared in the same transaction, thus any record
+        enqueued afterwards schedules a new flush.
+
+        Returns:
+            dict: mapping from the recids to their db version (or ``None``).
+        """
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.delete(self._scheduled_key)
+        pipeline.hgetall(self._key)
+        pipeline.delete(self._key)
+        _, items, _ = pipeline.execute()
+        return {
+            recid: int(version) if version else None
+            for recid, version in items.items()
+        }
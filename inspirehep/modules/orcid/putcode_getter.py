@@ -31,6 +31,7 @@ from inspire_service_orcid import exceptions as orcid_client_exceptions
 from inspire_service_orcid.client import OrcidClient
 from inspire_service_orcid import utils as inspire_service_orcid_utils
 
+from inspirehep.modules.orcid.cache import OrcidCache
 from inspirehep.modules.orcid.converter import ExternalIdentifier
 from inspirehep.modules.records.utils import get_pid_from_record_uri
 from . import exceptions, push_access_tokens, utils
@@ -73,6 +74,25 @@ class OrcidPutcodeGetter(object):
         for putcode, recid in self._get_putcodes_and_recids_iter(putcodes_without_recids):
             yield putcode, recid
 
+    def warm_up_putcodes_cache(self):
+        """
+        Query ORCID api and cache all the Inspire putcodes for the given ORCID.
+
+        The putcodes are written to the cache in a single Redis pipeline.
+
+        Returns:
+            dict: mapping from the recids (as strings) to their putcodes.
+        """
+        putcodes_by_recid = {
+            str(recid): putcode
+            for putcode, recid in self.get_all_inspire_putcodes_and_recids_iter()
+        }
+        if putcodes_by_recid:
+            OrcidCache.write_works_putcodes(self.orcid, putcodes_by_recid)
+        logger.info('OrcidPutcodeGetter: cached {} putcodes for orcid={}'.format(
+            len(putcodes_by_recid), self.orcid))
+        return putcodes_by_recid
+
     def _get_all_works_summary(self):
         """
         Query ORCID api and get all the putcodes with their embedded recids
@@ -48,6 +48,7 @@ from inspirehep.modules.orcid import exceptions as domain_exceptions
 from inspirehep.modules.orcid.utils import get_literature_recids_for_orcid
 
 from . import domain_models, push_access_tokens
+from .push_queue import OrcidPushQueue
 
 
 LOGGER = getStackTraceLogger(__name__)
@@ -306,6 +307,101 @@ def orcid_push(self, orcid, rec_id, oauth_token, kwargs_to_pusher=None):
     return putcode
 
 
+def enqueue_orcid_push(orcid, rec_id, oauth_token, record_db_version=None):
+    """Queue the push of a record to ORCID, batched per ORCID.
+
+    The record is added to the ORCID push queue and, if no flush is pending,
+    an ``orcid_push_batch`` task is scheduled after the configured window, so
+    that all the records changed in the meantime are pushed together.
+
+    Args:
+        orcid (String): an orcid identifier.
+        rec_id (Int): inspire record's id to push to ORCID.
+        oauth_token (String): orcid token.
+        record_db_version (Int): the db version of the record to push.
+    """
+    window = current_app.config['ORCID_PUSH_QUEUE_WINDOW']
+    if OrcidPushQueue(orcid).enqueue(rec_id, record_db_version, window=window):
+        orcid_push_batch.apply_async(
+            queue='orcid_push',
+            countdown=window,
+            kwargs={
+                'orcid': orcid,
+                'oauth_token': oauth_token,
+            },
+        )
+
+
+@shared_task(bind=True, soft_time_limit=10 * 60, time_limit=11 * 60)
+@time_execution
+def orcid_push_batch(self, orcid, oauth_token, recids_and_versions=None):
+    """Celery task to push all the queued records of an ORCID.
+
+    Args:
+        self (celery.Task): the task
+        orcid (String): an orcid identifier.
+        oauth_token (String): orcid token.
+        recids_and_versions (Dict): the records to push, mapped to their db
+            version. If not given, the ORCID push queue is emptied. It is set
+            only when retrying, as the queue was already emptied by then.
+    """
+    if recids_and_versions is None:
+        recids_and_versions = OrcidPushQueue(orcid).pop_all()
+    if not recids_and_versions:
+        return
+
+    if not current_app.config['FEATURE_FLAG_ENABLE_ORCID_PUSH']:
+        LOGGER.warning('ORCID push feature flag not enabled')
+        return
+
+    if not re.match(current_app.config.get(
+            'FEATURE_FLAG_ORCID_PUSH_WHITELIST_REGEX', '^$'), orcid):
+        LOGGER.warning('ORCID push not enabled for orcid={}'.format(orcid))
+        return
+
+    LOGGER.info('New orcid_push_batch task for {} recids and orcid={}'.format(
+        len(recids_and_versions), orcid))
+
+    try:
+        pusher = domain_models.OrcidBatchPusher(orcid, oauth_token, recids_and_versions)
+        putcodes = pusher.push()
+    except (RequestException, SoftTimeLimitExceeded) as exc:
+        # See `orcid_push`: the works already pushed are cache hits when
+        # retrying, thus retrying the whole batch is cheap.
+        backoff = (4 ** (self.request.retries + 1)) * 60
+        LOGGER.exception(
+            'Orcid_push_batch task for orcid={} raised an exception.'
+            ' Retrying in {} secs. Exception={}'.format(
+                orcid, backoff, traceback.format_exc()))
+        raise self.retry(
+            max_retries=3,
+            countdown=backoff,
+            exc=exc,
+            kwargs={
+                'orcid': orcid,
+                'oauth_token': oauth_token,
+                'recids_and_versions': recids_and_versions,
+            },
+        )
+
+    # The records which cannot be pushed within the batch are pushed one by
+    # one, taking advantage of the retry logic of `orcid_push`.
+    for rec_id, record_db_version in pusher.deferred.items():
+        orcid_push.apply_async(
+            queue='orcid_push',
+            kwargs={
+                'orcid': orcid,
+                'rec_id': rec_id,
+                'oauth_token': oauth_token,
+                'kwargs_to_pusher': dict(record_db_version=record_db_version),
+            },
+        )
+
+    LOGGER.info('Orcid_push_batch task for orcid={} completed: {} pushed or'
+                ' unchanged, {} deferred'.format(orcid, len(putcodes), len(pusher.deferred)))
+    return putcodes
+
+
 def _find_user_matching(orcid, email):
     """Attempt to find a user in our DB on either ORCID or email."""
     user_identity = UserIdentity.query.filter_by(id=orcid, method='orcid').first()
@@ -26,10 +26,12 @@ from __future__ import absolute_import, division, print_function
 
 from copy import deepcopy
 from datetime import datetime
+from itertools import chain
 from urllib import quote
+import logging
 import uuid
 import arrow
-from elasticsearch.exceptions import NotFoundError
+from elasticsearch.exceptions import NotFoundError, TransportError
 from flask import current_app
 from fs.opener import fsopen
 from six.moves.urllib.parse import urlparse, unquote
@@ -40,21 +42,33 @@ from inspire_schemas.api import validate
 from inspire_schemas.builders import LiteratureBuilder
 from invenio_files_rest.models import Bucket
 from invenio_pidstore.errors import PIDDoesNotExistError
-from invenio_pidstore.models import PersistentIdentifier
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_records_files.api import Record
 from invenio_db import db
-from sqlalchemy import Text, or_, not_, cast, type_coerce
-from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+from invenio_search import current_search_client as es
+from sqlalchemy import Text, or_, not_, cast, type_coerce, distinct, func, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY, insert
 from sqlalchemy.sql.functions import GenericFunction
 
 from inspirehep.modules.pidstore.minters import inspire_recid_minter
 from inspirehep.modules.pidstore.utils import get_pid_type_from_schema, get_endpoint_from_pid_type
-from inspirehep.modules.records.utils import get_pid_from_record_uri, populate_earliest_date
+from inspirehep.modules.records.models import RecordCitationsCount
+from inspirehep.modules.search.api import LiteratureSearch
+from inspirehep.modules.records.utils import (
+    get_linked_records_in_field_of_records,
+    get_pid_from_record_uri,
+    get_ui_display_linked_pids,
+    is_data,
+    is_hep,
+    populate_earliest_date,
+)
 from inspirehep.utils.record_getter import (
     RecordGetterError,
     get_es_record_by_uuid
 )
 
+LOGGER = logging.getLogger(__name__)
+
 MAX_UNIQUE_KEY_COUNT = 50000
 
 
@@ -62,6 +76,264 @@ class referenced_records(GenericFunction):
     type = ARRAY(Text)
 
 
+def _get_citing_records_filters():
+    """Return the filters a ``RecordMetadata`` must pass to count as a citation."""
+    filter_deleted_records = or_(not_(type_coerce(RecordMetadata.json, JSONB).has_key('deleted')),  # noqa: W601
+                                 not_(RecordMetadata.json['deleted'] == cast(True, JSONB)))
+    only_literature_collection = type_coerce(RecordMetadata.json, JSONB)['_collections'].contains(['Literature'])
+    filter_superseded_records = or_(
+        not_(type_coerce(RecordMetadata.json, JSONB).has_key('related_records')),  # noqa: W601
+        not_(type_coerce(RecordMetadata.json, JSONB)['related_records'].contains([{'relation': 'successor'}]))
+    )
+    return [filter_deleted_records, filter_superseded_records, only_literature_collection]
+
+
+def _query_citations_count_by_index_ref(index_refs=None):
+    """Return a query of ``(index_ref, citations_count)`` pairs.
+
+    The counts follow the same rules as ``InspireRecord.get_citations_count``
+    with ``show_duplicates=False``.
+
+    Args:
+        index_refs(Optional[List[str]]): references in the format returned by
+            ``InspireRecord._get_index_ref``. If passed, only the citations of
+            those records are counted, otherwise all the references in the DB
+            are aggregated.
+    """
+    citing_records = db.session.query(
+        func.unnest(referenced_records(RecordMetadata.json)).label('index_ref'),
+        RecordMetadata.json['control_number'].label('control_number'),
+    ).filter(*_get_citing_records_filters())
+    if index_refs is not None:
+        citing_records = citing_records.filter(
+            referenced_records(RecordMetadata.json).overlap(index_refs))
+    citing_records = citing_records.subquery()
+
+    query = db.session.query(
+        citing_records.c.index_ref,
+        func.count(distinct(citing_records.c.control_number)).label('citations_count'),
+    )
+    if index_refs is not None:
+        query = query.filter(citing_records.c.index_ref.in_(index_refs))
+
+    return query.group_by(citing_records.c.index_ref)
+
+
+def _on_conflict_update_citations_count(insert_stmt):
+    return insert_stmt.on_conflict_do_update(
+        index_elements=[RecordCitationsCount.record_id],
+        set_={
+            'citation_count': insert_stmt.excluded.citation_count,
+            'updated': insert_stmt.excluded.updated,
+        },
+    )
+
+
+def update_citations_count(pids):
+    """Recompute and store the citations count of the given records.
+
+    It is meant to be called with the output of
+    ``InspireRecord.get_modified_references``, so that the stored counts
+    follow every change of the references in the DB.
+
+    Args:
+        pids(Iterable[Tuple[str, Union[str, int]]]): ``(pid_type, pid_value)``
+            of the cited records.
+
+    Returns:
+        int: the number of records whose citations count was stored.
+    """
+    pids = [(pid_type, str(pid_value)) for (pid_type, pid_value) in pids]
+    if not pids:
+        return 0
+
+    uuids_by_index_ref = {
+        u'{}{}'.format(pid_value, pid_type): object_uuid
+        for object_uuid, pid_type, pid_value in db.session.query(
+            PersistentIdentifier.object_uuid,
+            PersistentIdentifier.pid_type,
+            PersistentIdentifier.pid_value,
+        ).filter(
+            PersistentIdentifier.object_type == 'rec',
+            tuple_(PersistentIdentifier.pid_type, PersistentIdentifier.pid_value).in_(pids),
+        )
+    }
+    if not uuids_by_index_ref:
+        return 0
+
+    counts = dict(_query_citations_count_by_index_ref(list(uuids_by_index_ref)))
+    now = datetime.utcnow()
+    values = [
+        {
+            'record_id': object_uuid,
+            'citation_count': counts.get(index_ref, 0),
+            'updated': now,
+        }
+        for index_ref, object_uuid in uuids_by_index_ref.items()
+    ]
+    db.session.execute(_on_conflict_update_citations_count(
+        insert(RecordCitationsCount).values(values)
+    ))
+
+    return len(values)
+
+
+def rebuild_citations_count(pid_types=('lit', 'dat')):
+    """Recompute and store the citations count of all the records at once.
+
+    All the references in the DB are aggregated in a single statement, and
+    records without citations get a zero count, so that indexing never has
+    to fall back to counting citations on the fly.
+
+    Args:
+        pid_types(Iterable[str]): pid types of the records to update.
+
+    Returns:
+        int: the number of records whose citations count was stored.
+    """
+    counts = _query_citations_count_by_index_ref().subquery()
+    records = db.session.query(
+        PersistentIdentifier.object_uuid,
+        func.coalesce(counts.c.citations_count, 0),
+        func.now(),
+    ).outerjoin(
+        counts,
+        counts.c.index_ref == PersistentIdentifier.pid_value + PersistentIdentifier.pid_type,
+    ).filter(
+        PersistentIdentifier.object_type == 'rec',
+        PersistentIdentifier.pid_type.in_(pid_types),
+        PersistentIdentifier.status == PIDStatus.REGISTERED,
+    ).distinct(PersistentIdentifier.object_uuid)
+
+    result = db.session.execute(_on_conflict_update_citations_count(
+        insert(RecordCitationsCount).from_select(
+            ['record_id', 'citation_count', 'updated'],
+            records.statement,
+        )
+    ))
+
+    return result.rowcount
+
+
+def get_citations_counts(records):
+    """Return the citations count of several records at once.
+
+    The stored counts are read with a single query, and the ones missing from
+    ``records_citations_count`` are computed with a single grouped query.
+
+    Args:
+        records(Iterable[InspireRecord]): the cited records.
+
+    Returns:
+        dict: the citations counts, keyed by record uuid.
+    """
+    records = list(records)
+    if not records:
+        return {}
+
+    counts = dict(db.session.query(
+        RecordCitationsCount.record_id,
+        RecordCitationsCount.citation_count,
+    ).filter(
+        RecordCitationsCount.record_id.in_([record.id for record in records])
+    ))
+
+    uuids_by_index_ref = {
+        record._get_index_ref(): record.id
+        for record in records
+        if record.id not in counts
+    }
+    if uuids_by_index_ref:
+        computed_counts = dict(_query_citations_count_by_index_ref(list(uuids_by_index_ref)))
+        for index_ref, record_id in uuids_by_index_ref.items():
+            counts[record_id] = computed_counts.get(index_ref, 0)
+
+    return counts
+
+
+def prefetch_enhancement_data(records):
+    """Fetch at once the data needed to enhance a batch of records for ES.
+
+    Args:
+        records(List[InspireRecord]): the records about to be indexed.
+
+    Returns:
+        dict: the prefetched data, to be passed to ``enhance_before_index``.
+    """
+    hep_records = [record for record in records if is_hep(record)]
+    cited_records = [record for record in records if is_hep(record) or is_data(record)]
+
+    return {
+        'citations_counts': get_citations_counts(cited_records),
+        'indexed_ui_displays': get_indexed_ui_displays(hep_records),
+        'linked_authors': get_linked_records_in_field_of_records(hep_records, 'authors.record'),
+        'linked_revisions': get_ui_display_linked_revisions(hep_records),
+    }
+
+
+def get_ui_display_linked_revisions(records):
+    """Return the revisions of the records embedded in the UI display of others.
+
+    Args:
+        records(Iterable[InspireRecord]): the literature records.
+
+    Returns:
+        dict: the UUID and revision of the linked records, keyed by their
+        ``(pid_type, pid_value)``.
+    """
+    pids = set(chain.from_iterable(
+        get_ui_display_linked_pids(record) for record in records
+    ))
+    if not pids:
+        return {}
+
+    return {
+        (pid_type, pid_value): (str(object_uuid), version_id)
+        for pid_type, pid_value, object_uuid, version_id in db.session.query(
+            PersistentIdentifier.pid_type,
+            PersistentIdentifier.pid_value,
+            RecordMetadata.id,
+            RecordMetadata.version_id,
+        ).join(
+            RecordMetadata, PersistentIdentifier.object_uuid == RecordMetadata.id
+        ).filter(
+            PersistentIdentifier.object_type == 'rec',
+            tuple_(PersistentIdentifier.pid_type, PersistentIdentifier.pid_value).in_(list(pids)),
+        )
+    }
+
+
+def get_indexed_ui_displays(records):
+    """Return the ``_ui_display`` currently indexed for several records at once.
+
+    Args:
+        records(Iterable[InspireRecord]): the literature records.
+
+    Returns:
+        dict: the ``_ui_display`` and ``_ui_display_fingerprint`` of the
+        indexed records, keyed by control number.
+    """
+    uuids = [str(record.id) for record in records]
+    if not uuids:
+        return {}
+
+    try:
+        documents = es.mget(
+            index=LiteratureSearch.Meta.index,
+            body={'ids': uuids},
+            _source_includes=['control_number', '_ui_display', '_ui_display_fingerprint'],
+        )
+    except TransportError:
+        LOGGER.warning('Cannot get the indexed _ui_display of %d records', len(uuids))
+        return {}
+
+    return {
+        document['_source']['control_number']: document['_source']
+        for document in documents['docs']
+        if document.get('found') and 'control_number' in document['_source']
+    }
+
+
 class InspireRecord(Record):
     """Record class that fetches records from DataBase."""
 
@@ -618,17 +890,8 @@ class InspireRecord(Record):
         citation_query = RecordMetadata.query.with_entities(RecordMetadata.id,
                                                             RecordMetadata.json['control_number'])
         citation_filter = referenced_records(RecordMetadata.json).contains([index_ref])
-        filter_deleted_records = or_(not_(type_coerce(RecordMetadata.json, JSONB).has_key('deleted')),  # noqa: W601
-                                     not_(RecordMetadata.json['deleted'] == cast(True, JSONB)))
-        only_literature_collection = type_coerce(RecordMetadata.json, JSONB)['_collections'].contains(['Literature'])
-        filter_superseded_records = or_(
-            not_(type_coerce(RecordMetadata.json, JSONB).has_key('related_records')),  # noqa: W601
-            not_(type_coerce(RecordMetadata.json, JSONB)['related_records'].contains([{'relation': 'successor'}]))
-        )
         citations = citation_query.filter(citation_filter,
-                                          filter_deleted_records,
-                                          filter_superseded_records,
-                                          only_literature_collection)
+                                          *_get_citing_records_filters())
         if not show_duplicates:
             # It just hides duplicates, and still can show citations
             # which do not have proper PID in PID store
@@ -646,6 +909,17 @@ class InspireRecord(Record):
         count = self._query_citing_records(show_duplicates).count()
         return count
 
+    def get_stored_citations_count(self):
+        """Returns the materialized citations count for this record.
+
+        Returns:
+            Optional[int]: the count kept in ``records_citations_count``, or
+            ``None`` if it was never stored for this record.
+        """
+        return db.session.query(RecordCitationsCount.citation_count).filter(
+            RecordCitationsCount.record_id == self.id
+        ).scalar()
+
     def dumps(self):
         """Returns a dict 'representation' of the record.
 
@@ -22,7 +22,10 @@
 
 from __future__ import absolute_import, division, print_function
 
-from time import sleep
+from collections import deque
+from itertools import islice
+from time import sleep, time
+from uuid import UUID
 
 import click
 import click_spinner
@@ -30,14 +33,14 @@ import csv
 import json
 import pprint
 
-from os import path, makedirs
+from os import path, makedirs, remove, rename
 from datetime import datetime
 
 from multiprocessing.pool import mapstar, RUN, ThreadPool, IMapUnorderedIterator, Pool
 
 from invenio_db import db
 from invenio_files_rest.models import ObjectVersion
-from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_pidstore.models import PersistentIdentifier
 from flask import current_app
 from flask.cli import with_appcontext
 from invenio_records_files.models import RecordsBuckets
@@ -48,10 +51,13 @@ from inspirehep.utils.record_getter import (
     get_db_record,
     get_db_records,
     get_es_record,
+    get_query_db_records,
     RecordGetterError,
+    stream_db_records,
 )
+from inspirehep.modules.records.api import rebuild_citations_count
 from inspirehep.modules.records.checkers import check_unlinked_references
-from inspirehep.modules.records.tasks import batch_reindex
+from inspirehep.modules.records.tasks import batch_refresh_ui_display, batch_reindex
 
 from invenio_records.models import RecordMetadata
 from inspirehep.modules.search.api import LiteratureSearch
@@ -120,17 +126,157 @@ def get_query_records_to_index(pid_types):
         pid_types(List[str]): a list of pid types
 
     Return:
-        SQLAlchemy query for non deleted record with pid type in `pid_types`
+        SQLAlchemy query for non deleted record with pid type in `pid_types`,
+        whose first column is the record UUID.
     """
-    query = (
-        db.session.query(PersistentIdentifier.object_uuid).filter(
-            PersistentIdentifier.pid_type.in_(pid_types),
-            PersistentIdentifier.object_type == 'rec',
-            PersistentIdentifier.status == PIDStatus.REGISTERED,
-            # noqa: F401
-        )
+    return get_query_db_records(pid_types, fields=[], only_registered=True)
+
+
+def get_uuid_partitions(partitions):
+    """Split the UUID space in contiguous ranges of the same size.
+
+    Args:
+        partitions(int): number of ranges.
+
+    Return:
+        List[Tuple[Optional[UUID], Optional[UUID]]]: the ``(lower, upper)``
+        bounds of each range, lower included and upper excluded. ``None``
+        stands for an unbounded side.
+    """
+    step = 2 ** 128 // partitions
+    bounds = [None] + [UUID(int=index * step) for index in range(1, partitions)] + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def get_keyset_batches_to_index(pid_type, batch_size, lower=None, upper=None, start_after=None):
+    """Yield batches of UUIDs of records to index, in UUID order.
+
+    Each batch is fetched with its own keyset query, starting right after the
+    last UUID of the previous batch, so that the scan can be resumed from any
+    of the UUIDs it yields.
+
+    Args:
+        pid_type(str): pid type of the records.
+        batch_size(int): number of UUIDs per batch.
+        lower(Optional[UUID]): smallest UUID to yield.
+        upper(Optional[UUID]): UUIDs are yielded up to this one, excluded.
+        start_after(Optional[str]): only UUIDs after this one are yielded.
+
+    Yields:
+        List[str]: the UUIDs of a batch.
+    """
+    if not start_after and lower and lower.int:
+        start_after = UUID(int=lower.int - 1)
+
+    records = stream_db_records(
+        [pid_type],
+        fields=[],
+        only_registered=True,
+        start_after=start_after,
+        end_before=upper,
+        page_size=batch_size,
     )
-    return query
+    batch = [str(record.id) for record in islice(records, batch_size)]
+    while batch:
+        yield batch
+        batch = [str(record.id) for record in islice(records, batch_size)]
+
+
+class IndexingCheckpoint(object):
+    """Position reached by ``simpleindex`` in each of the scanned partitions.
+
+    The position of a partition moves past a batch only when that batch and
+    all the previous batches of the same partition were indexed without any
+    failure, so that resuming from the checkpoint never skips a record. The
+    position of a partition stays before its first failed batch.
+    """
+
+    def __init__(self, checkpoint_path):
+        self.checkpoint_path = checkpoint_path
+        self.positions = {}
+        self._tasks = {}
+
+        if path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint_file:
+                self.positions = json.load(checkpoint_file)
+
+    def get(self, key):
+        """Return the last UUID indexed in the partition ``key``."""
+        return self.positions.get(key)
+
+    def add_batch(self, key, task, last_uuid):
+        """Track a batch sent for indexing in the partition ``key``."""
+        self._tasks.setdefault(key, deque()).append((task, last_uuid))
+
+    def update(self):
+        """Move the positions past the successful batches and save them."""
+        updated = False
+        for key, tasks in self._tasks.items():
+            while tasks and tasks[0][0].ready() and self._is_successful(tasks[0][0]):
+                _, self.positions[key] = tasks.popleft()
+                updated = True
+
+        if updated:
+            self.save()
+
+    @staticmethod
+    def _is_successful(task):
+        return task.successful() and not task.result['failures']
+
+    def save(self):
+        _prepare_logdir(self.checkpoint_path)
+        tmp_path = '{}.tmp'.format(self.checkpoint_path)
+        with open(tmp_path, 'w') as checkpoint_file:
+            json.dump(self.positions, checkpoint_file)
+        rename(tmp_path, self.checkpoint_path)
+
+    def clear(self):
+        if path.exists(self.checkpoint_path):
+            remove(self.checkpoint_path)
+
+
+class IndexingStats(object):
+    """Throughput, latency and failure rate of the finished indexing batches."""
+
+    def __init__(self):
+        self.start_time = time()
+        self.successes = 0
+        self.failures = 0
+        self.batch_errors = 0
+        self.bulk_times = []
+
+    def add_result(self, result):
+        self.successes += result['success']
+        self.failures += len(result['failures'])
+        if 'took' in result:
+            self.bulk_times.append(result['took'])
+
+    def add_batch_error(self):
+        self.batch_errors += 1
+
+    def percentile(self, percent):
+        """Return the bulk request latency below which are ``percent`` % of them."""
+        if not self.bulk_times:
+            return 0.0
+        bulk_times = sorted(self.bulk_times)
+        index = int(round(percent / 100 * (len(bulk_times) - 1)))
+        return bulk_times[index]
+
+    def __str__(self):
+        elapsed = (time() - self.start_time) or 1
+        processed = self.successes + self.failures
+        failure_rate = 100 * self.failures / processed if processed else 0.0
+        return (
+            '{docs_per_sec:.1f} docs/sec, bulk latency p50 {p50:.2f}s p90 {p90:.2f}s'
+            ' p99 {p99:.2f}s, {failure_rate:.2f}% failed, {batch_errors} batches errored'.format(
+                docs_per_sec=processed / elapsed,
+                p50=self.percentile(50),
+                p90=self.percentile(90),
+                p99=self.percentile(99),
+                failure_rate=failure_rate,
+                batch_errors=self.batch_errors,
+            )
+        )
 
 
 def _dump_errors_to_file(errors, log_file_path, tasks_uuids, msg='Check errors in log file'):
@@ -172,13 +318,24 @@ def _dump_errors_to_file(errors, log_file_path, tasks_uuids, msg='Check errors i
 @click.option('-s', '--batch-size', default=200)
 @click.option('-q', '--queue-name', default='indexer_task')
 @click.option('-l', '--log-path', default='/tmp/inspire/')
+@click.option('-c', '--checkpoint-path', default=None)
+@click.option('-p', '--partitions', default=1)
+@click.option('-m', '--max-pending-tasks', default=100)
 @with_appcontext
-def simpleindex(yes_i_know, pid_type, batch_size, queue_name, log_path):
+def simpleindex(yes_i_know, pid_type, batch_size, queue_name, log_path,
+                checkpoint_path, partitions, max_pending_tasks):
     """Bulk reindex all records in a parallel manner.
 
     Indexes in batches all articles belonging to the given pid_types.
     Indexing errors are saved in the log_path folder.
 
+    If a checkpoint path is given, the indexing is resumable: the records of
+    each pid type are scanned in UUID order, split in ``partitions`` ranges
+    scanned in parallel, and the position reached in each range is saved in
+    the checkpoint file. Running the command again with the same checkpoint
+    path and partitions continues from there. The throughput is reported
+    while the indexing runs.
+
     Args:
         yes_i_know (bool): if True, skip confirmation screen
         pid_type (List[str]): array of PID types, allowed: lit, con, exp, jou,
@@ -186,6 +343,12 @@ def simpleindex(yes_i_know, pid_type, batch_size, queue_name, log_path):
         batch_size (int): number of documents per batch sent to workers.
         queue_name (str): name of the celery queue
         log_path (str): path of the indexing logs
+        checkpoint_path (str): path of the checkpoint file of the resumable
+            indexing.
+        partitions (int): number of UUID ranges per pid type scanned in
+            parallel by the resumable indexing.
+        max_pending_tasks (int): maximum number of batches being indexed at
+            the same time by the resumable indexing.
 
     Returns:
         None
@@ -198,70 +361,118 @@ def simpleindex(yes_i_know, pid_type, batch_size, queue_name, log_path):
 
     click.secho('Sending record UUIDs to the indexing queue...', fg='green')
 
-    query = get_query_records_to_index(pid_type)
-
     request_timeout = current_app.config.get('INDEXER_BULK_REQUEST_TIMEOUT')
-    all_tasks = []
     uuid_records_per_tasks = {}
-
-    with click.progressbar(
-        query.yield_per(2000),
-        length=query.count(),
-        label='Scheduling indexing tasks'
-    ) as items:
-        batch = next_batch(items, batch_size)
-
-        while batch:
-            uuids = [str(item[0]) for item in batch]
-            indexer_task = batch_reindex.apply_async(
-                kwargs={
-                    'uuids': uuids,
-                    'request_timeout': request_timeout,
-                },
-                queue=queue_name,
-            )
-
-            uuid_records_per_tasks[indexer_task.id] = uuids
-            all_tasks.append(indexer_task)
-            batch = next_batch(items, batch_size)
-
-    click.secho('Created {} tasks.'.format(len(all_tasks)), fg='green')
-
-    with click.progressbar(
-        length=len(all_tasks),
-        label='Indexing records'
-    ) as progressbar:
-        def _finished_tasks_count():
-            return len(filter(lambda task: task.ready(), all_tasks))
-
-        while len(all_tasks) != _finished_tasks_count():
-            sleep(0.5)
-            # this is so click doesn't divide by 0:
-            progressbar.pos = _finished_tasks_count() or 1
-            progressbar.update(0)
-
+    stats = IndexingStats()
     failures = []
-    successes = 0
     batch_errors = []
 
-    for task in all_tasks:
+    def _send_batch(uuids):
+        indexer_task = batch_reindex.apply_async(
+            kwargs={
+                'uuids': uuids,
+                'request_timeout': request_timeout,
+            },
+            queue=queue_name,
+        )
+        uuid_records_per_tasks[indexer_task.id] = uuids
+        return indexer_task
+
+    def _collect_result(task):
         result = task.result
         if task.failed():
             batch_errors.append({
                 'task_id': task.id,
                 'error': result,
             })
+            stats.add_batch_error()
+        else:
+            stats.add_result(result)
+            failures.extend(result['failures'])
+
+    if checkpoint_path:
+        checkpoint = IndexingCheckpoint(checkpoint_path)
+        scanners = deque()
+        for pid_type_ in pid_type:
+            for index, (lower, upper) in enumerate(get_uuid_partitions(partitions)):
+                key = '{}:{}/{}'.format(pid_type_, index, partitions)
+                batches = get_keyset_batches_to_index(
+                    pid_type_, batch_size, lower, upper, checkpoint.get(key))
+                scanners.append((key, batches))
+
+        pending_tasks = []
+        last_report = time()
+        while scanners or pending_tasks:
+            while scanners and len(pending_tasks) < max_pending_tasks:
+                key, batches = scanners.popleft()
+                uuids = next(batches, None)
+                if uuids is None:
+                    continue
+                indexer_task = _send_batch(uuids)
+                checkpoint.add_batch(key, indexer_task, uuids[-1])
+                pending_tasks.append(indexer_task)
+                scanners.append((key, batches))
+
+            sleep(0.5)
+            for task in [task for task in pending_tasks if task.ready()]:
+                pending_tasks.remove(task)
+                _collect_result(task)
+            checkpoint.update()
+
+            if time() - last_report > 10:
+                click.echo(str(stats))
+                last_report = time()
+
+        if failures or batch_errors:
+            click.secho(
+                'Keeping the checkpoint at the first failed batches, run the'
+                ' command again to retry them.',
+                fg='yellow',
+            )
         else:
-            successes += result['success']
-            failures += result['failures']
+            checkpoint.clear()
+    else:
+        query = get_query_records_to_index(pid_type)
+        all_tasks = []
+
+        with click.progressbar(
+            query.yield_per(2000),
+            length=query.count(),
+            label='Scheduling indexing tasks'
+        ) as items:
+            batch = next_batch(items, batch_size)
+
+            while batch:
+                uuids = [str(item[0]) for item in batch]
+                all_tasks.append(_send_batch(uuids))
+                batch = next_batch(items, batch_size)
+
+        click.secho('Created {} tasks.'.format(len(all_tasks)), fg='green')
+
+        with click.progressbar(
+            length=len(all_tasks),
+            label='Indexing records'
+        ) as progressbar:
+            def _finished_tasks_count():
+                return len(filter(lambda task: task.ready(), all_tasks))
+
+            while len(all_tasks) != _finished_tasks_count():
+                sleep(0.5)
+                # this is so click doesn't divide by 0:
+                progressbar.pos = _finished_tasks_count() or 1
+                progressbar.update(0)
+
+        for task in all_tasks:
+            _collect_result(task)
 
     color = 'red' if failures or batch_errors else 'green'
     click.secho(
         'Reindexing finished: {} failed, {} succeeded, additionally {} batches errored.'.format(
-            len(failures), successes, len(batch_errors),
+            len(failures), stats.successes, len(batch_errors),
         ),
         fg=color,
     )
+    click.secho(str(stats), fg=color)
 
     failures_log_path = path.join(log_path, 'records_index_failures.log')
     errors_log_path = path.join(log_path, 'records_index_errors.log')
@@ -270,6 +481,81 @@ def simpleindex(yes_i_know, pid_type, batch_size, queue_name, log_path):
     _dump_errors_to_file(batch_errors, errors_log_path, uuid_records_per_tasks, msg='Failed batches')
 
 
+@click.group()
+def citations():
+    """Commands to manage the stored citations counts"""
+
+
+@citations.command()
+@click.option('--yes-i-know', is_flag=True)
+@click.option('-t', '--pid-type', multiple=True, default=['lit', 'dat'])
+@with_appcontext
+def rebuild(yes_i_know, pid_type):
+    """Recompute the stored citations count of all records.
+
+    The new counts reach ES only once the records are reindexed, for example
+    with ``inspirehep simpleindex``.
+
+    Args:
+        yes_i_know (bool): if True, skip confirmation screen
+        pid_type (List[str]): array of PID types of the cited records.
+
+    Returns:
+        None
+    """
+    if not yes_i_know:
+        click.confirm(
+            'Do you really want to recompute all the citations counts?',
+            abort=True,
+        )
+
+    with click_spinner.spinner():
+        click.echo('Counting citations...')
+        count = rebuild_citations_count(pid_type)
+        db.session.commit()
+
+    click.secho('Stored the citations count of {} records.'.format(count), fg='green')
+
+
+@click.group()
+def ui_display():
+    """Commands to manage the ``_ui_display`` of the literature records"""
+
+
+@ui_display.command()
+@click.option('-s', '--batch-size', default=200)
+@with_appcontext
+def refresh(batch_size):
+    """Reindex the literature records whose ``_ui_display`` is outdated.
+
+    Only the records for which the fields read by the UI display changed
+    since they were last indexed are reindexed, for example after a change
+    of the citations counts or of the stored records that was not indexed.
+
+    Args:
+        batch_size (int): number of records checked at once.
+
+    Returns:
+        None
+    """
+    checked = refreshed = 0
+    failures = []
+
+    with click_spinner.spinner():
+        for batch in get_keyset_batches_to_index('lit', batch_size):
+            result = batch_refresh_ui_display(batch)
+            checked += result['checked']
+            refreshed += result['refreshed']
+            failures.extend(result['failures'])
+
+    color = 'red' if failures else 'green'
+    click.secho(
+        'Checked {} records, refreshed the UI display of {} of them, {} failed.'.format(
+            checked, refreshed, len(failures)),
+        fg=color,
+    )
+
+
 @click.command()
 @click.option('--remove-no-control-number', is_flag=True)
 @click.option('--remove-duplicates', is_flag=True)
@@ -449,16 +735,29 @@ def _prepare_logdir(log_path):
         makedirs(path.dirname(log_path))
 
 
-def _gen_query(query, page_start=1, page_end=-1, window_size=100):
-    query = query.paginate(page_start, window_size)
-    while query and (page_start <= page_end or page_end == -1):
-        for item in query.items:
-            yield item
-        if query.has_next:
-            query = query.next()
-            page_start += 1
-        else:
-            query = None
+def _gen_records(fields, page_start=1, page_end=-1, window_size=100):
+    """Stream the literature records in the given pages.
+
+    Pages are only used to select which part of the records to process: the
+    uuid before ``page_start`` is looked up with a single query reading no
+    JSON, and the records are then read from there through a keyset
+    paginated stream which fetches only the given ``fields`` of their JSON.
+    Only the records with a registered PID are streamed, so that each one
+    appears once.
+    """
+    start_after = None
+    if page_start > 1:
+        start_after = get_query_db_records(['lit'], fields=[], only_registered=True).order_by(
+            RecordMetadata.id
+        ).offset((page_start - 1) * window_size - 1).limit(1).scalar()
+        if start_after is None:
+            return iter([])
+
+    count = (page_end - page_start + 1) * window_size if page_end != -1 else None
+    return islice(
+        stream_db_records(['lit'], fields=fields, only_registered=True, start_after=start_after),
+        count,
+    )
 
 
 class MyThreadPool(ThreadPool):
@@ -491,15 +790,13 @@ def check_missing_records_in_es(data_output):
     _prepare_logdir(data_output)
     click.echo("All missing records pids will be saved in %s file" % data_output)
     missing = 0
-    _query = _gen_query(PersistentIdentifier.query.filter(
-        PersistentIdentifier.pid_type == 'lit'))
+    _query = _gen_records(fields=['deleted'])
     with click.progressbar(_query,
                            length=all_records,
                            label="Processing pids (%s pids)..." % all_records) as pidstore:
         with open(data_output, 'w') as data_file:
             for pid in pidstore:
-                db_rec = get_db_record('lit', pid.pid_value)
-                if db_rec.get('deleted'):
+                if pid.json.get('deleted'):
                     continue
                 try:
                     get_es_record('lit', pid.pid_value)
@@ -566,12 +863,7 @@ def benchmark_citations(from_page, to_page, pagesize, data_output, pool_size):
                     'citations_count']
             out = csv.DictWriter(data_file, keys)
             out.writeheader()
-            _query = _gen_query(
-                PersistentIdentifier.query.filter(PersistentIdentifier.pid_type == 'lit'),
-                from_page,
-                to_page,
-                pagesize
-            )
+            _query = _gen_records([], from_page, to_page, pagesize)
 
             _threads_pool = MyThreadPool(pool_size)
             _threads = _threads_pool.imap_unordered(_benchmark_record, _query,
@@ -612,12 +904,12 @@ def _process_record(pid, app):
         es_cits = None
         es_citation_count_field = None
         data = {}
-        rec = get_db_record('lit', pid.pid_value)
-        if rec.get('deleted'):
+        if pid.json.get('deleted'):
             success = True
             deleted = True
         if not deleted:
             try:
+                rec = get_db_record('lit', pid.pid_value)
                 es_cits = LiteratureSearch.citations(rec).total
                 search = LiteratureSearch().source(includes=['citation_count'])
                 results = search.get_record(rec.id).execute()
@@ -679,12 +971,7 @@ def find_citations_inconsistencies(from_page, to_page, pagesize, output, pool_si
                     'es_citations_count', 'es_citations_field']
             out_data = csv.DictWriter(data_file, keys)
             out_data.writeheader()
-            _query = _gen_query(
-                PersistentIdentifier.query.filter(PersistentIdentifier.pid_type == 'lit'),
-                from_page,
-                to_page,
-                pagesize
-            )
+            _query = _gen_records(['deleted'], from_page, to_page, pagesize)
             _threads_pool = MyThreadPool(pool_size)
             _threads = _threads_pool.imap_unordered(_process_record, _query,
                                                     current_app._get_current_object())
@@ -24,7 +24,7 @@
 
 from __future__ import absolute_import, division, print_function
 
-from .cli import check, simpleindex, handle_duplicates
+from .cli import check, citations, simpleindex, handle_duplicates, ui_display
 
 
 class InspireRecords(object):
@@ -34,7 +34,9 @@ class InspireRecords(object):
 
     def init_app(self, app):
         app.cli.add_command(check)
+        app.cli.add_command(citations)
         app.cli.add_command(simpleindex)
+        app.cli.add_command(ui_display)
         app.cli.add_command(handle_duplicates)
         app.extensions['inspire-records'] = self
 
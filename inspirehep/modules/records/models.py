@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Extra models for records."""
+
+from __future__ import absolute_import, division, print_function
+
+from datetime import datetime
+
+from sqlalchemy_utils.types import UUIDType
+
+from invenio_db import db
+
+
+class RecordCitationsCount(db.Model):
+    """Materialized citations count of a record.
+
+    The rows are kept up to date by
+    ``inspirehep.modules.records.tasks.index_modified_citations_from_record``
+    and can be rebuilt in bulk with ``inspirehep citations rebuild``.
+    """
+
+    __tablename__ = 'records_citations_count'
+
+    record_id = db.Column(
+        UUIDType,
+        db.ForeignKey('records_metadata.id', ondelete='CASCADE'),
+        primary_key=True,
+    )
+    citation_count = db.Column(db.Integer, default=0, nullable=False)
+    updated = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
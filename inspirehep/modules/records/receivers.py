@@ -46,10 +46,11 @@ from inspirehep.modules.orcid import (
 )
 from inspirehep.modules.orcid.utils import get_orcids_for_push
 from inspirehep.modules.pidstore.utils import get_pid_type_from_schema
-from inspirehep.modules.records.api import InspireRecord
+from inspirehep.modules.records.api import InspireRecord, get_ui_display_linked_revisions
 from inspirehep.modules.records.errors import MissingInspireRecordError
 from inspirehep.modules.records.serializers.schemas.json import RecordMetadataSchemaV1
 from inspirehep.modules.records.tasks import index_modified_citations_from_record
+from inspirehep.modules.search.cache import bump_search_generations
 from inspirehep.modules.records.utils import (
     is_author,
     is_book,
@@ -76,7 +77,7 @@ from inspirehep.modules.records.utils import (
     populate_facet_author_name,
     populate_ui_display,
 )
-from invenio_indexer.api import RecordIndexer
+from invenio_indexer.api import RecordIndexer, current_record_to_index
 
 LOGGER = logging.getLogger(__name__)
 
@@ -115,6 +116,16 @@ def push_to_orcid(sender, record, *args, **kwargs):
 
     kwargs_to_pusher = dict(record_db_version=record.model.version_id)
 
+    if current_app.config['FEATURE_FLAG_ENABLE_ORCID_PUSH_QUEUE']:
+        for orcid, access_token in orcids_and_tokens:
+            orcid_tasks.enqueue_orcid_push(
+                orcid,
+                record['control_number'],
+                access_token,
+                record_db_version=record.model.version_id,
+            )
+        return
+
     for orcid, access_token in orcids_and_tokens:
         orcid_tasks.orcid_push.apply_async(
             queue='orcid_push',
@@ -146,6 +157,7 @@ def index_after_commit(sender, changes):
     has been really committed to the DB.
     """
     indexer = RecordIndexer()
+    indexes = set()
     for model_instance, change in changes:
         if isinstance(model_instance, RecordMetadata):
             if change in ('insert', 'update') and not model_instance.json.get("deleted"):
@@ -164,14 +176,19 @@ def index_after_commit(sender, changes):
                                  model_instance.json.get("id"))
                     pass
 
+            index, _ = current_record_to_index(model_instance.json)
+            indexes.add(index)
+
             pid_type = get_pid_type_from_schema(model_instance.json['$schema'])
             pid_value = model_instance.json['control_number']
             db_version = model_instance.version_id
 
             index_modified_citations_from_record.delay(pid_type, pid_value, db_version)
 
+    bump_search_generations(indexes)
 
-def enhance_before_index(record):
+
+def enhance_before_index(record, prefetched=None):
     """Run all the receivers that enhance the record for ES in the right order.
 
     .. note::
@@ -180,7 +197,15 @@ def enhance_before_index(record):
        because the latter puts a JSON reference in a completion _source, which
        would be expanded to an incorrect ``_source_recid`` by the former.
 
+    Args:
+        record (InspireRecord): the record to enhance.
+        prefetched (Optional[dict]): data shared by a batch of records, as
+            returned by ``prefetch_enhancement_data``, so that the receivers
+            don't need to query it record by record.
     """
+    prefetched = prefetched or {}
+    citations_counts = prefetched.get('citations_counts')
+
     populate_recid_from_ref(record)
 
     if is_hep(record):
@@ -191,9 +216,18 @@ def enhance_before_index(record):
         populate_inspire_document_type(record)
         populate_name_variations(record)
         populate_number_of_references(record)
-        populate_citations_count(record)
-        populate_facet_author_name(record)
-        populate_ui_display(record, RecordMetadataSchemaV1)
+        populate_citations_count(record, citations_counts)
+        populate_facet_author_name(record, prefetched.get('linked_authors'))
+        indexed_ui_display = prefetched.get('indexed_ui_displays', {}).get(record.get('control_number'))
+        linked_revisions = prefetched.get('linked_revisions')
+        if linked_revisions is None and indexed_ui_display:
+            linked_revisions = get_ui_display_linked_revisions([record])
+        populate_ui_display(
+            record,
+            RecordMetadataSchemaV1,
+            indexed_ui_display,
+            linked_revisions,
+        )
 
         if is_book(record):
             populate_bookautocomplete(record)
@@ -212,4 +246,4 @@ def enhance_before_index(record):
         populate_title_suggest(record)
 
     elif is_data(record):
-        populate_citations_count(record)
+        populate_citations_count(record, citations_counts)
@@ -30,6 +30,7 @@ from invenio_records_rest.serializers.json import JSONSerializer
 from .json_literature import (
     LiteratureCitationsJSONSerializer,
     LiteratureJSONUISerializer,
+    LiteratureReferencesJSONSerializer,
     FacetsJSONUISerializer
 )
 from .pybtex_serializer_base import PybtexSerializerBase
@@ -66,7 +67,7 @@ json_literature_ui_v1_response = record_responsify_nocache(
     'application/vnd+inspire.literature.ui+json'
 )
 
-json_literature_references_v1 = JSONSerializer(
+json_literature_references_v1 = LiteratureReferencesJSONSerializer(
     LiteratureReferencesSchemaJSONUIV1
 )
 json_literature_references_v1_search = search_responsify(
@@ -121,7 +122,7 @@ json_authors_ui_v1_response = record_responsify_nocache(
     'application/vnd+inspire.literature.ui+json'
 )
 
-bibtex_v1 = PybtexSerializerBase(PybtexSchema(), BibtexWriter())
+bibtex_v1 = PybtexSerializerBase(PybtexSchema(), BibtexWriter(), export_format='bibtex')
 marcxml_v1 = MARCXMLSerializer()
 latex_v1_EU = LatexSerializer('EU', schema_class=LatexSchema)
 latex_v1_US = LatexSerializer('US', schema_class=LatexSchema)
@@ -139,3 +140,17 @@ bibtex_v1_search = search_responsify(bibtex_v1, 'application/x-bibtex')
 marcxml_v1_search = search_responsify(marcxml_v1, 'application/marcxml+xml')
 latex_v1_search_eu = search_responsify(latex_v1_EU, 'application/vnd.eu+x-latex')
 latex_v1_search_us = search_responsify(latex_v1_US, 'application/vnd.us+x-latex')
+
+
+def fill_export_cache(records):
+    """Cache the exports of the given literature records in all formats.
+
+    Args:
+        records(List[InspireRecord]): the records to export.
+    """
+    records = [
+        (record.get('control_number'), str(record.id), record.revision_id, record)
+        for record in records
+    ]
+    for serializer in (bibtex_v1, latex_v1_EU, latex_v1_US):
+        serializer.serialize_records(records)
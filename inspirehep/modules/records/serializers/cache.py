@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+"""Cache of the records exported by the serializers."""
+
+from __future__ import absolute_import, division, print_function
+
+from flask import current_app
+from invenio_cache import current_cache
+
+EXPORT_CACHE_KEY = 'records:export:{format}:{control_number}:{uuid}:{revision}'
+
+
+def get_export_cache_key(export_format, control_number, uuid, revision):
+    """Return the cache key of a record exported in the given format.
+
+    Args:
+        export_format(str): the name of the export format.
+        control_number(int): the control number of the record.
+        uuid(str): the UUID of the record.
+        revision(int): the revision of the record.
+
+    Returns:
+        Optional[str]: the key, or ``None`` if the record can't be cached
+        because its UUID or revision are unknown.
+    """
+    if control_number is None or uuid is None or revision is None:
+        return None
+    return EXPORT_CACHE_KEY.format(
+        format=export_format,
+        control_number=control_number,
+        uuid=uuid,
+        revision=revision,
+    )
+
+
+def serialize_with_cache(export_format, records, serialize_record):
+    """Serialize records, reusing the cached exports of their revision.
+
+    All the cached exports are fetched with a single request, and the
+    missing ones are stored with a single request too.
+
+    Args:
+        export_format(str): the name of the export format.
+        records(Iterable[Tuple[int, str, int, Any]]): the control number,
+            UUID, revision and data of each record.
+        serialize_record(Callable): function serializing the data of a
+            record.
+
+    Returns:
+        list: the result of ``serialize_record`` for each record, in order.
+    """
+    records = list(records)
+    keys = [
+        get_export_cache_key(export_format, control_number, uuid, revision)
+        for control_number, uuid, revision, _ in records
+    ]
+    cacheable_keys = [key for key in keys if key]
+    cached = dict(zip(cacheable_keys, current_cache.get_many(*cacheable_keys))) if cacheable_keys else {}
+
+    results = []
+    missing = {}
+    for key, (_, _, _, data) in zip(keys, records):
+        result = cached.get(key)
+        if result is None:
+            result = serialize_record(data)
+            if key:
+                missing[key] = result
+        results.append(result)
+
+    if missing:
+        current_cache.set_many(
+            missing,
+            timeout=current_app.config['RECORDS_EXPORT_CACHE_TIMEOUT'],
+        )
+
+    return results
@@ -29,8 +29,21 @@ import json
 from invenio_records_rest.serializers.json import JSONSerializer
 
 from inspire_utils.date import format_date
+from inspirehep.modules.records.serializers.linked_records import add_linked_records
+from inspirehep.modules.records.serializers.schemas.json.literature.common.accelerator_experiment import (
+    EXPERIMENT_RECORD_FIELDS,
+)
+from inspirehep.modules.records.serializers.schemas.json.literature.common.reference_item import (
+    REFERENCE_RECORD_FIELDS,
+)
 from inspirehep.modules.records.wrappers import LiteratureRecord
 
+LINKED_RECORDS_FIELDS = {
+    'accelerator_experiments.record': EXPERIMENT_RECORD_FIELDS,
+    'references.record': REFERENCE_RECORD_FIELDS,
+}
+"""Fields needed from the records linked from the serialized literature."""
+
 
 def _get_ui_metadata(record):
     """Record extra metadata for the UI.
@@ -80,7 +93,33 @@ def _preprocess_result(result, original_record=None):
     return result
 
 
-class LiteratureJSONUISerializer(JSONSerializer):
+class LinkedRecordsSerializerMixin(object):
+    """Fetch the records linked from all the serialized records at once.
+
+    The links of the records are registered with the linked records resolver
+    of the request before they are dumped, so that the schemas resolving them
+    share a single query.
+    """
+
+    def serialize(self, pid, record, links_factory=None, **kwargs):
+        add_linked_records([record], LINKED_RECORDS_FIELDS)
+        return super(LinkedRecordsSerializerMixin, self).serialize(
+            pid, record, links_factory=links_factory, **kwargs
+        )
+
+    def serialize_search(self, pid_fetcher, search_result, links=None,
+                         item_links_factory=None, **kwargs):
+        add_linked_records(
+            (hit['_source'] for hit in search_result['hits']['hits']),
+            LINKED_RECORDS_FIELDS,
+        )
+        return super(LinkedRecordsSerializerMixin, self).serialize_search(
+            pid_fetcher, search_result, links=links,
+            item_links_factory=item_links_factory, **kwargs
+        )
+
+
+class LiteratureJSONUISerializer(LinkedRecordsSerializerMixin, JSONSerializer):
     """JSON brief format serializer."""
 
     def preprocess_record(self, pid, record, links_factory=None, **kwargs):
@@ -97,6 +136,10 @@ class LiteratureJSONUISerializer(JSONSerializer):
         return _preprocess_result(result)
 
 
+class LiteratureReferencesJSONSerializer(LinkedRecordsSerializerMixin, JSONSerializer):
+    """JSON serializer of the references of literature records."""
+
+
 class LiteratureCitationsJSONSerializer(JSONSerializer):
 
     def preprocess_record(self, pid, record, links_factory=None, **kwargs):
@@ -30,6 +30,26 @@ import jinja2
 import os
 import pkg_resources
 
+from .cache import serialize_with_cache
+
+try:
+    from functools import lru_cache
+except ImportError:
+    from functools32 import lru_cache
+
+
+@lru_cache()
+def get_latex_template():
+    """Return the LaTeX template, compiled once per process."""
+    latex_jinja_env = jinja2.Environment(
+        variable_start_string='\VAR{',
+        variable_end_string='}',
+        loader=jinja2.FileSystemLoader(os.path.abspath('/'))
+    )
+    template_path = pkg_resources.resource_filename('inspirehep', 'modules/records/serializers/templates/latex_template.tex')
+
+    return latex_jinja_env.get_template(template_path)
+
 
 class LatexSerializer(MarshmallowMixin, PreprocessorMixin):
     """Latex serializer for records."""
@@ -46,8 +66,38 @@ class LatexSerializer(MarshmallowMixin, PreprocessorMixin):
         :param record: Record instance.
         :param links_factory: Factory function for record links.
         """
-        data = self.transform_record(pid, record, links_factory, **kwargs)
+        return serialize_with_cache(
+            self.export_format,
+            [(
+                record.get('control_number'),
+                getattr(record, 'id', None),
+                self.get_cache_revision(getattr(record, 'revision_id', None), record),
+                record,
+            )],
+            lambda record: self.render(self.transform_record(pid, record, links_factory, **kwargs)),
+        )[0]
+
+    def get_cache_revision(self, revision, record):
+        """Return the revision of the cached export of a record.
+
+        The export ends with the citation count of the record and the current
+        date, which change without a new revision of the record, so both are
+        part of the revision of the export.
+        """
+        if revision is None:
+            return None
+        schema = self.schema_class()
+        return '{}:{}:{}'.format(
+            revision,
+            schema.get_citations(record),
+            schema.get_current_date(record),
+        )
+
+    @property
+    def export_format(self):
+        return 'latex_{}'.format(self.format)
 
+    def render(self, data):
         return self.latex_template().render(data=data, format=self.format)
 
     def preprocess_record(self, pid, record, links_factory=None, **kwargs):
@@ -55,16 +105,7 @@ class LatexSerializer(MarshmallowMixin, PreprocessorMixin):
         return record
 
     def latex_template(self):
-        latex_jinja_env = jinja2.Environment(
-            variable_start_string='\VAR{',
-            variable_end_string='}',
-            loader=jinja2.FileSystemLoader(os.path.abspath('/'))
-        )
-        template_path = pkg_resources.resource_filename('inspirehep', 'modules/records/serializers/templates/latex_template.tex')
-
-        template = latex_jinja_env.get_template(template_path)
-
-        return template
+        return get_latex_template()
 
     def serialize_search(self, pid_fetcher, search_result, links=None,
                          item_links_factory=None):
@@ -78,6 +119,32 @@ class LatexSerializer(MarshmallowMixin, PreprocessorMixin):
         Returns:
             str: serialized search result(s)
         """
-        records = (self.dump(hit['_source']) for hit in search_result['hits']['hits'])
-        templates = [self.latex_template().render(data=data, format=self.format) for data in records]
+        return self.serialize_records(
+            (
+                hit['_source'].get('control_number'),
+                hit.get('_id'),
+                hit.get('_version'),
+                hit['_source'],
+            )
+            for hit in search_result['hits']['hits']
+        )
+
+    def serialize_records(self, records):
+        """Serialize records, reusing their cached exports.
+
+        Args:
+            records(Iterable[Tuple[int, str, int, dict]]): the control number,
+                UUID, revision and metadata of each record.
+
+        Returns:
+            str: serialized records.
+        """
+        templates = serialize_with_cache(
+            self.export_format,
+            (
+                (control_number, uuid, self.get_cache_revision(revision, record), record)
+                for control_number, uuid, revision, record in records
+            ),
+            lambda record: self.render(self.dump(record)),
+        )
         return u'\n\n'.join(templates)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+"""Resolution of the records linked from the serialized records."""
+
+from __future__ import absolute_import, division, print_function
+
+from flask import _request_ctx_stack, has_request_context
+
+from inspire_utils.helpers import force_list
+from inspire_utils.record import get_value
+
+from inspirehep.modules.records.utils import get_pid_from_record_uri
+from inspirehep.utils.record_getter import get_db_records_projection
+
+
+class LinkedRecordsResolver(object):
+    """Fetch the records linked from a serialization pass in one query.
+
+    The references to linked records can be registered with ``add`` before
+    they are needed, so that the first call to ``resolve`` fetches all of them
+    at once. Only the requested fields of the linked records are fetched, and
+    the records already fetched are not fetched again.
+    """
+
+    def __init__(self):
+        self._pending = set()
+        self._records = {}
+
+    def add(self, refs, fields):
+        """Register references to be fetched by the next ``resolve``.
+
+        Args:
+            refs(Iterable[str]): the URIs of the linked records.
+            fields(Iterable[str]): the dotted paths of the fields needed from
+                the linked records.
+        """
+        fields = frozenset(fields)
+        for ref in refs:
+            pid = get_pid_from_record_uri(ref)
+            if pid and (pid, fields) not in self._records:
+                self._pending.add((pid, fields))
+
+    def resolve(self, refs, fields):
+        """Get the linked records.
+
+        Args:
+            refs(Iterable[str]): the URIs of the linked records.
+            fields(Iterable[str]): the dotted paths of the fields needed from
+                the linked records.
+
+        Returns:
+            dict: a copy of each linked record found in the database, keyed by
+            its URI. The records may contain more than the requested fields.
+        """
+        refs = list(refs)
+        self.add(refs, fields)
+        if self._pending:
+            self._fetch_pending()
+
+        fields = frozenset(fields)
+        resolved = {}
+        for ref in refs:
+            record = self._records.get((get_pid_from_record_uri(ref), fields))
+            if record is not None:
+                resolved[ref] = dict(record)
+        return resolved
+
+    def _fetch_pending(self):
+        pids = set(pid for pid, _ in self._pending)
+        fields = sorted(set().union(*(fields for _, fields in self._pending)))
+        records = get_db_records_projection(pids, fields)
+        for pid, fields in self._pending:
+            self._records[(pid, fields)] = records.get(pid)
+        self._pending.clear()
+
+
+def get_linked_records_resolver():
+    """Get the linked records resolver of the current request.
+
+    Returns:
+        LinkedRecordsResolver: the resolver shared by all the serializations
+        of the current request, or a new resolver outside of a request.
+    """
+    if not has_request_context():
+        return LinkedRecordsResolver()
+
+    request_ctx = _request_ctx_stack.top
+    resolver = getattr(request_ctx, 'linked_records_resolver', None)
+    if resolver is None:
+        resolver = request_ctx.linked_records_resolver = LinkedRecordsResolver()
+    return resolver
+
+
+def add_linked_records(records, fields_by_path):
+    """Register the records linked from several records before serializing them.
+
+    Args:
+        records(Iterable[dict]): the records about to be serialized.
+        fields_by_path(dict): the fields needed from the linked records,
+            keyed by the dotted path of the links in the records, e.g.
+            ``'references.record'``.
+    """
+    resolver = get_linked_records_resolver()
+    records = list(records)
+    for field_path, fields in fields_by_path.items():
+        full_path = '.'.join([field_path, '$ref'])
+        resolver.add(
+            (ref for record in records for ref in force_list(get_value(record, full_path, []))),
+            fields,
+        )
@@ -44,5 +44,15 @@ class MARCXMLSerializer(object):
 
     def serialize_search(self, pid_fetcher, search_result, links=None, item_links_factory=None):
         """Serialize a search result as MARCXML."""
-        result = [record2marcxml(el['_source']) for el in search_result['hits']['hits']]
-        return MARCXML_TEMPLATE.format(''.join(result))
+        return MARCXML_TEMPLATE.format(self.serialize_records(
+            (None, None, None, el['_source']) for el in search_result['hits']['hits']
+        ))
+
+    def serialize_records(self, records):
+        """Serialize records as MARCXML, without the enclosing collection.
+
+        Args:
+            records(Iterable[Tuple[int, str, int, dict]]): the control number,
+                UUID, revision and metadata of each record.
+        """
+        return ''.join(record2marcxml(record) for _, _, _, record in records)
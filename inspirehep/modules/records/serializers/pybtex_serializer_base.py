@@ -26,13 +26,20 @@ from __future__ import absolute_import, division, print_function
 
 from pybtex.database import BibliographyData
 
+from .cache import serialize_with_cache
+
 
 class PybtexSerializerBase(object):
-    """Pybtex serializer for records."""
+    """Pybtex serializer for records.
+
+    If ``export_format`` is given, the serialized records are cached by
+    revision under this name.
+    """
 
-    def __init__(self, schema, writer):
+    def __init__(self, schema, writer, export_format=None):
         self.schema = schema
         self.writer = writer
+        self.export_format = export_format
 
     def create_bibliography_entry(self, record):
         """Get a texkey and bibliography entry for an inspire record.
@@ -67,6 +74,49 @@ class PybtexSerializerBase(object):
         bib_data = BibliographyData(bib_dict)
         return self.writer.to_string(bib_data)
 
+    def create_bibliography_fragment(self, record):
+        """Serialize a single record as a bibliography.
+
+        The bibliography of several records is the concatenation of their
+        fragments, separated by new lines.
+
+        Args:
+            record: A literature record.
+
+        Returns:
+            tuple: the texkey and the serialized record.
+        """
+        texkey, entries = self.create_bibliography_entry(record)
+        return texkey, self.writer.to_string(BibliographyData({texkey: entries}))
+
+    def serialize_records(self, records, texkeys=None):
+        """Create a bibliography, reusing the cached exports of the records.
+
+        Args:
+            records(Iterable[Tuple[int, str, int, dict]]): the control number,
+                UUID, revision and metadata of each record.
+            texkeys(Optional[set]): the texkeys already serialized, e.g. by the
+                previous chunks of a streamed export. The records with one of
+                them are skipped, and it is updated with the new ones.
+
+        Returns:
+            str: a serialized bibliography.
+        """
+        fragments = serialize_with_cache(
+            self.export_format,
+            records,
+            self.create_bibliography_fragment,
+        )
+
+        if texkeys is None:
+            texkeys = set()
+        bibliography = []
+        for texkey, fragment in fragments:
+            if texkey not in texkeys:
+                texkeys.add(texkey)
+                bibliography.append(fragment)
+        return u'\n'.join(bibliography)
+
     def serialize(self, pid, record, links_factory=None):
         """Serialize a single Bibtex record.
 
@@ -78,6 +128,13 @@ class PybtexSerializerBase(object):
         Returns:
             str: single serialized Bibtex record
         """
+        if self.export_format:
+            return self.serialize_records([(
+                record.get('control_number'),
+                getattr(record, 'id', None),
+                getattr(record, 'revision_id', None),
+                record,
+            )])
         return self.create_bibliography([record])
 
     def serialize_search(self, pid_fetcher, search_result, links=None,
@@ -92,5 +149,15 @@ class PybtexSerializerBase(object):
         Returns:
             str: serialized search result(s)
         """
+        if self.export_format:
+            return self.serialize_records(
+                (
+                    hit['_source'].get('control_number'),
+                    hit.get('_id'),
+                    hit.get('_version'),
+                    hit['_source'],
+                )
+                for hit in search_result['hits']['hits']
+            )
         records = [hit['_source'] for hit in search_result['hits']['hits']]
         return self.create_bibliography(records)
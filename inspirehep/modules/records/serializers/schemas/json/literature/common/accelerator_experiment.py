@@ -24,10 +24,17 @@ from __future__ import absolute_import, division, print_function
 
 from marshmallow import Schema, pre_dump, fields
 
-from inspire_dojson.utils import get_recid_from_ref
 from inspire_utils.record import get_value
 from inspire_utils.helpers import force_list
-from inspirehep.modules.records.utils import get_linked_records_in_field
+from inspirehep.modules.records.serializers.linked_records import get_linked_records_resolver
+
+EXPERIMENT_RECORD_FIELDS = [
+    'accelerator',
+    'experiment',
+    'institutions',
+    'legacy_name',
+]
+"""Fields of the linked experiment records used to build their name."""
 
 
 class AcceleratorExperimentSchemaV1(Schema):
@@ -36,8 +43,7 @@ class AcceleratorExperimentSchemaV1(Schema):
 
     @pre_dump(pass_many=True)
     def resolve_experiment_records(self, data, many):
-        experiment_records_map = self.get_control_numbers_to_resolved_experiments_map(
-            data)
+        experiment_records_map = self.get_refs_to_resolved_experiments_map(data)
         if not many:
             return self.get_resolved_record_or_experiment(
                 experiment_records_map, data)
@@ -45,19 +51,16 @@ class AcceleratorExperimentSchemaV1(Schema):
         return [self.get_resolved_record_or_experiment(experiment_records_map, experiment)
                 for experiment in data]
 
-    def get_control_numbers_to_resolved_experiments_map(self, data):
-        data = force_list(data)
-        resolved_records = get_linked_records_in_field(
-            {'accelerator_experiments': data}, 'accelerator_experiments.record'
+    def get_refs_to_resolved_experiments_map(self, data):
+        refs = get_value(
+            {'accelerator_experiments': force_list(data)},
+            'accelerator_experiments.record.$ref',
+            [],
         )
-        return {
-            record['control_number']: record
-            for record in resolved_records
-        }
+        return get_linked_records_resolver().resolve(refs, EXPERIMENT_RECORD_FIELDS)
 
     def get_resolved_record_or_experiment(self, experiment_records_map, experiment):
-        experiment_record_id = get_recid_from_ref(experiment.get('record'))
-        experiment_record = experiment_records_map.get(experiment_record_id)
+        experiment_record = experiment_records_map.get(get_value(experiment, 'record.$ref'))
         return experiment_record or experiment
 
     def get_name(self, item):
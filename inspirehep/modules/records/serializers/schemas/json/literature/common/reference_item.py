@@ -23,11 +23,11 @@
 from __future__ import absolute_import, division, print_function
 
 from marshmallow import Schema, pre_dump, post_dump, fields, missing
-from inspire_dojson.utils import get_recid_from_ref, strip_empty_values
+from inspire_dojson.utils import strip_empty_values
 from inspire_utils.helpers import force_list
 
 from inspirehep.modules.records.serializers.fields import ListWithLimit, NestedWithoutEmptyObjects
-from inspirehep.modules.records.utils import get_linked_records_in_field
+from inspirehep.modules.records.serializers.linked_records import get_linked_records_resolver
 from inspire_utils.record import get_value
 
 from .author import AuthorSchemaV1
@@ -35,6 +35,18 @@ from .collaboration import CollaborationSchemaV1
 from .collaboration_with_suffix import CollaborationWithSuffixSchemaV1
 from .publication_info_item import PublicationInfoItemSchemaV1
 
+REFERENCE_RECORD_FIELDS = [
+    'arxiv_eprints',
+    'authors',
+    'collaborations',
+    'control_number',
+    'dois',
+    'publication_info',
+    'titles',
+    'urls',
+]
+"""Fields of the linked records used by the references."""
+
 
 class ReferenceItemSchemaV1(Schema):
     authors = ListWithLimit(
@@ -55,8 +67,7 @@ class ReferenceItemSchemaV1(Schema):
 
     @pre_dump(pass_many=True)
     def filter_references(self, data, many):
-        reference_records = self.get_resolved_references_by_control_number(
-            data)
+        reference_records = self.get_resolved_references_by_ref(data)
 
         if not many:
             return self.get_resolved_reference(data, reference_records)
@@ -78,23 +89,14 @@ class ReferenceItemSchemaV1(Schema):
         return data
 
     def get_resolved_reference(self, data, reference_records):
-        reference_record_id = self.get_reference_record_id(data)
-        reference_record = reference_records.get(reference_record_id)
+        reference_record = reference_records.get(get_value(data, 'record.$ref'))
         reference = self.get_reference_or_linked_reference_with_label(
             data, reference_record)
         return reference
 
-    def get_reference_record_id(self, data):
-        return get_recid_from_ref(data.get('record'))
-
-    def get_resolved_references_by_control_number(self, data):
-        data = force_list(data)
-        resolved_records = get_linked_records_in_field(
-            {'references': data}, 'references.record')
-        return {
-            record['control_number']: record
-            for record in resolved_records
-        }
+    def get_resolved_references_by_ref(self, data):
+        refs = get_value({'references': force_list(data)}, 'references.record.$ref', [])
+        return get_linked_records_resolver().resolve(refs, REFERENCE_RECORD_FIELDS)
 
     def get_reference_or_linked_reference_with_label(self, data, reference_record):
         if reference_record:
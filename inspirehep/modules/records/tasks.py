@@ -24,53 +24,180 @@
 
 from __future__ import absolute_import, division, print_function
 
+from time import time
+
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from elasticsearch.helpers import bulk
 from flask import current_app
+from redis import StrictRedis
+from redis_lock import Lock
 from sqlalchemy import tuple_
-from sqlalchemy.orm.exc import NoResultFound, StaleDataError
+from sqlalchemy.orm.exc import StaleDataError
 
 from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier
 from invenio_search import current_search_client as es
 
-from inspirehep.modules.records.api import InspireRecord
+from inspirehep.modules.records.api import (
+    InspireRecord,
+    prefetch_enhancement_data,
+    update_citations_count,
+)
 from inspirehep.modules.records.errors import MissingCitedRecordError
+from inspirehep.modules.records.utils import is_hep
+from inspirehep.modules.search.cache import bump_search_generations
 from inspirehep.utils.record import create_index_op
 from inspirehep.utils.record_getter import get_db_record, RecordGetterError
 
 logger = get_task_logger(__name__)
 
+PENDING_CITATIONS_REINDEX_KEY = 'records:citations_reindex:pending'
+PROCESSING_CITATIONS_REINDEX_KEY = 'records:citations_reindex:processing'
+CITATIONS_REINDEX_STATS_KEY = 'records:citations_reindex:stats'
+
+
+def _get_redis():
+    return StrictRedis.from_url(current_app.config.get('CACHE_REDIS_URL'))
+
+
+def queue_citations_reindex(uuids):
+    """Add records to the set of records to be reindexed together.
+
+    Records that are already waiting to be reindexed are added only once, and
+    the number of reindexes saved this way is counted in the
+    ``records:citations_reindex:stats`` hash.
+
+    Args:
+        uuids(List[str]): uuids of the records to reindex.
+
+    Returns:
+        int: the number of records that were not already waiting.
+    """
+    redis = _get_redis()
+    with redis.pipeline() as pipe:
+        pipe.sadd(PENDING_CITATIONS_REINDEX_KEY, *uuids)
+        pipe.hincrby(CITATIONS_REINDEX_STATS_KEY, 'requested', len(uuids))
+        added, _ = pipe.execute()
+
+    redis.hincrby(CITATIONS_REINDEX_STATS_KEY, 'saved', len(uuids) - added)
+
+    return added
+
+
+def get_citations_reindex_stats():
+    """Return the counters of the coalesced citations reindexes.
+
+    Returns:
+        dict: ``requested`` is the number of reindexes asked for, ``saved``
+        how many of them were merged with an already pending one and
+        ``reindexed`` how many records were actually reindexed.
+    """
+    stats = _get_redis().hgetall(CITATIONS_REINDEX_STATS_KEY)
+    return {
+        key: int(stats.get(key, 0))
+        for key in ('requested', 'saved', 'reindexed')
+    }
+
 
 @shared_task(ignore_result=False, max_retries=0)
 def batch_reindex(uuids, request_timeout=None):
-    """Task for bulk reindexing records."""
+    """Task for bulk reindexing records.
+
+    The records of the batch are loaded with a single query, and the data
+    needed to enhance them for ES is fetched for the whole batch at once.
+    If ``RECORDS_EXPORT_CACHE_FILL_ON_INDEX`` is set, the exports of the
+    literature records are also cached.
+    """
+    records_to_index = []
+
     def actions():
+        records = InspireRecord.get_records(uuids)
+
+        loaded_uuids = set(str(record.id) for record in records)
         for uuid in uuids:
-            try:
-                record = InspireRecord.get_record(uuid)
-                if record.get('deleted', False):
-                    logger.debug("Record already %s deleted, not indexing!", uuid)
-                    continue
-                yield create_index_op(record, version_type='force')
-            except NoResultFound as e:
-                logger.warn('Record %s failed to load: %s', uuid, e)
+            if str(uuid) not in loaded_uuids:
+                logger.warn('Record %s failed to load', uuid)
+
+        for record in records:
+            if record.get('deleted', False):
+                logger.debug("Record already %s deleted, not indexing!", record.id)
+                continue
+            records_to_index.append(record)
+
+        prefetched = prefetch_enhancement_data(records_to_index)
+        for record in records_to_index:
+            yield create_index_op(record, version_type='force', prefetched=prefetched)
 
     if not request_timeout:
         request_timeout = current_app.config['INDEXER_BULK_REQUEST_TIMEOUT']
 
+    index_ops = list(actions())
+    bulk_start = time()
     success, failures = bulk(
         es,
-        actions(),
+        index_ops,
         request_timeout=request_timeout,
         raise_on_error=False,
         raise_on_exception=False,
     )
+    bump_search_generations(index_op['_index'] for index_op in index_ops)
+
+    if current_app.config.get('RECORDS_EXPORT_CACHE_FILL_ON_INDEX'):
+        from inspirehep.modules.records.serializers import fill_export_cache
+        fill_export_cache([
+            record for record in records_to_index
+            if 'Literature' in record.get('_collections', [])
+        ])
 
     return {
         'success': success,
         'failures': [failure for failure in failures or []],
+        'took': time() - bulk_start,
+    }
+
+
+@shared_task(ignore_result=False, max_retries=0)
+def batch_refresh_ui_display(uuids, request_timeout=None):
+    """Task reindexing the literature records whose ``_ui_display`` is outdated.
+
+    The records are enhanced as in ``batch_reindex``, but only the ones whose
+    ``_ui_display_fingerprint`` differs from the indexed one are reindexed.
+
+    Returns:
+        dict: ``checked`` is the number of literature records of the batch,
+        ``refreshed`` how many of them were reindexed.
+    """
+    records = [
+        record for record in InspireRecord.get_records(uuids)
+        if is_hep(record) and not record.get('deleted', False)
+    ]
+    prefetched = prefetch_enhancement_data(records)
+    indexed_ui_displays = prefetched['indexed_ui_displays']
+
+    index_ops = []
+    for record in records:
+        index_op = create_index_op(record, version_type='force', prefetched=prefetched)
+        indexed_ui_display = indexed_ui_displays.get(record.get('control_number'), {})
+        if indexed_ui_display.get('_ui_display_fingerprint') != record['_ui_display_fingerprint']:
+            index_ops.append(index_op)
+
+    if not request_timeout:
+        request_timeout = current_app.config['INDEXER_BULK_REQUEST_TIMEOUT']
+
+    success, failures = bulk(
+        es,
+        index_ops,
+        request_timeout=request_timeout,
+        raise_on_error=False,
+        raise_on_exception=False,
+    )
+    bump_search_generations(index_op['_index'] for index_op in index_ops)
+
+    return {
+        'checked': len(records),
+        'refreshed': success,
+        'failures': [failure for failure in failures or []],
     }
 
 
@@ -134,6 +261,14 @@ def index_modified_citations_from_record(self, pid_type, pid_value, db_version):
     ]
 
     if uuids:
+        update_citations_count(pids)
+        db.session.commit()
+        if current_app.config.get('FEATURE_FLAG_ENABLE_CITATIONS_REINDEX_COALESCING'):
+            added = queue_citations_reindex(uuids)
+            logger.info("({pid_value}) queued {added} records for reindex".format(
+                pid_value=pid_value, added=added)
+            )
+            return None
         logger.info("({pid_value}) contains pids - starting batch".format(
             pid_value=pid_value)
         )
@@ -142,3 +277,80 @@ def index_modified_citations_from_record(self, pid_type, pid_value, db_version):
     raise MissingCitedRecordError(
         'Cited records to reindex not found:\nuuids: {}'.format(uuids)
     )
+
+
+def _get_failed_uuids(failures):
+    """Return the uuids of the records whose bulk index operation failed.
+
+    Args:
+        failures(List[dict]): the failures returned by ``batch_reindex``.
+
+    Returns:
+        set: the uuids of the failed records.
+    """
+    return set(
+        str(item['_id'])
+        for failure in failures
+        for item in failure.values()
+        if item.get('_id')
+    )
+
+
+@shared_task(ignore_result=True)
+def reindex_pending_citations(batch_size=200):
+    """Reindex the records queued by ``index_modified_citations_from_record``.
+
+    Meant to be run periodically, every ``RECORDS_CITATIONS_REINDEX_WINDOW``
+    seconds, when ``FEATURE_FLAG_ENABLE_CITATIONS_REINDEX_COALESCING`` is
+    enabled. The pending records are moved to a processing set, and removed
+    from it only once reindexed, so that the records of a run that crashed
+    are reindexed by the next one.
+
+    Args:
+        batch_size(int): number of records reindexed in each bulk request.
+    """
+    if not current_app.config.get('FEATURE_FLAG_ENABLE_CITATIONS_REINDEX_COALESCING'):
+        return
+
+    redis = _get_redis()
+    lock = Lock(redis, 'reindex_pending_citations', expire=120, auto_renewal=True)
+    if not lock.acquire(blocking=False):
+        logger.info('reindex_pending_citations already executed. Skipping.')
+        return
+
+    try:
+        with redis.pipeline() as pipe:
+            pipe.sunionstore(
+                PROCESSING_CITATIONS_REINDEX_KEY,
+                PROCESSING_CITATIONS_REINDEX_KEY,
+                PENDING_CITATIONS_REINDEX_KEY,
+            )
+            pipe.delete(PENDING_CITATIONS_REINDEX_KEY)
+            pipe.execute()
+
+        uuids = list(redis.smembers(PROCESSING_CITATIONS_REINDEX_KEY))
+        failed_count = 0
+        for start in range(0, len(uuids), batch_size):
+            batch = uuids[start:start + batch_size]
+            result = batch_reindex(batch)
+            # The failed records stay in the processing set, so that they
+            # are reindexed by the next run.
+            failed_uuids = _get_failed_uuids(result['failures'])
+            reindexed = [uuid for uuid in batch if uuid not in failed_uuids]
+            failed_count += len(batch) - len(reindexed)
+            if not reindexed:
+                continue
+            with redis.pipeline() as pipe:
+                pipe.srem(PROCESSING_CITATIONS_REINDEX_KEY, *reindexed)
+                pipe.hincrby(CITATIONS_REINDEX_STATS_KEY, 'reindexed', len(reindexed))
+                pipe.execute()
+
+        stats = get_citations_reindex_stats()
+        logger.info(
+            'Reindexed {count} records with modified citations, {failed} failed'
+            ' and left for the next run, {saved} out of {requested} reindexes'
+            ' saved so far'.format(
+                count=len(uuids) - failed_count, failed=failed_count, **stats)
+        )
+    finally:
+        lock.release()
@@ -24,11 +24,18 @@
 
 from __future__ import absolute_import, division, print_function
 
+from hashlib import sha1
 from itertools import chain
 from unicodedata import normalize
+import json
 import re
 import six
 
+try:
+    from functools import lru_cache
+except ImportError:
+    from functools32 import lru_cache
+
 from inspire_dojson.utils import get_recid_from_ref
 from inspire_utils.date import earliest_date
 from inspire_utils.name import generate_name_variations, ParsedName
@@ -98,20 +105,24 @@ def get_author_display_name(name):
     return " ".join(parsed_name.first_list + parsed_name.last_list)
 
 
-def get_linked_records_in_field(record, field_path):
+def get_linked_records_in_field(record, field_path, linked_records=None):
     """Get all linked records in a given field.
 
     Args:
         record (dict): the record containing the links
         field_path (string): a dotted field path specification understandable
             by ``get_value``, containing a json reference to another record.
+        linked_records (Optional[dict]): records already fetched with
+            ``get_linked_records_in_field_of_records``. If passed, the linked
+            records are taken from it instead of being queried.
 
     Returns:
         Iterator[dict]: an iterator on the linked record.
 
     Warning:
-        Currently, the order in which the linked records are yielded is
-        different from the order in which they appear in the record.
+        Currently, unless ``linked_records`` is passed, the order in which
+        the linked records are yielded is different from the order in which
+        they appear in the record.
 
     Example:
         >>> record = {'references': [
@@ -123,9 +134,42 @@ def get_linked_records_in_field(record, field_path):
     """
     full_path = '.'.join([field_path, '$ref'])
     pids = force_list([get_pid_from_record_uri(rec) for rec in get_value(record, full_path, [])])
+    if linked_records is not None:
+        seen = set()
+        found = []
+        for pid in pids:
+            if pid in linked_records and pid not in seen:
+                seen.add(pid)
+                found.append(linked_records[pid])
+        return iter(found)
     return get_db_records(pids)
 
 
+def get_linked_records_in_field_of_records(records, field_path):
+    """Get all linked records in a given field of several records at once.
+
+    Args:
+        records (Iterable[dict]): the records containing the links
+        field_path (string): a dotted field path specification understandable
+            by ``get_value``, containing a json reference to another record.
+
+    Returns:
+        dict: the linked records, keyed by their ``(pid_type, pid_value)``.
+    """
+    full_path = '.'.join([field_path, '$ref'])
+    pids = set(
+        get_pid_from_record_uri(rec)
+        for record in records
+        for rec in force_list(get_value(record, full_path, []))
+    )
+    pids.discard(None)
+
+    return {
+        (get_pid_type_from_schema(linked_record['$schema']), str(linked_record['control_number'])): linked_record
+        for linked_record in get_db_records(pids)
+    }
+
+
 def populate_earliest_date(record):
     """Populate the ``earliest_date`` field of Literature records."""
     date_paths = [
@@ -149,12 +193,25 @@ def populate_earliest_date(record):
             record['earliest_date'] = result
 
 
-def populate_citations_count(record):
-    """Populate citations_count in ES from"""
+def populate_citations_count(record, citations_counts=None):
+    """Populate citations_count in ES from the stored citations count.
+
+    Falls back to counting the citing records when no count was stored yet
+    for this record.
+
+    Args:
+        record (InspireRecord): the record to enhance.
+        citations_counts (Optional[dict]): citations counts by record uuid,
+            already fetched for a batch of records.
+    """
     if hasattr(record, 'get_citations_count'):
         # Make sure that record has method get_citations_count
         # Session is in commited state here, and I cannot open new one...
-        citation_count = record.get_citations_count()
+        citation_count = citations_counts.get(record.id) if citations_counts else None
+        if citation_count is None:
+            citation_count = record.get_stored_citations_count()
+        if citation_count is None:
+            citation_count = record.get_citations_count()
         record['citation_count'] = citation_count
     else:
         raise MissingInspireRecordError("Record is not InspireRecord!")
@@ -417,9 +474,9 @@ def get_author_with_record_facet_author_name(author):
         return u'{}_{}'.format(bai, get_author_display_name(author['name']['value']))
 
 
-def populate_facet_author_name(record):
+def populate_facet_author_name(record, linked_authors=None):
     """Populate the ``facet_author_name`` field of Literature records."""
-    authors_with_record = get_linked_records_in_field(record, 'authors.record')
+    authors_with_record = get_linked_records_in_field(record, 'authors.record', linked_authors)
     authors_without_record = [author for author in record.get('authors', []) if 'record' not in author]
     result = []
 
@@ -449,15 +506,111 @@ def populate_author_suggest(record, *args, **kwargs):
     }
 
 
-def populate_ui_display(record, serializer):
+UI_DISPLAY_EXTRA_DEPENDENCIES = ['earliest_date']
+"""Fields read by the methods of the UI display schema besides its own fields."""
+
+UI_DISPLAY_LINKED_RECORDS_FIELDS = ['accelerator_experiments.record', 'publication_info.conference_record']
+"""Fields linking to the records whose data is embedded in the UI display."""
+
+
+@lru_cache()
+def get_ui_display_dependencies(serializer):
+    """Return the top-level fields of a record read by a UI display schema.
+
+    Args:
+        serializer (Schema): the schema of the UI display.
+
+    Returns:
+        List[str]: the sorted names of the fields.
+    """
+    dependencies = set(UI_DISPLAY_EXTRA_DEPENDENCIES)
+    dependencies.update(
+        field.attribute or name
+        for name, field in serializer().fields.items()
+    )
+    return sorted(dependencies)
+
+
+def get_ui_display_linked_pids(record):
+    """Return the records linked from a record whose data is in its UI display.
+
+    Args:
+        record (dict): the record.
+
+    Returns:
+        Set[Tuple[str, str]]: the ``(pid_type, pid_value)`` of the linked
+        records.
+    """
+    pids = set(
+        get_pid_from_record_uri(ref)
+        for field_path in UI_DISPLAY_LINKED_RECORDS_FIELDS
+        for ref in force_list(get_value(record, '.'.join([field_path, '$ref']), []))
+    )
+    pids.discard(None)
+    return pids
+
+
+def get_ui_display_fingerprint(record, serializer, linked_revisions=None):
+    """Return a fingerprint of the data read by a UI display schema.
+
+    Args:
+        record (dict): the record.
+        serializer (Schema): the schema of the UI display.
+        linked_revisions (Optional[dict]): the UUID and revision of the
+            records linked from the UI display, keyed by ``(pid_type,
+            pid_value)``, as returned by ``get_ui_display_linked_revisions``.
+            If not passed, the revisions are unknown and the fingerprint of
+            a record with linked records never matches one computed with
+            them.
+
+    Returns:
+        str: the fingerprint, which only changes when the UI display of the
+        record might change.
+    """
+    subtree = {
+        field: record[field]
+        for field in get_ui_display_dependencies(serializer)
+        if field in record
+    }
+    linked_pids = get_ui_display_linked_pids(record)
+    if linked_revisions is None:
+        linked = sorted([list(pid), None] for pid in linked_pids)
+    else:
+        linked = sorted(
+            [list(pid), list(linked_revisions[pid])]
+            for pid in linked_pids
+            if pid in linked_revisions
+        )
+    dumped = json.dumps([serializer.__name__, subtree, linked], sort_keys=True)
+    return sha1(dumped.encode('utf-8')).hexdigest()
+
+
+def populate_ui_display(record, serializer, indexed_ui_display=None, linked_revisions=None):
     """Calls specified serializer with selected record and stores data in
     `_ui_display` field.
 
+    The fingerprint of the fields read by the serializer and of the revisions
+    of the linked records it embeds is stored in the ``_ui_display_fingerprint``
+    field, and the serializer is skipped when it matches the one of the
+    currently indexed ``_ui_display``.
+
     Args:
         record (InspireRecord): record to serialize
         serializer (Schema): Schema which will be used to serialize record
+        indexed_ui_display (Optional[dict]): the ``_ui_display`` and
+            ``_ui_display_fingerprint`` currently indexed for the record.
+        linked_revisions (Optional[dict]): the revisions of the linked
+            records, as returned by ``get_ui_display_linked_revisions``.
     Returns:
         None: Data will be added to record dictionary (metadata)
 
     """
-    record['_ui_display'] = serializer().dumps(record).data
+    fingerprint = get_ui_display_fingerprint(record, serializer, linked_revisions)
+    indexed_ui_display = indexed_ui_display or {}
+
+    if indexed_ui_display.get('_ui_display') and \
+            indexed_ui_display.get('_ui_display_fingerprint') == fingerprint:
+        record['_ui_display'] = indexed_ui_display['_ui_display']
+    else:
+        record['_ui_display'] = serializer().dumps(record).data
+    record['_ui_display_fingerprint'] = fingerprint
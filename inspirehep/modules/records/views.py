@@ -26,14 +26,22 @@ from __future__ import absolute_import, division, print_function
 
 from functools import partial
 
-from flask import Blueprint, request, abort
+from flask import Blueprint, Response, abort, current_app, request, stream_with_context
 from invenio_rest.views import ContentNegotiatedMethodView
+from invenio_records_rest.errors import InvalidQueryRESTError
 from invenio_records_rest.views import pass_record
+from werkzeug.datastructures import MultiDict
 
 from inspirehep.modules.search import LiteratureSearch
-from inspirehep.modules.search.search_factory import inspire_facets_factory
+from inspirehep.modules.search.search_factory import (
+    inspire_facets_factory,
+    inspire_filter_factory,
+)
 from .serializers import json_literature_citations_v1_response, \
-    json_literature_search_aggregations_ui_v1
+    json_literature_search_aggregations_ui_v1, bibtex_v1, latex_v1_EU, \
+    latex_v1_US, marcxml_v1
+from .serializers.marcxml import MARCXML_TEMPLATE
+from .serializers.pybtex_serializer_base import PybtexSerializerBase
 
 blueprint = Blueprint(
     'inspirehep_records',
@@ -130,3 +138,97 @@ blueprint.add_url_rule(
     '/facets',
     view_func=facets_view
 )
+
+
+MARCXML_HEADER, MARCXML_FOOTER = MARCXML_TEMPLATE.split('{}')
+
+EXPORT_FORMATS = {
+    'bibtex': (bibtex_v1, 'application/x-bibtex', u'\n', u'', u''),
+    'latex-eu': (latex_v1_EU, 'application/vnd.eu+x-latex', u'\n\n', u'', u''),
+    'latex-us': (latex_v1_US, 'application/vnd.us+x-latex', u'\n\n', u'', u''),
+    'marcxml': (marcxml_v1, 'application/marcxml+xml', u'', MARCXML_HEADER, MARCXML_FOOTER),
+}
+"""Serializer, mimetype, separator between chunks, header and footer of each export format."""
+
+
+def stream_export(search, serializer, separator=u'', header=u'', footer=u'', chunk_size=100):
+    """Serialize all the results of a search, one chunk of records at a time.
+
+    The results are read with a scroll, so that the memory used does not
+    depend on the number of results.
+
+    Args:
+        search: the Elasticsearch DSL search.
+        serializer: a serializer with a ``serialize_records`` method.
+        separator(str): string between two serialized chunks.
+        header(str): string before the serialized records.
+        footer(str): string after the serialized records.
+        chunk_size(int): the number of records serialized at once.
+
+    Yields:
+        str: the parts of the export.
+    """
+    hits = search.extra(version=True).params(
+        scroll=current_app.config['RECORDS_EXPORT_SCROLL_KEEPALIVE'],
+        size=chunk_size,
+    ).scan()
+
+    serialize_records = serializer.serialize_records
+    if isinstance(serializer, PybtexSerializerBase):
+        # Deduplicate the texkeys across the chunks, not only within each one.
+        serialize_records = partial(serializer.serialize_records, texkeys=set())
+
+    def _serialize_chunks():
+        chunk = []
+        for hit in hits:
+            source = hit.to_dict()
+            chunk.append((source.get('control_number'), hit.meta.id, hit.meta.version, source))
+            if len(chunk) == chunk_size:
+                yield serialize_records(chunk)
+                chunk = []
+        if chunk:
+            yield serialize_records(chunk)
+
+    yield header
+    first = True
+    for serialized in _serialize_chunks():
+        if not serialized:
+            continue
+        if not first:
+            yield separator
+        yield serialized
+        first = False
+    yield footer
+
+
+@blueprint.route('/export')
+def export():
+    """Export all the literature records matching a query.
+
+    The ``format`` argument is one of ``bibtex``, ``latex-eu``, ``latex-us``
+    and ``marcxml``, and ``q`` is the query. The export is streamed as a
+    chunked response, without any limit on the number of records.
+    """
+    export_format = request.values.get('format', 'bibtex')
+    if export_format not in EXPORT_FORMATS:
+        abort(400)
+    serializer, mimetype, separator, header, footer = EXPORT_FORMATS[export_format]
+
+    query_string = request.values.get('q', '')
+    try:
+        search = LiteratureSearch().query_from_iq(query_string)
+    except SyntaxError:
+        raise InvalidQueryRESTError()
+    search, _ = inspire_filter_factory(search, MultiDict(), search._index[0])
+
+    return Response(
+        stream_with_context(stream_export(
+            search,
+            serializer,
+            separator=separator,
+            header=header,
+            footer=footer,
+            chunk_size=current_app.config['RECORDS_EXPORT_CHUNK_SIZE'],
+        )),
+        mimetype=mimetype,
+    )
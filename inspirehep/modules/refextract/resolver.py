@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Resolution of references by their unique identifiers in the database."""
+
+from __future__ import absolute_import, division, print_function
+
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_records.models import RecordMetadata
+from sqlalchemy import func, or_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+
+from inspire_utils.record import get_value
+from inspirehep.modules.refextract import config
+
+IDENTIFIERS_CACHE_SIZE = 100000
+IDENTIFIERS_QUERY_CHUNK_SIZE = 500
+IDENTIFIERS_CACHE_REFRESH_MARGIN = timedelta(minutes=10)
+"""How far before the last seen update the changed records are looked up
+again, as ``updated`` is set before the transaction commits and a record can
+become visible after others updated later."""
+IDENTIFIERS_CACHE_REFRESH_INTERVAL = timedelta(seconds=30)
+"""Minimum time between two lookups of the changed records, during which
+the cached identifiers might be outdated."""
+
+REFERENCE_IDENTIFIERS = [
+    (query['path'], query['search_path'].split('.')[0])
+    for query in config.REFERENCE_MATCHER_UNIQUE_IDENTIFIERS_CONFIG['algorithm'][0]['queries']
+]
+"""The paths of the unique identifiers in a reference, with the field of the
+literature records holding them, as matched by the reference matcher."""
+
+_identifiers_cache = OrderedDict()
+_identifiers_cache_recids = defaultdict(set)
+"""The cached identifiers resolving to each record id."""
+_identifiers_cache_state = {}
+
+
+def _get_reference_identifiers(reference):
+    identifiers = []
+    for path, field in REFERENCE_IDENTIFIERS:
+        values = get_value(reference, path)
+        if not values:
+            continue
+        if not isinstance(values, list):
+            values = [values]
+        identifiers.extend((field, value) for value in values)
+
+    return identifiers
+
+
+def _get_record_identifiers(record_json_fields):
+    identifiers = []
+    for (_, field), values in zip(REFERENCE_IDENTIFIERS, record_json_fields):
+        identifiers.extend(
+            (field, value['value']) for value in values or []
+            if value.get('value')
+        )
+
+    return identifiers
+
+
+def _query_literature(*entities):
+    return db.session.query(*entities).select_from(RecordMetadata).join(
+        PersistentIdentifier,
+        PersistentIdentifier.object_uuid == RecordMetadata.id,
+    ).filter(
+        PersistentIdentifier.pid_type == 'lit',
+        PersistentIdentifier.object_type == 'rec',
+    )
+
+
+def _cache_identifier(identifier, recids):
+    _identifiers_cache[identifier] = recids
+    for recid in recids:
+        _identifiers_cache_recids[recid].add(identifier)
+
+
+def _drop_cached_identifier(identifier):
+    for recid in _identifiers_cache.pop(identifier, ()):
+        identifiers = _identifiers_cache_recids.get(recid)
+        if identifiers is not None:
+            identifiers.discard(identifier)
+            if not identifiers:
+                del _identifiers_cache_recids[recid]
+
+
+def _clear_identifiers_cache():
+    _identifiers_cache.clear()
+    _identifiers_cache_recids.clear()
+
+
+def _refresh_identifiers_cache():
+    """Drop the cached identifiers of the literature records changed since the
+    last refresh, so that the cache follows the database incrementally.
+
+    The lookup is done at most every ``IDENTIFIERS_CACHE_REFRESH_INTERVAL``
+    and goes back ``IDENTIFIERS_CACHE_REFRESH_MARGIN`` before the last seen
+    update, so that the records committed late are not missed. The records
+    seen again with the same update are skipped.
+    """
+    now = datetime.utcnow()
+    last_refreshed = _identifiers_cache_state.get('refreshed')
+    if last_refreshed is not None and now - last_refreshed < IDENTIFIERS_CACHE_REFRESH_INTERVAL:
+        return
+    _identifiers_cache_state['refreshed'] = now
+
+    record_json = type_coerce(RecordMetadata.json, JSONB)
+    last_updated = _identifiers_cache_state.get('updated')
+    if last_updated is None:
+        _clear_identifiers_cache()
+        _identifiers_cache_state['updated'] = _query_literature(
+            func.max(RecordMetadata.updated)
+        ).scalar()
+        _identifiers_cache_state['seen'] = {}
+        return
+
+    changed_records = _query_literature(
+        RecordMetadata.updated,
+        PersistentIdentifier.pid_value,
+        *[record_json[field] for _, field in REFERENCE_IDENTIFIERS]
+    ).filter(
+        RecordMetadata.updated >= last_updated - IDENTIFIERS_CACHE_REFRESH_MARGIN,
+    ).limit(IDENTIFIERS_CACHE_SIZE + 1).all()
+
+    if len(changed_records) > IDENTIFIERS_CACHE_SIZE:
+        # Too many changes to follow: start over.
+        del _identifiers_cache_state['updated']
+        del _identifiers_cache_state['refreshed']
+        _refresh_identifiers_cache()
+        return
+
+    seen = _identifiers_cache_state['seen']
+    for row in changed_records:
+        updated, recid = row[0], int(row[1])
+        _identifiers_cache_state['updated'] = max(
+            _identifiers_cache_state['updated'], updated
+        )
+        if seen.get(recid) == updated:
+            continue
+        seen[recid] = updated
+
+        # The identifiers removed from the changed record are not known, so
+        # also drop everything that resolved to it.
+        for identifier in _get_record_identifiers(row[2:]):
+            _drop_cached_identifier(identifier)
+        for identifier in list(_identifiers_cache_recids.get(recid, ())):
+            _drop_cached_identifier(identifier)
+
+    oldest_seen = _identifiers_cache_state['updated'] - IDENTIFIERS_CACHE_REFRESH_MARGIN
+    _identifiers_cache_state['seen'] = {
+        recid: updated for recid, updated in seen.items() if updated >= oldest_seen
+    }
+
+
+def _fetch_identifiers(identifiers):
+    """Fetch the literature records having the given identifiers.
+
+    Returns:
+        dict: the record ids having each identifier.
+    """
+    record_json = type_coerce(RecordMetadata.json, JSONB)
+    found = {identifier: set() for identifier in identifiers}
+    identifiers = list(identifiers)
+    for start in range(0, len(identifiers), IDENTIFIERS_QUERY_CHUNK_SIZE):
+        chunk = identifiers[start:start + IDENTIFIERS_QUERY_CHUNK_SIZE]
+        query = _query_literature(
+            PersistentIdentifier.pid_value,
+            record_json['deleted'],
+            *[record_json[field] for _, field in REFERENCE_IDENTIFIERS]
+        ).filter(
+            PersistentIdentifier.status == PIDStatus.REGISTERED,
+            record_json['_collections'].contains(['Literature']),
+            or_(*[
+                record_json[field].contains([{'value': value}])
+                for field, value in chunk
+            ]),
+        )
+        for row in query:
+            if row[1]:
+                continue
+            for identifier in _get_record_identifiers(row[2:]):
+                if identifier in found:
+                    found[identifier].add(int(row[0]))
+
+    return found
+
+
+def get_recids_by_identifiers(identifiers):
+    """Get the literature records having the given unique identifiers.
+
+    The identifiers are cached in the process, across workflow objects, and
+    the cache is refreshed with the records changed since the previous
+    refresh, at most every ``IDENTIFIERS_CACHE_REFRESH_INTERVAL``. All the identifiers missing from the cache are fetched with
+    a query per chunk of identifiers.
+
+    Args:
+        identifiers(Iterable[Tuple[str, str]]): the identifiers, as pairs of
+            literature field and value, e.g. ``('dois', '10.1103/foo')``.
+
+    Returns:
+        dict: the tuple of record ids having each identifier, empty if no
+        record has it.
+    """
+    _refresh_identifiers_cache()
+
+    identifiers = set(identifiers)
+    missing_identifiers = identifiers.difference(_identifiers_cache)
+    if missing_identifiers:
+        for identifier, recids in _fetch_identifiers(missing_identifiers).items():
+            _cache_identifier(identifier, tuple(sorted(recids)))
+
+    recids_by_identifier = {}
+    for identifier in identifiers:
+        # move the identifier to the end to evict the least recently used ones
+        recids = _identifiers_cache.pop(identifier)
+        _identifiers_cache[identifier] = recids
+        recids_by_identifier[identifier] = recids
+
+    while len(_identifiers_cache) > IDENTIFIERS_CACHE_SIZE:
+        _drop_cached_identifier(next(iter(_identifiers_cache)))
+
+    return recids_by_identifier
+
+
+def resolve_references_by_identifiers(references):
+    """Resolve the references whose unique identifiers point to one record.
+
+    A reference is resolved only if each of its arXiv eprint, DOIs, ISBN and
+    report numbers belongs to a literature record and all of them belong to
+    the same one, so that the reference matcher would have linked it to that
+    record with its unique identifiers configuration.
+
+    Args:
+        references(List[dict]): the references.
+
+    Returns:
+        List[Optional[int]]: the record id of each reference, or ``None``
+        for the references which are left to the reference matcher.
+    """
+    identifiers_by_reference = [
+        _get_reference_identifiers(reference) for reference in references
+    ]
+    recids_by_identifier = get_recids_by_identifiers(
+        identifier
+        for identifiers in identifiers_by_reference
+        for identifier in identifiers
+    )
+
+    resolved_recids = []
+    for identifiers in identifiers_by_reference:
+        identifiers_recids = [recids_by_identifier[identifier] for identifier in identifiers]
+        recids = set(recid for recids in identifiers_recids for recid in recids)
+        if identifiers_recids and all(identifiers_recids) and len(recids) == 1:
+            resolved_recids.append(recids.pop())
+        else:
+            resolved_recids.append(None)
+
+    return resolved_recids
@@ -23,17 +23,26 @@
 """Refextract tasks."""
 
 from __future__ import absolute_import, division, print_function
+import hashlib
+import json
 import re
+import zlib
 from celery import shared_task
 from flask import current_app
 from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier
 from invenio_records.models import RecordMetadata
-from sqlalchemy import cast, not_, type_coerce
+from redis import StrictRedis
+from sqlalchemy import cast, func, not_, type_coerce
 from sqlalchemy.dialects.postgresql import JSONB
 from inspirehep.modules.refextract.utils import KbWriter
 
 RE_PUNCTUATION = re.compile(r"[\.,;'\(\)-]", re.UNICODE)
 
+JOURNAL_KB_REDIS_KEY = 'refextract:journal_kb:{version}'
+
+_journal_kb_cache = {}
+
 
 @shared_task()
 def create_journal_kb_file():
@@ -105,7 +114,76 @@ def normalize_title(raw_title):
     return normalized_title
 
 
+class JournalKB(dict):
+    """Journal KB dictionary, which also knows the version it was built from."""
+
+    def __init__(self, data, version=None):
+        super(JournalKB, self).__init__(data)
+        self.version = version
+
+
+def get_journal_kb_version():
+    """Return the version of the Journals collection.
+
+    The version changes whenever a Journals record is created, updated or
+    deleted, and is computed with a single query on the PID store.
+
+    Returns:
+        str: a hash of the last update time and of the number of Journals
+        records.
+    """
+    last_updated, count = db.session.query(
+        func.max(RecordMetadata.updated),
+        func.count(RecordMetadata.id),
+    ).join(
+        PersistentIdentifier,
+        PersistentIdentifier.object_uuid == RecordMetadata.id,
+    ).filter(
+        PersistentIdentifier.pid_type == 'jou',
+        PersistentIdentifier.object_type == 'rec',
+    ).one()
+
+    return hashlib.sha1(
+        '{}:{}'.format(last_updated, count).encode('utf8')
+    ).hexdigest()
+
+
+def _get_redis():
+    return StrictRedis.from_url(current_app.config.get('CACHE_REDIS_URL'))
+
+
 def create_journal_kb_dict():
+    """Return refextract's journal KB, built only when the Journals change.
+
+    The KB of the current version of the Journals collection is cached in
+    the process, and shared between processes through Redis, so that it is
+    built from the database only by the first process needing it.
+
+    Returns:
+        JournalKB: the journal KB, see :func:`build_journal_kb_dict`.
+    """
+    version = get_journal_kb_version()
+    if _journal_kb_cache.get('version') == version:
+        return _journal_kb_cache['kb']
+
+    redis = _get_redis()
+    key = JOURNAL_KB_REDIS_KEY.format(version=version)
+    serialized_kb = redis.get(key)
+    if serialized_kb:
+        kb = JournalKB(json.loads(zlib.decompress(serialized_kb)), version)
+    else:
+        kb = JournalKB(build_journal_kb_dict(), version)
+        redis.set(
+            key,
+            zlib.compress(json.dumps(kb).encode('utf8')),
+            ex=current_app.config['REFEXTRACT_JOURNAL_KB_CACHE_TIMEOUT'],
+        )
+
+    _journal_kb_cache.update(version=version, kb=kb)
+    return kb
+
+
+def build_journal_kb_dict():
     """
     Returns a dictionary that is populated with refextracts's journal KB from the database.
         { SOURCE: DESTINATION }
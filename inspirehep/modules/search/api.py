@@ -29,6 +29,7 @@ from elasticsearch_dsl.query import Q
 from invenio_search.api import DefaultFilter, RecordsSearch
 from invenio_search import current_search_client as es
 
+from .cache import CachedSearchMixin
 from .query_factory import inspire_query_factory
 
 logger = logging.getLogger(__name__)
@@ -89,7 +90,7 @@ class SearchMixin(object):
         return results
 
 
-class LiteratureSearch(RecordsSearch, SearchMixin):
+class LiteratureSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Literature database."""
 
     class Meta:
@@ -126,7 +127,7 @@ class LiteratureSearch(RecordsSearch, SearchMixin):
         return search.sort('-earliest_date').execute().hits
 
 
-class AuthorsSearch(RecordsSearch, SearchMixin):
+class AuthorsSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Authors database."""
 
     class Meta:
@@ -134,7 +135,7 @@ class AuthorsSearch(RecordsSearch, SearchMixin):
         doc_types = '_doc'
 
 
-class DataSearch(RecordsSearch, SearchMixin):
+class DataSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Data database."""
 
     class Meta:
@@ -142,7 +143,7 @@ class DataSearch(RecordsSearch, SearchMixin):
         doc_types = '_doc'
 
 
-class ConferencesSearch(RecordsSearch, SearchMixin):
+class ConferencesSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Conferences database."""
 
     class Meta:
@@ -159,7 +160,7 @@ class ConferencesSearch(RecordsSearch, SearchMixin):
         return self.query(IQ(query_string, self))
 
 
-class JobsSearch(RecordsSearch, SearchMixin):
+class JobsSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Jobs database."""
 
     class Meta:
@@ -167,7 +168,7 @@ class JobsSearch(RecordsSearch, SearchMixin):
         doc_types = '_doc'
 
 
-class InstitutionsSearch(RecordsSearch, SearchMixin):
+class InstitutionsSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Institutions database."""
 
     class Meta:
@@ -184,7 +185,7 @@ class InstitutionsSearch(RecordsSearch, SearchMixin):
         return self.query(IQ(query_string, self))
 
 
-class ExperimentsSearch(RecordsSearch, SearchMixin):
+class ExperimentsSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Experiments database."""
 
     class Meta:
@@ -192,7 +193,7 @@ class ExperimentsSearch(RecordsSearch, SearchMixin):
         doc_types = '_doc'
 
 
-class JournalsSearch(RecordsSearch, SearchMixin):
+class JournalsSearch(CachedSearchMixin, RecordsSearch, SearchMixin):
     """Elasticsearch-dsl specialized class to search in Journals database."""
 
     class Meta:
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+"""Cache of the search results, invalidated when an index is written to."""
+
+from __future__ import absolute_import, division, print_function
+
+import json
+import logging
+from hashlib import sha1
+
+import flask
+from flask import current_app
+from redis import RedisError, StrictRedis
+
+logger = logging.getLogger(__name__)
+
+SEARCH_GENERATION_KEY = 'search:generation:{index}'
+SEARCH_RESULTS_KEY = 'search:results:{index}:{generation}:{digest}'
+SEARCH_IGNORED_PARAMS = ('preference',)
+"""Search parameters that don't change the results."""
+
+
+def _get_redis():
+    redis = getattr(flask.g, 'redis_client', None)
+    if redis is None:
+        redis = StrictRedis.from_url(current_app.config.get('CACHE_REDIS_URL'))
+        flask.g.redis_client = redis
+    return redis
+
+
+def incr_search_generations(indexes):
+    """Increment the generation of some indexes in Redis.
+
+    Args:
+        indexes(Iterable[str]): the names of the indexes.
+    """
+    indexes = set(indexes)
+    if not indexes:
+        return
+
+    try:
+        with _get_redis().pipeline(transaction=False) as pipe:
+            for index in indexes:
+                pipe.incr(SEARCH_GENERATION_KEY.format(index=index))
+            pipe.execute()
+    except RedisError:
+        logger.exception('Cannot invalidate the cached searches of %s', ', '.join(indexes))
+
+
+def bump_search_generations(indexes):
+    """Invalidate the cached search results of some indexes.
+
+    The generations are bumped right away and once more after the indexes
+    were refreshed, as the searches running in between don't see the written
+    documents yet.
+
+    Nothing is done while ``FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE`` is
+    off, so the results cached before it was turned off might be served for
+    at most ``SEARCH_RESULTS_CACHE_TIMEOUT`` once it is turned on again.
+
+    Args:
+        indexes(Iterable[str]): the names of the indexes that were written to.
+    """
+    # Local import to avoid circular imports.
+    from inspirehep.modules.search.tasks import bump_search_generations_after_refresh
+
+    if not current_app.config.get('FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE'):
+        return
+
+    indexes = set(indexes)
+    if not indexes:
+        return
+
+    incr_search_generations(indexes)
+    bump_search_generations_after_refresh.apply_async(
+        args=[sorted(indexes)],
+        countdown=current_app.config['SEARCH_RESULTS_CACHE_REFRESH_DELAY'],
+    )
+
+
+class CachedSearchMixin(object):
+    """Mixin caching the responses of the searches it is enabled for.
+
+    The responses are stored in Redis, keyed by the normalized request body
+    and by the generation of the searched indexes, which is bumped with
+    ``bump_search_generations`` whenever records are indexed.
+
+    Note:
+        It must come before ``RecordsSearch`` in the bases of the search
+        class, as it overrides methods of ``Search``.
+    """
+
+    _cache_timeout = None
+
+    def cache_results(self, timeout=None):
+        """Cache the response of this search.
+
+        Args:
+            timeout(Optional[int]): seconds during which the response is
+                cached, ``SEARCH_RESULTS_CACHE_TIMEOUT`` by default.
+
+        Returns:
+            the search with the cache enabled.
+        """
+        search = self._clone()
+        search._cache_timeout = timeout or current_app.config['SEARCH_RESULTS_CACHE_TIMEOUT']
+        return search
+
+    def _clone(self):
+        search = super(CachedSearchMixin, self)._clone()
+        search._cache_timeout = self._cache_timeout
+        return search
+
+    def _get_results_cache_key(self, redis):
+        index = ','.join(sorted(self._index or []))
+        generation = redis.get(SEARCH_GENERATION_KEY.format(index=index)) or 0
+        params = {
+            key: value for key, value in self._params.items()
+            if key not in SEARCH_IGNORED_PARAMS
+        }
+        body = json.dumps([self.to_dict(), params], sort_keys=True, default=str)
+        return SEARCH_RESULTS_KEY.format(
+            index=index,
+            generation=int(generation),
+            digest=sha1(body.encode('utf-8')).hexdigest(),
+        )
+
+    def execute(self, ignore_cache=False):
+        if not self._cache_timeout or ignore_cache:
+            return super(CachedSearchMixin, self).execute(ignore_cache=ignore_cache)
+
+        try:
+            redis = _get_redis()
+            key = self._get_results_cache_key(redis)
+            cached = redis.get(key)
+        except RedisError:
+            logger.exception('Cannot read the cached search results')
+            return super(CachedSearchMixin, self).execute(ignore_cache=ignore_cache)
+
+        if cached is not None:
+            self._response = self._response_class(self, json.loads(cached))
+            return self._response
+
+        response = super(CachedSearchMixin, self).execute(ignore_cache=ignore_cache)
+        try:
+            redis.setex(key, self._cache_timeout, json.dumps(response.to_dict()))
+        except RedisError:
+            logger.exception('Cannot cache the search results')
+        return response
@@ -24,6 +24,7 @@
 
 from __future__ import absolute_import, division, print_function
 
+from .query_factory import parsed_query_cache, read_queries_log
 from .views import blueprint
 
 
@@ -35,3 +36,26 @@ class InspireSearch(object):
     def init_app(self, app):
         app.register_blueprint(blueprint)
         app.extensions['inspire-search'] = self
+        self.init_parsed_query_cache(app)
+
+    def init_parsed_query_cache(self, app):
+        """Configure the cache of parsed queries."""
+        parsed_query_cache.max_entries = app.config['SEARCH_QUERY_CACHE_MAX_ENTRIES']
+        parsed_query_cache.max_bytes = app.config['SEARCH_QUERY_CACHE_MAX_BYTES']
+
+    def warm_up_parsed_query_cache(self, app):
+        """Parse the queries of ``SEARCH_QUERY_CACHE_WARM_UP_FILE`` in advance.
+
+        It is called when the web and Celery workers start, not in every
+        application factory, so that the CLI commands don't parse the log.
+        """
+        queries_log = app.config.get('SEARCH_QUERY_CACHE_WARM_UP_FILE')
+        if not queries_log:
+            return
+
+        try:
+            count = parsed_query_cache.warm_up(read_queries_log(queries_log))
+        except IOError:
+            app.logger.warning('Cannot read the queries log %s', queries_log)
+        else:
+            app.logger.info('Parsed %d queries from %s', count, queries_log)
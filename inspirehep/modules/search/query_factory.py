@@ -24,15 +24,153 @@
 
 from __future__ import absolute_import, division, print_function
 
+import io
+import json
+import logging
+from collections import OrderedDict
+from itertools import islice
+from threading import Lock
+
 from elasticsearch_dsl import Q
 
 import inspire_query_parser
 
+logger = logging.getLogger(__name__)
+
+
+class ParsedQueryCache(object):
+    """LRU cache of the ES queries generated by the query parser.
+
+    The queries are stored as JSON, so that each hit returns a fresh query and
+    the memory used by the cache can be bounded. The numbers of hits, misses
+    and evictions are counted to monitor its efficiency.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=50 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._queries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query_string, search_class_name):
+        """Return the parsed query, parsing it only if not cached.
+
+        Args:
+            query_string(str): the query as a user would input it.
+            search_class_name(str): the name of the search class the query
+                is for.
+
+        Returns:
+            dict: the ES query.
+        """
+        key = (query_string, search_class_name)
+        with self._lock:
+            dumped = self._queries.pop(key, None)
+            if dumped is not None:
+                self._queries[key] = dumped
+                self.hits += 1
+                return json.loads(dumped)
+            self.misses += 1
+
+        parsed = inspire_query_parser.parse_query(query_string)
+        self._put(key, json.dumps(parsed))
+        return parsed
+
+    def _put(self, key, dumped):
+        size = len(dumped) + len(key[0])
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._queries:
+                return
+            self._queries[key] = dumped
+            self._size += size
+            while len(self._queries) > self.max_entries or self._size > self.max_bytes:
+                (query_string, _), evicted = self._queries.popitem(last=False)
+                self._size -= len(evicted) + len(query_string)
+                self.evictions += 1
+
+    def warm_up(self, queries):
+        """Parse queries in advance.
+
+        The queries are cached from the least to the most frequent one, so
+        that the most frequent ones are the last to be evicted.
+
+        Args:
+            queries(Iterable[Tuple[str, str]]): the query strings and the
+                names of their search class, most frequent first.
+
+        Returns:
+            int: the number of queries parsed.
+        """
+        count = 0
+        for query_string, search_class_name in reversed(list(islice(queries, self.max_entries))):
+            try:
+                self.get(query_string, search_class_name)
+            except Exception:
+                logger.warning('Cannot parse query %r', query_string)
+                continue
+            count += 1
+        return count
+
+    def clear(self):
+        """Remove all the queries and reset the counters."""
+        with self._lock:
+            self._queries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return the counters of the cache.
+
+        Returns:
+            dict: ``hits``, ``misses``, ``evictions``, the number of
+            ``entries`` and their size in ``bytes``.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._queries),
+            'bytes': self._size,
+        }
+
+
+parsed_query_cache = ParsedQueryCache()
+
+
+def read_queries_log(path, default_search_class_name='LiteratureSearch'):
+    """Read a log of the most frequent queries.
+
+    Each line contains a query string, optionally preceded by the name of its
+    search class and a tab.
+
+    Args:
+        path(str): the path of the log.
+        default_search_class_name(str): search class of the queries without
+            one.
+
+    Yields:
+        Tuple[str, str]: the query string and the name of its search class.
+    """
+    with io.open(path, encoding='utf-8') as log:
+        for line in log:
+            line = line.rstrip(u'\r\n')
+            if not line.strip():
+                continue
+            search_class_name, _, query_string = line.rpartition(u'\t')
+            yield query_string, search_class_name or default_search_class_name
+
 
 def inspire_query_factory():
     """Create an Elastic Search DSL query instance using the generated Elastic Search query by the parser."""
 
     def inspire_query(query_string, search):
-        return Q(inspire_query_parser.parse_query(query_string))
+        return Q(parsed_query_cache.get(query_string, type(search).__name__))
 
     return inspire_query
@@ -123,6 +123,20 @@ def inspire_filter_factory(search, urlkwargs, search_index):
     return search, urlkwargs
 
 
+def cache_results(search):
+    """Cache the results of the search if the results cache is enabled.
+
+    Args:
+        search: Elastic search DSL search instance.
+
+    Returns: Elastic search DSL search instance.
+    """
+    if current_app.config.get('FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE') \
+            and hasattr(search, 'cache_results'):
+        search = search.cache_results()
+    return search
+
+
 def inspire_search_factory(self, search):
     """Parse query using Inspire-Query-Parser.
 
@@ -146,6 +160,7 @@ def inspire_search_factory(self, search):
     search, urlkwargs = inspire_filter_factory(search, urlkwargs, search_index)
     search, sortkwargs = default_sorter_factory(search, search_index)
     search = select_source(search)
+    search = cache_results(search)
 
     urlkwargs.add('q', query_string)
     current_app.logger.debug(json.dumps(search.to_dict(), indent=4))
@@ -175,6 +190,7 @@ def inspire_facets_factory(self, search):
     search_index = search._index[0]
     search, urlkwargs = default_inspire_facets_factory(search, search_index)
     search = select_source(search)
+    search = cache_results(search)
 
     urlkwargs.add('q', query_string)
     current_app.logger.debug(json.dumps(search.to_dict(), indent=4))
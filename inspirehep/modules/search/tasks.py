@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Search tasks."""
+
+from __future__ import absolute_import, division, print_function
+
+from celery import shared_task
+
+from inspirehep.modules.search.cache import incr_search_generations
+
+
+@shared_task(ignore_result=True)
+def bump_search_generations_after_refresh(indexes):
+    """Invalidate again the cached search results of some indexes.
+
+    The searches running between a write and the refresh of the index cache
+    results without the written documents under the new generation, so it is
+    bumped once more after ``SEARCH_RESULTS_CACHE_REFRESH_DELAY``.
+
+    Args:
+        indexes(List[str]): the names of the indexes that were written to.
+    """
+    incr_search_generations(indexes)
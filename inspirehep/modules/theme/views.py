@@ -26,6 +26,7 @@ from __future__ import absolute_import, division, print_function
 
 import logging
 from datetime import date, datetime
+from functools import partial
 
 from celery import shared_task
 from dateutil.relativedelta import relativedelta
@@ -70,6 +71,12 @@ from inspirehep.utils.experiments import (
     render_experiment_contributions,
     render_experiment_people,
 )
+from inspirehep.utils.institutions import (
+    get_cached_institution_data,
+    get_experiments_papers_count,
+    get_institution_experiments,
+    get_institution_people,
+)
 from inspirehep.utils.references import get_and_format_references
 from inspirehep.utils.template import render_macro_from_template
 
@@ -438,7 +445,10 @@ def ajax_references():
     pid_type = get_pid_type_from_endpoint(endpoint)
     pid = PersistentIdentifier.get(pid_type, recid)
 
-    record = LiteratureSearch().get_source(pid.object_uuid)
+    record = LiteratureSearch().get_source(
+        pid.object_uuid,
+        _source_includes=['references'],
+    )
 
     return jsonify({'data': get_and_format_references(record)})
 
@@ -455,7 +465,10 @@ def ajax_citations():
     pid_type = get_pid_type_from_endpoint(endpoint)
     pid = PersistentIdentifier.get(pid_type, recid)
 
-    record = LiteratureSearch().get_source(pid.object_uuid)
+    record = LiteratureSearch().get_source(
+        pid.object_uuid,
+        _source_includes=['citation_count', 'control_number'],
+    )
 
     return jsonify({'data': get_and_format_citations(record)})
 
@@ -464,24 +477,6 @@ def ajax_citations():
 # Handlers for AJAX requests regarding institution detailed view
 #
 
-def get_institution_experiments_from_es(icn):
-    """
-    Get experiments from a given institution.
-
-    To avoid killing ElasticSearch the number of experiments is limited.
-
-    :param icn: Institution canonical name.
-    :type icn: string
-    """
-    query = {
-        "term": {"affiliation": icn}
-    }
-    search = ExperimentsSearch().query(query)[:100]
-    search = search.sort('-earliest_date')
-
-    return search.execute().hits
-
-
 def get_institution_papers_from_es(recid):
     """
     Get papers where some author is affiliated with institution.
@@ -507,22 +502,6 @@ def get_institution_papers_from_es(recid):
     ).execute().hits
 
 
-def get_experiment_publications(experiment_name):
-    """
-    Get paper count for a given experiment.
-
-    :param experiment_name: canonical name of the experiment.
-    :type experiment_name: string
-    """
-    query = {
-        "term": {"accelerator_experiments.experiment": experiment_name}
-    }
-    search = LiteratureSearch().query(query)
-    # FIXME: search_type=count is deprecated, but the whole function doesn't work anymore
-    search = search.params(search_type="count")
-    return search.execute().hits.total
-
-
 def get_institution_people_datatables_rows(recid):
     """
     Datatable rows to render people working in an institution.
@@ -530,66 +509,17 @@ def get_institution_people_datatables_rows(recid):
     :param recid: id of the institution.
     :type recid: string
     """
-    query = LiteratureSearch().query(
-        "term",
-        authors__affiliations__recid=recid
-    )
-    # FIXME: search_type=count is deprecated, but the whole function doesn't work anymore
-    query = query.params(search_type="count")
-
-    query.aggs.bucket("authors", "nested", path="authors")\
-        .bucket("affiliated", "filter", term={
-            "authors.affiliations.recid": recid
-        })\
-        .bucket('byrecid', 'terms', field='authors.recid')
-
-    records_from_es = query.execute().to_dict()
-
-    # Extract all the record ids from the aggregation
-    papers_per_author = records_from_es[
-        'aggregations'
-    ]['authors']['affiliated']['byrecid']['buckets']
-    recids = [int(paper['key']) for paper in papers_per_author]
-
-    # Generate query to retrieve records from author index
-    query = ""
-    for i, recid in enumerate(recids):
-        query += "recid:{}".format(recid)
-        if i != len(recids) - 1:
-            query += " OR "
-
-    results = AuthorsSearch().query_from_iq(
-        query
-    ).params(
-        size=9999,
-        _source=['control_number', 'name']
-    ).execute()
-
-    recid_map = dict(
-        [(result.control_number, result.name) for result in results]
-    )
-
     result = []
     author_html_link = u"<a href='/authors/{recid}'>{name}</a>"
-    for author in papers_per_author:
-        row = []
-        try:
-            row.append(
-                author_html_link.format(
-                    recid=author['key'],
-                    name=recid_map[author['key']].preferred_name
-                )
-            )
-        except Exception:
-            # No preferred name, use value
-            row.append(
-                author_html_link.format(
-                    recid=author['key'],
-                    name=recid_map[author['key']].value
-                )
-            )
-        row.append(author['doc_count'])
-        result.append(row)
+    for author_recid, name, papers_count in get_institution_people(recid):
+        name = name or {}
+        result.append([
+            author_html_link.format(
+                recid=author_recid,
+                name=name.get('preferred_name') or name.get('value'),
+            ),
+            papers_count,
+        ])
 
     return result
 
@@ -599,6 +529,9 @@ def get_institution_experiments_datatables_rows(hits):
     result = []
 
     name_html = "<a href='/experiments/{id}'>{name}</a>"
+    papers_count = get_experiments_papers_count(
+        [hit.control_number for hit in hits]
+    )
 
     for hit in hits:
         row = []
@@ -611,7 +544,7 @@ def get_institution_experiments_datatables_rows(hits):
             )
         except ValueError:
             row.append(hit.collaboration)
-        row.append(get_experiment_publications(hit.legacy_name))
+        row.append(papers_count.get(hit.control_number, 0))
         result.append(row)
     return result
 
@@ -668,7 +601,11 @@ def ajax_institutions_people():
 
     return jsonify(
         {
-            "data": get_institution_people_datatables_rows(institution_recid)
+            "data": get_cached_institution_data(
+                'people',
+                institution_recid,
+                partial(get_institution_people_datatables_rows, institution_recid),
+            )
         }
     )
 
@@ -678,21 +615,22 @@ def ajax_institutions_experiments():
     """Datatable handler to get experiments in an institution."""
     recid = request.args.get('recid', '')
 
-    pid = PersistentIdentifier.get('institutions', recid)
+    def _get_experiments():
+        pid = PersistentIdentifier.get('institutions', recid)
 
-    record = InstitutionsSearch().get_source(pid.object_uuid)
-    try:
-        icn = record.get('ICN', [])[0]
-    except KeyError:
-        icn = ''
+        record = InstitutionsSearch().get_source(pid.object_uuid)
+        try:
+            icn = record.get('ICN', [])[0]
+        except KeyError:
+            icn = ''
 
-    hits = get_institution_experiments_from_es(icn)
-    return jsonify(
-        {
+        hits = get_institution_experiments(icn)
+        return {
             "data": get_institution_experiments_datatables_rows(hits),
             "total": hits.total
         }
-    )
+
+    return jsonify(get_cached_institution_data('experiments', recid, _get_experiments))
 
 
 @blueprint.route('/ajax/institutions/papers', methods=['GET'])
@@ -700,13 +638,14 @@ def ajax_institutions_papers():
     """Datatable handler to get papers from an institution."""
     recid = request.args.get('recid', '')
 
-    hits = get_institution_papers_from_es(recid)
-    return jsonify(
-        {
+    def _get_papers():
+        hits = get_institution_papers_from_es(recid)
+        return {
             "data": get_institution_papers_datatables_rows(hits),
             "total": hits.total
         }
-    )
+
+    return jsonify(get_cached_institution_data('papers', recid, _get_papers))
 
 
 #
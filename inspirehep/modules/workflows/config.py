@@ -24,10 +24,34 @@
 
 from __future__ import absolute_import, division, print_function
 
+import os
+import tempfile
+
 
 WORKFLOWS_REFEXTRACT_TIMEOUT = 10 * 60
 """Time in seconds a refextract task is allowed to run before it is killed."""
 
 WORKFLOWS_PLOTEXTRACT_TIMEOUT = 5 * 60
 """Time in seconds a plotextract task is allowed to run before it is killed."""
+
+WORKFLOWS_PARALLEL_TASK_TIMEOUT = 2 * 60
+"""Time in seconds after which a task run by ``PARALLEL`` is abandoned and
+the workflow fails."""
+
+WORKFLOWS_JSON_API_REQUEST_TIMEOUT = 60
+"""Time in seconds after which a request to the JSON APIs of the magpie and
+classifier services or to the collaborations normalization is given up. It
+must be shorter than ``WORKFLOWS_PARALLEL_TASK_TIMEOUT``, so that the abandoned
+threads exit. The retries of the collaborations normalization are only started
+in the difference between the two, so they fit in the step timeout."""
+
+WORKFLOWS_CHECKPOINT_MAX_SKIPPED = 3
+"""Number of unchanged ``checkpoint_workflow`` in a row after which the next
+one saves the workflow anyway, bounding the steps re-run on restart."""
 WORKFLOWS_MAX_AUTHORS_COUNT_FOR_GROBID_EXTRACTION = 50
+
+WORKFLOWS_GROBID_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'inspire-grobid-cache')
+"""Directory of the local cache of the GROBID responses. ``None`` disables it."""
+
+WORKFLOWS_GROBID_CACHE_MAX_SIZE = 512 * 1024 * 1024
+"""Size in bytes above which the least recently used GROBID responses are evicted."""
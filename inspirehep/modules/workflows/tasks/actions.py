@@ -29,7 +29,8 @@ import logging
 import re
 from elasticsearch_dsl import Q, Search
 from invenio_search import current_search_client
-from inspirehep.modules.refextract.tasks import create_journal_kb_dict
+from inspirehep.modules.refextract.resolver import resolve_references_by_identifiers
+from inspirehep.modules.refextract.tasks import create_journal_kb_dict, get_journal_kb_version
 from urlparse import urljoin
 from urllib import quote
 
@@ -37,9 +38,13 @@ import sys
 import time
 import backoff
 
+import hashlib
 import json
 import requests
+import weakref
+from collections import OrderedDict
 from copy import deepcopy
+from datetime import datetime
 from functools import wraps
 from six import reraise
 from itertools import chain
@@ -48,18 +53,16 @@ from flask import current_app
 from jsonschema.exceptions import ValidationError
 from parsel import Selector
 from six.moves.urllib.parse import urlparse
-from sqlalchemy import (
-    JSON,
-    String,
-    cast,
-    type_coerce,
-)
+from sqlalchemy import type_coerce
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.dialects.postgresql import JSONB
 from werkzeug import secure_filename
 
 from invenio_db import db
 from invenio_workflows import ObjectStatus, workflow_object_class, start
 from invenio_workflows.errors import WorkflowsError
 from invenio_records.models import RecordMetadata
+from inspire_dojson.utils import get_record_ref
 from inspire_json_merger.api import merge
 from inspire_json_merger.config import GrobidOnArxivAuthorsOperations
 from inspire_schemas.builders import LiteratureBuilder
@@ -91,6 +94,7 @@ from inspirehep.modules.workflows.utils import (
     copy_file_to_workflow,
     download_file_to_workflow,
     get_document_url_for_reference_extraction,
+    get_document_checksum_in_workflow,
     get_document_in_workflow,
     get_resolve_validation_callback_url,
     get_validation_errors,
@@ -98,12 +102,32 @@ from inspirehep.modules.workflows.utils import (
     with_debug_logging, check_mark, set_mark, get_mark, get_record_from_hep,
     delete_empty_key
 )
+from inspirehep.modules.workflows.utils.grobid import (
+    get_grobid_cache_key,
+    read_grobid_response,
+    write_grobid_response,
+)
 from inspirehep.modules.workflows.utils.grobid_authors_parser import GrobidAuthors
 from inspirehep.utils.url import is_pdf_link
 
 
 LOGGER = logging.getLogger(__name__)
 
+JOURNALS_CACHE_SIZE = 5000
+_journals_cache = OrderedDict()
+_journals_cache_state = {}
+
+FULLTEXT_CACHE_SIZE = 32
+_fulltext_cache = OrderedDict()
+
+CHECKPOINTS_METRICS_KEY = '_checkpoints'
+CHECKPOINTS_IGNORED_EXTRA_DATA_KEYS = (
+    CHECKPOINTS_METRICS_KEY,
+    '_last_task_name',
+    '_task_history',
+)
+_checkpoints_by_engine = weakref.WeakKeyDictionary()
+
 
 EXPERIMENTAL_ARXIV_CATEGORIES = [
     'astro-ph',
@@ -489,6 +513,78 @@ def match_references_hep(references):
     create_error(response)
 
 
+def _get_reference_key(reference):
+    return json.dumps(reference, sort_keys=True)
+
+
+def _match_references_lists(references_lists):
+    return [
+        match_references_hep(references) if references is not None else []
+        for references in references_lists
+    ]
+
+
+def match_references_hep_in_bulk(references_lists):
+    """Match several lists of references, e.g. from different sources, at once.
+
+    The references are deduplicated across the lists. Unless they are curated,
+    those whose unique identifiers point to a single literature record are
+    linked to it directly, and only the others are sent to the reference
+    matcher, in chunks of ``REFEXTRACT_MATCHER_CHUNK_SIZE`` references.
+
+    Without ``FEATURE_FLAG_ENABLE_REFERENCES_LOCAL_RESOLUTION``, each list is
+    sent to the reference matcher as a whole.
+
+    Args:
+        references_lists(List[Optional[List[dict]]]): the lists of references,
+            ``None`` for the sources which were not available.
+
+    Returns:
+        List[List[dict]]: the matched references of each list.
+    """
+    if not current_app.config.get('FEATURE_FLAG_ENABLE_REFERENCES_LOCAL_RESOLUTION'):
+        return _match_references_lists(references_lists)
+
+    unique_references = OrderedDict()
+    for reference in chain.from_iterable(filter(None, references_lists)):
+        unique_references.setdefault(_get_reference_key(reference), reference)
+
+    matched_references = {}
+    unresolved_keys = []
+    resolved_recids = resolve_references_by_identifiers(unique_references.values())
+    for (key, reference), recid in zip(unique_references.items(), resolved_recids):
+        if reference.get('curated_relation'):
+            matched_references[key] = reference
+        elif recid:
+            reference = deepcopy(reference)
+            reference['record'] = get_record_ref(recid, 'literature')
+            matched_references[key] = reference
+        else:
+            unresolved_keys.append(key)
+
+    LOGGER.info(
+        'Resolved %d out of %d references without the reference matcher.',
+        len(matched_references), len(unique_references),
+    )
+
+    chunk_size = current_app.config['REFEXTRACT_MATCHER_CHUNK_SIZE']
+    for start in range(0, len(unresolved_keys), chunk_size):
+        chunk_keys = unresolved_keys[start:start + chunk_size]
+        chunk = match_references_hep([unique_references[key] for key in chunk_keys])
+        if len(chunk) != len(chunk_keys):
+            LOGGER.warning(
+                'The reference matcher returned %d references out of %d, '
+                'matching each list as a whole.', len(chunk), len(chunk_keys),
+            )
+            return _match_references_lists(references_lists)
+        matched_references.update(zip(chunk_keys, chunk))
+
+    return [
+        [matched_references[_get_reference_key(reference)] for reference in references or []]
+        for references in references_lists
+    ]
+
+
 @ignore_timeout_error()
 @timeout_with_config('WORKFLOWS_REFEXTRACT_TIMEOUT')
 @with_debug_logging
@@ -514,10 +610,10 @@ def refextract(obj, eng):
         raw_refs_to_extract, references = raw_refs_to_list(obj.data['references'])
         extracted_references = dedupe_list(extract_references_from_reference_list(raw_refs_to_extract, custom_kbs_file=journal_kb_dict))
         obj.log.info('Extracted %d references from raw refs.', len(extracted_references))
-        obj.data['references'] = match_references_hep(extracted_references + references)
+        obj.data['references'] = match_references_hep_in_bulk([extracted_references + references])[0]
         return
 
-    matched_pdf_references, matched_text_references = [], []
+    pdf_references, text_references = None, None
 
     url = get_document_url_for_reference_extraction(obj)
     if current_app.config.get("FEATURE_FLAG_ENABLE_REFEXTRACT_SERVICE") and url:
@@ -526,12 +622,10 @@ def refextract(obj, eng):
                 url, source=source, custom_kbs_file=journal_kb_dict
             )
         )
-        matched_pdf_references = match_references_hep(pdf_references)
     else:
         with get_document_in_workflow(obj) as tmp_document:
             if tmp_document:
                 pdf_references = dedupe_list(extract_references_from_pdf(tmp_document, source))
-                matched_pdf_references = match_references_hep(pdf_references)
 
     text = get_value(obj.extra_data, 'formdata.references')
     if text and current_app.config.get("FEATURE_FLAG_ENABLE_REFEXTRACT_SERVICE"):
@@ -540,10 +634,12 @@ def refextract(obj, eng):
                 text, source=source, custom_kbs_file=journal_kb_dict
             )
         )
-        matched_text_references = match_references_hep(text_references)
     elif text:
         text_references = dedupe_list(extract_references_from_text(text, source))
-        matched_text_references = match_references_hep(text_references)
+
+    matched_pdf_references, matched_text_references = match_references_hep_in_bulk(
+        [pdf_references, text_references]
+    )
 
     if not matched_pdf_references and not matched_text_references:
         obj.log.info('No references extracted.')
@@ -576,7 +672,8 @@ def save_workflow(obj, eng):
 
     Note:
         The ``save`` function only indexes the current workflow. For this
-        reason, we need to ``db.session.commit()``.
+        reason, we need to ``db.session.commit()``. It is also the restart
+        point closing a group of :func:`checkpoint_workflow`.
 
     TODO:
         Refactor: move this logic inside ``WorkflowObject.save()``.
@@ -590,6 +687,82 @@ def save_workflow(obj, eng):
     """
     obj.save()
     db.session.commit()
+    if eng is not None and current_app.config.get('FEATURE_FLAG_ENABLE_WORKFLOW_CHECKPOINTS'):
+        _get_checkpoint(obj, eng).update(
+            fingerprint=_get_checkpoint_fingerprint(obj),
+            skipped_in_a_row=0,
+        )
+
+
+def _get_checkpoint(obj, eng):
+    """Return the state of the last checkpoint of ``obj`` in this run."""
+    checkpoints = _checkpoints_by_engine.setdefault(eng, {})
+    return checkpoints.setdefault(obj.id, {'fingerprint': None, 'skipped_in_a_row': 0})
+
+
+def _get_checkpoint_fingerprint(obj):
+    """Return a digest of the workflow payload, without the bookkeeping keys
+    updated by the engine after each step."""
+    extra_data = {
+        key: value for key, value in obj.extra_data.items()
+        if key not in CHECKPOINTS_IGNORED_EXTRA_DATA_KEYS
+    }
+    return hashlib.sha1(
+        json.dumps([obj.data, extra_data], sort_keys=True)
+    ).hexdigest()
+
+
+def _increment_checkpoints_metric(obj, metric):
+    metrics = obj.extra_data.setdefault(CHECKPOINTS_METRICS_KEY, {})
+    metrics[metric] = metrics.get(metric, 0) + 1
+
+
+@with_debug_logging
+def checkpoint_workflow(obj, eng):
+    """Save the current workflow if it changed since the last checkpoint.
+
+    Lighter version of :func:`save_workflow` for the intermediate steps of a
+    group of steps, enabled by ``FEATURE_FLAG_ENABLE_WORKFLOW_CHECKPOINTS``:
+
+    * nothing is written if ``data`` and ``extra_data`` did not change since
+      the last checkpoint or :func:`save_workflow` of this run, unless
+      ``WORKFLOWS_CHECKPOINT_MAX_SKIPPED`` checkpoints were already skipped in
+      a row, so that a restarted workflow never re-runs more steps than that;
+    * the changes are committed without reindexing the workflow in the
+      holdingpen, which is left to the :func:`save_workflow` closing the group.
+
+    The number of skipped and unindexed saves is kept in
+    ``extra_data['_checkpoints']``.
+
+    Args:
+        obj: a workflow object.
+        eng: a workflow engine.
+
+    Returns:
+        None
+    """
+    if not current_app.config.get('FEATURE_FLAG_ENABLE_WORKFLOW_CHECKPOINTS'):
+        save_workflow(obj, eng)
+        return
+
+    checkpoint = _get_checkpoint(obj, eng)
+    fingerprint = _get_checkpoint_fingerprint(obj)
+    max_skipped = current_app.config['WORKFLOWS_CHECKPOINT_MAX_SKIPPED']
+    if fingerprint == checkpoint['fingerprint'] and checkpoint['skipped_in_a_row'] < max_skipped:
+        checkpoint['skipped_in_a_row'] += 1
+        _increment_checkpoints_metric(obj, 'skipped')
+        return
+
+    _increment_checkpoints_metric(obj, 'unindexed')
+    # Same as ``obj.save()``, without the signal indexing the workflow.
+    with db.session.begin_nested():
+        obj.model.modified = datetime.now()
+        flag_modified(obj.model, 'callback_pos')
+        flag_modified(obj.model, 'data')
+        flag_modified(obj.model, 'extra_data')
+        db.session.merge(obj.model)
+    db.session.commit()
+    checkpoint.update(fingerprint=fingerprint, skipped_in_a_row=0)
 
 
 def error_workflow(message):
@@ -669,13 +842,20 @@ def normalize_journal_titles(obj, eng):
        None
     """
     normalized_journal_titles_mapping = _get_all_journal_titles_to_normalize(obj.data)
+    journals = get_journals_by_short_title(set(normalized_journal_titles_mapping.values()))
     publications = obj.data.get('publication_info', [])
 
     for publication in publications:
         if 'journal_title' not in publication:
             continue
         normalized_journal_title = normalized_journal_titles_mapping[publication['journal_title']]
-        normalize_journal_title_entry(obj, publication, normalized_journal_title, add_inspire_categories=True)
+        normalize_journal_title_entry(
+            obj,
+            publication,
+            normalized_journal_title,
+            journals.get(normalized_journal_title),
+            add_inspire_categories=True,
+        )
 
     references = obj.data.get("references", [])
     for reference in references:
@@ -684,20 +864,76 @@ def normalize_journal_titles(obj, eng):
         if not journal_title:
             continue
         normalized_joutnal_title = normalized_journal_titles_mapping[journal_title]
-        normalize_journal_title_entry(obj, publication_info, normalized_joutnal_title)
+        normalize_journal_title_entry(
+            obj,
+            publication_info,
+            normalized_joutnal_title,
+            journals.get(normalized_joutnal_title),
+        )
 
     if obj.extra_data.get('journal_inspire_categories'):
         obj.extra_data['journal_inspire_categories'] = dedupe_list(obj.extra_data['journal_inspire_categories'])
 
 
-def normalize_journal_title_entry(obj, publication_info, normalized_title, add_inspire_categories=False):
-    publication_info['journal_title'] = normalized_title
+def get_journals_by_short_title(short_titles):
+    """Get the ``self`` and ``inspire_categories`` of the journals with the given short titles.
+
+    The journals are cached in the process, across workflow objects, until
+    the Journals collection changes. All the journals missing from the cache
+    are fetched with a single query.
 
-    ref_query = RecordMetadata.query.filter(
-        RecordMetadata.json['_collections'].op('?')('Journals')).filter(
-        cast(RecordMetadata.json['short_title'], String) == type_coerce(normalized_title, JSON))
-    result = db.session.execute(ref_query).fetchone()
-    journal_data = result.records_metadata_json if result else None
+    Args:
+        short_titles(Iterable[str]): the short titles of the journals.
+
+    Returns:
+        dict: the ``self`` and ``inspire_categories`` of each journal, by
+        short title. The short titles of unknown journals are missing.
+    """
+    version = get_journal_kb_version()
+    if _journals_cache_state.get('version') != version:
+        _journals_cache.clear()
+        _journals_cache_state['version'] = version
+
+    missing_short_titles = {
+        short_title for short_title in short_titles
+        if short_title not in _journals_cache
+    }
+    if missing_short_titles:
+        journal_json = type_coerce(RecordMetadata.json, JSONB)
+        query = RecordMetadata.query.with_entities(
+            journal_json['short_title'].astext,
+            journal_json['self'],
+            journal_json['inspire_categories'],
+        ).filter(
+            journal_json['_collections'].has_key('Journals'),  # noqa
+            journal_json['short_title'].astext.in_(missing_short_titles),
+        )
+        found = {}
+        for short_title, journal_record, inspire_categories in query:
+            found.setdefault(short_title, {
+                'self': journal_record,
+                'inspire_categories': inspire_categories,
+            })
+        for short_title in missing_short_titles:
+            _journals_cache[short_title] = found.get(short_title)
+
+    journals = {}
+    for short_title in short_titles:
+        # move the journal to the end to evict the least recently used ones
+        journal_data = _journals_cache.pop(short_title)
+        _journals_cache[short_title] = journal_data
+        if journal_data:
+            journals[short_title] = journal_data
+
+    while len(_journals_cache) > JOURNALS_CACHE_SIZE:
+        _journals_cache.popitem(last=False)
+
+    return journals
+
+
+def normalize_journal_title_entry(obj, publication_info, normalized_title, journal_data,
+                                  add_inspire_categories=False):
+    publication_info['journal_title'] = normalized_title
 
     if not journal_data:
         return
@@ -705,10 +941,11 @@ def normalize_journal_title_entry(obj, publication_info, normalized_title, add_i
     journal_record = journal_data['self']
 
     if journal_record:
-        publication_info['journal_record'] = journal_record
+        publication_info['journal_record'] = deepcopy(journal_record)
 
     if add_inspire_categories and journal_data.get('inspire_categories'):
-        obj.extra_data.setdefault('journal_inspire_categories', []).extend(journal_data['inspire_categories'])
+        obj.extra_data.setdefault('journal_inspire_categories', []).extend(
+            deepcopy(journal_data['inspire_categories']))
 
 
 def update_inspire_categories(obj, eng):
@@ -921,10 +1158,10 @@ def extract_authors_from_pdf(obj, eng):
         return obj
     api_path = "api/processHeaderDocument"
     kwargs_to_grobid = {"includeRawAffiliations": "1", "consolidateHeader": "1"}
-    grobid_response = post_pdf_to_grobid(obj, api_path, **kwargs_to_grobid)
+    grobid_response = get_grobid_response(obj, api_path, **kwargs_to_grobid)
     if not grobid_response:
         return
-    authors_and_affiliations = GrobidAuthors(grobid_response.text)
+    authors_and_affiliations = GrobidAuthors(grobid_response)
     data = authors_and_affiliations.parse_all()
     grobid_authors = get_value(data, 'author')
     merged_authors, merge_conflicts = merge({},
@@ -956,8 +1193,24 @@ def extract_authors_from_pdf(obj, eng):
     return obj
 
 
+def _get_normalize_collaborations_max_time():
+    """Bound the retries of ``normalize_collaborations``, run by ``PARALLEL``.
+
+    A new attempt is only started before this time, so the retries and their
+    last request fit in ``WORKFLOWS_PARALLEL_TASK_TIMEOUT``.
+    """
+    return current_app.config['WORKFLOWS_PARALLEL_TASK_TIMEOUT'] - \
+        current_app.config['WORKFLOWS_JSON_API_REQUEST_TIMEOUT']
+
+
 @with_debug_logging
-@backoff.on_exception(backoff.expo, (BadGatewayError, requests.exceptions.ConnectionError), base=4, max_tries=5)
+@backoff.on_exception(
+    backoff.expo,
+    (BadGatewayError, requests.exceptions.ConnectionError),
+    base=4,
+    max_tries=5,
+    max_time=_get_normalize_collaborations_max_time,
+)
 def normalize_collaborations(obj, eng):
     collaborations = obj.data.get('collaborations', [])
     if not isinstance(collaborations, list):
@@ -977,6 +1230,7 @@ def normalize_collaborations(obj, eng):
             "collaborations": collaborations,
             "workflow_id": obj.id,
         }),
+        timeout=current_app.config['WORKFLOWS_JSON_API_REQUEST_TIMEOUT'],
     )
     normalized_collaborations_response.raise_for_status()
     obj_accelerator_experiments = obj.data.get('accelerator_experiments', [])
@@ -1119,16 +1373,50 @@ def post_pdf_to_grobid(obj, grobid_api_path, **kwargs):
     return response
 
 
+def get_grobid_response(obj, grobid_api_path, **kwargs):
+    """Return the GROBID response for the document of the workflow.
+
+    The responses are cached by the checksum of the document, the API path
+    and the parameters, so that each document is sent to GROBID only once
+    per API path.
+
+    Returns:
+        Optional[unicode]: the GROBID XML response.
+    """
+    cache_key = get_grobid_cache_key(
+        get_document_checksum_in_workflow(obj), grobid_api_path, kwargs)
+    grobid_response = read_grobid_response(obj, cache_key)
+    if grobid_response is not None:
+        LOGGER.info("(%s) Using cached GROBID response %s", obj.id, cache_key)
+        return grobid_response
+
+    response = post_pdf_to_grobid(obj, grobid_api_path, **kwargs)
+    if not response:
+        return
+    write_grobid_response(obj, cache_key, response.text)
+    return response.text
+
+
 def get_fulltext(obj):
     grobid_api_path = "api/processFulltextDocument"
-    grobid_response = post_pdf_to_grobid(obj, grobid_api_path)
-    if not grobid_response:
+    # The fulltext is checked for several countries in the same workflow run,
+    # thus it is parsed only once.
+    fulltext_key = (obj.id, get_document_checksum_in_workflow(obj))
+    if fulltext_key[1] and fulltext_key in _fulltext_cache:
+        return _fulltext_cache[fulltext_key]
+
+    xml_data = get_grobid_response(obj, grobid_api_path)
+    if not xml_data:
         return
-    xml_data = grobid_response.text
     xml = Selector(text=xml_data, type="xml")
     xml.remove_namespaces()
     text = xml.getall()
     fulltext = ' '.join(text)
+
+    if fulltext_key[1]:
+        _fulltext_cache[fulltext_key] = fulltext
+        while len(_fulltext_cache) > FULLTEXT_CACHE_SIZE:
+            _fulltext_cache.popitem(last=False)
     return fulltext
 
 
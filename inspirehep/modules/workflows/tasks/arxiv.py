@@ -28,6 +28,11 @@ from inspire_utils.name import normalize_name
 import os
 import re
 import itertools
+import shutil
+import tempfile
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from functools import partial
 import backoff
 import requests
 from backports.tempfile import TemporaryDirectory
@@ -36,8 +41,8 @@ from requests import HTTPError
 from werkzeug import secure_filename
 from inspire_schemas.builders import LiteratureBuilder
 from inspire_schemas.readers import LiteratureReader
-from plotextractor.api import process_tarball
-from plotextractor.converter import untar
+from plotextractor.api import map_images_in_tex
+from plotextractor.converter import convert_images, detect_images_and_tex, untar
 from plotextractor.errors import (
     InvalidTarball,
     NoTexFilesFound,
@@ -58,8 +63,8 @@ from parsel import Selector
 
 LOGGER = logging.getLogger(__name__)
 
-REGEXP_AUTHLIST = re.compile(
-    "<collaborationauthorlist.*?>.*?</collaborationauthorlist>", re.DOTALL)
+AUTHLIST_TAGS = ('<collaborationauthorlist', '</collaborationauthorlist>')
+AUTHLIST_SCAN_CHUNK_SIZE = 64 * 1024
 REGEXP_REFS = re.compile(
     "<record.*?>.*?<controlfield .*?>.*?</controlfield>(.*?)</record>",
     re.DOTALL)
@@ -72,6 +77,18 @@ TARBALL_EXCEPTIONS = (
 
 AUTHOR_XML_ALLOWED_IDS = [u'ORCID', u'CCID', u'INSPIRE']
 
+ArxivPackage = namedtuple('ArxivPackage', ['tarball_uri', 'scratch_space', 'members'])
+"""An arXiv source package unpacked in ``scratch_space``.
+
+``members`` maps the path of each extracted file to its
+:class:`ArxivPackageMember`.
+"""
+ArxivPackageMember = namedtuple('ArxivPackageMember', ['type', 'size'])
+
+# Packages unpacked by ``arxiv_package_extract``, by workflow object id, so
+# that the following steps of the same run do not unpack them again.
+_extracted_packages = {}
+
 
 @with_debug_logging
 @backoff.on_exception(backoff.expo, DownloadError, base=4, max_tries=5)
@@ -135,6 +152,155 @@ def arxiv_package_download(obj, eng):
         obj.log.error('Cannot retrieve tarball from arXiv for %s', arxiv_id)
 
 
+@with_debug_logging
+def arxiv_package_extract(obj, eng):
+    """Unpack the arXiv package once for the following steps of the workflow.
+
+    The package is kept in a scratch space until ``arxiv_package_cleanup``,
+    and both ``arxiv_plot_extract`` and ``arxiv_author_list`` use it instead
+    of unpacking the tarball again. The steps using it must be wrapped in
+    ``FINALLY`` with ``arxiv_package_cleanup``, so that the scratch space is
+    removed even if one of them fails.
+
+    :param obj: Workflow Object to process
+    :param eng: Workflow Engine processing the object
+    """
+    _remove_extracted_package(obj)
+
+    arxiv_id = LiteratureReader(obj.data).arxiv_id
+    filename = secure_filename('{0}.tar.gz'.format(arxiv_id))
+    try:
+        tarball = obj.files[filename]
+    except KeyError:
+        LOGGER.info('No file named=%s for arxiv_id %s', filename, arxiv_id)
+        return
+
+    scratch_space = tempfile.mkdtemp(prefix='arxiv_package')
+    try:
+        package = _extract_arxiv_package(tarball, scratch_space)
+    except Exception:
+        shutil.rmtree(scratch_space, ignore_errors=True)
+        raise
+    if package is None:
+        shutil.rmtree(scratch_space, ignore_errors=True)
+        return
+
+    _extracted_packages[obj.id] = package
+    obj.log.info('Extracted %s files of tarball %s to: %s',
+                 len(package.members), tarball.file.uri, scratch_space)
+
+
+@with_debug_logging
+def arxiv_package_cleanup(obj, eng):
+    """Remove the scratch space of the package unpacked by ``arxiv_package_extract``.
+
+    :param obj: Workflow Object to process
+    :param eng: Workflow Engine processing the object
+    """
+    _remove_extracted_package(obj)
+
+
+def _remove_extracted_package(obj):
+    package = _extracted_packages.pop(obj.id, None)
+    if package:
+        shutil.rmtree(package.scratch_space, ignore_errors=True)
+
+
+@contextmanager
+def get_arxiv_package(obj, tarball):
+    """Context manager giving the unpacked arXiv package of the workflow.
+
+    The package unpacked by ``arxiv_package_extract`` is reused if it is the
+    one of the given tarball, otherwise the tarball is unpacked in a temporary
+    scratch space removed on exit.
+
+    Yields:
+        Optional[ArxivPackage]: the unpacked package, or ``None`` if the
+        tarball is invalid.
+    """
+    package = _extracted_packages.get(obj.id)
+    if package and package.tarball_uri == tarball.file.uri:
+        yield package
+        return
+
+    with TemporaryDirectory(prefix='arxiv_package') as scratch_space:
+        yield _extract_arxiv_package(tarball, scratch_space)
+
+
+def _extract_arxiv_package(tarball, scratch_space):
+    with retrieve_uri(tarball.file.uri, outdir=scratch_space) as tarball_file:
+        try:
+            file_list = untar(tarball_file, scratch_space)
+        except InvalidTarball:
+            return None
+
+    members = OrderedDict()
+    other_files = []
+    for path in file_list:
+        if os.path.isdir(path) or not os.path.exists(path):
+            continue
+        if path.endswith('.xml'):
+            members[path] = ArxivPackageMember('xml', os.path.getsize(path))
+        else:
+            other_files.append(path)
+
+    image_list, tex_files = detect_images_and_tex(other_files)
+    types = dict.fromkeys(other_files, 'other')
+    types.update(dict.fromkeys(image_list, 'image'))
+    types.update(dict.fromkeys(tex_files, 'tex'))
+    for path in other_files:
+        members[path] = ArxivPackageMember(types[path], os.path.getsize(path))
+
+    return ArxivPackage(tarball.file.uri, scratch_space, members)
+
+
+def extract_plots_from_package(package):
+    """Extract the plots from an unpacked arXiv package.
+
+    This is ``plotextractor.api.process_tarball`` without the unpacking.
+
+    Returns:
+        list(dict): the plots with their captions, see ``process_tarball``.
+
+    Raises:
+        NoTexFilesFound: when the package contains no TeX file.
+    """
+    image_list = [path for path, member in package.members.items() if member.type == 'image']
+    tex_files = [path for path, member in package.members.items() if member.type == 'tex']
+    if not tex_files:
+        raise NoTexFilesFound('No TeX files found in {0}'.format(package.tarball_uri))
+
+    converted_image_mapping = convert_images(image_list)
+    return map_images_in_tex(
+        tex_files,
+        converted_image_mapping,
+        package.scratch_space,
+    )
+
+
+def has_author_list(path, chunk_size=AUTHLIST_SCAN_CHUNK_SIZE):
+    """Check whether an XML file contains a ``collaborationauthorlist``.
+
+    The file is read in chunks, so that large XML files which are not author
+    lists are never loaded whole in memory.
+    """
+    pending_tags = list(AUTHLIST_TAGS)
+    buffer = ''
+    with open(path, 'rb') as xml_file_fd:
+        for chunk in iter(partial(xml_file_fd.read, chunk_size), b''):
+            buffer += chunk
+            while pending_tags:
+                index = buffer.find(pending_tags[0])
+                if index == -1:
+                    break
+                buffer = buffer[index + len(pending_tags.pop(0)):]
+            if not pending_tags:
+                return True
+            # Keep enough characters to match a tag split across two chunks.
+            buffer = buffer[-len(pending_tags[0]):]
+    return False
+
+
 @ignore_timeout_error()
 @timeout_with_config('WORKFLOWS_PLOTEXTRACT_TIMEOUT')
 @with_debug_logging
@@ -155,13 +321,11 @@ def arxiv_plot_extract(obj, eng):
         LOGGER.info('No file named=%s for arxiv_id %s', filename, arxiv_id)
         return
 
-    with TemporaryDirectory(prefix='plot_extract') as scratch_space, \
-            retrieve_uri(tarball.file.uri, outdir=scratch_space) as tarball_file:
+    with get_arxiv_package(obj, tarball) as package:
         try:
-            plots = process_tarball(
-                tarball_file,
-                output_directory=scratch_space,
-            )
+            if package is None:
+                raise InvalidTarball
+            plots = extract_plots_from_package(package)
         except TARBALL_EXCEPTIONS:
             obj.log.info(
                 'Invalid tarball %s for arxiv_id %s',
@@ -224,11 +388,8 @@ def arxiv_author_list(obj, eng):
         )
         return
 
-    with TemporaryDirectory(prefix='author_list') as scratch_space, \
-            retrieve_uri(tarball.file.uri, outdir=scratch_space) as tarball_file:
-        try:
-            file_list = untar(tarball_file, scratch_space)
-        except InvalidTarball:
+    with get_arxiv_package(obj, tarball) as package:
+        if package is None:
             obj.log.info(
                 'Invalid tarball %s for arxiv_id %s',
                 tarball.file.uri,
@@ -236,19 +397,21 @@ def arxiv_author_list(obj, eng):
             )
             return
 
-        obj.log.info('Extracted tarball to: {0}'.format(scratch_space))
-        xml_files_list = [path for path in file_list if path.endswith('.xml')]
+        obj.log.info('Extracted tarball to: {0}'.format(package.scratch_space))
+        xml_files_list = [
+            path for path, member in package.members.items()
+            if member.type == 'xml' and member.size
+        ]
         obj.log.info('Found xmlfiles: {0}'.format(xml_files_list))
 
         extracted_authors = []
 
         for xml_file in xml_files_list:
-            with open(xml_file, 'r') as xml_file_fd:
-                xml_content = xml_file_fd.read()
-            match = REGEXP_AUTHLIST.findall(xml_content)
-            if match:
+            if has_author_list(xml_file):
                 obj.log.info('Found a match for author extraction')
 
+                with open(xml_file, 'r') as xml_file_fd:
+                    xml_content = xml_file_fd.read()
                 extracted_authors.extend(extract_authors_from_xml(xml_content))
 
         if extracted_authors:
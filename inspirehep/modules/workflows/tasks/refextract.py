@@ -55,6 +55,42 @@ from ..utils import with_debug_logging
 
 LOGGER = getStackTraceLogger(__name__)
 
+UNKNOWN_JOURNAL_KB_VERSION_STATUS = 409
+
+
+def post_to_refextract_service(endpoint, data, journal_kb):
+    """Send a request with the journal KB to the refextract service.
+
+    If ``FEATURE_FLAG_ENABLE_REFEXTRACT_SERVICE_JOURNAL_KB_VERSION`` is
+    enabled, only the version of the KB is sent, and the KB itself is sent
+    along with its version only if the service replies with a 409 status
+    because it does not know this version.
+
+    Args:
+        endpoint(str): the endpoint of the service.
+        data(dict): the data of the request, without the KB.
+        journal_kb(dict): the journal KB, as returned by ``create_journal_kb_dict``.
+
+    Returns:
+        requests.Response: the response of the service.
+    """
+    url = "{}/{}".format(current_app.config["REFEXTRACT_SERVICE_URL"], endpoint)
+    refextract_request_headers = {
+        "content-type": "application/json",
+    }
+    version = getattr(journal_kb, 'version', None)
+    if version and current_app.config.get("FEATURE_FLAG_ENABLE_REFEXTRACT_SERVICE_JOURNAL_KB_VERSION"):
+        data = dict(data, journal_kb_version=version)
+        response = requests.post(url, headers=refextract_request_headers, data=json.dumps(data))
+        if response.status_code != UNKNOWN_JOURNAL_KB_VERSION_STATUS:
+            return response
+
+    return requests.post(
+        url,
+        headers=refextract_request_headers,
+        data=json.dumps(dict(data, journal_kb_data=journal_kb)),
+    )
+
 
 @with_debug_logging
 @backoff.on_exception(
@@ -80,17 +116,12 @@ def extract_journal_info(obj, eng):
     if not obj.data.get('publication_info'):
         return
 
-    kbs_journal_dict = create_journal_kb_dict()
-
     if current_app.config.get("FEATURE_FLAG_ENABLE_REFEXTRACT_SERVICE"):
         publication_infos = obj.data['publication_info']
-        refextract_request_headers = {
-            "content-type": "application/json",
-        }
-        response = requests.post(
-            "{}/extract_journal_info".format(current_app.config["REFEXTRACT_SERVICE_URL"]),
-            headers=refextract_request_headers,
-            data=json.dumps({"publication_infos": publication_infos, "journal_kb_data": kbs_journal_dict})
+        response = post_to_refextract_service(
+            "extract_journal_info",
+            {"publication_infos": publication_infos},
+            create_journal_kb_dict(),
         )
         try:
             response.raise_for_status()
@@ -167,13 +198,10 @@ def extract_journal_info(obj, eng):
 )
 def extract_references_from_reference_list(raw_references, custom_kbs_file):
     """Extract references from reference list and return in INSPIRE format."""
-    refextract_request_headers = {
-        "content-type": "application/json",
-    }
-    response = requests.post(
-        "{}/extract_references_from_list".format(current_app.config["REFEXTRACT_SERVICE_URL"]),
-        headers=refextract_request_headers,
-        data=json.dumps({"raw_references": raw_references["values"], "journal_kb_data": custom_kbs_file})
+    response = post_to_refextract_service(
+        "extract_references_from_list",
+        {"raw_references": raw_references["values"]},
+        custom_kbs_file,
     )
     response.raise_for_status()
     extracted_raw_references = response.json().get('extracted_references', [])
@@ -190,13 +218,10 @@ def extract_references_from_reference_list(raw_references, custom_kbs_file):
     max_tries=5,
 )
 def extract_references_from_pdf_url(url, custom_kbs_file, source=None):
-    refextract_request_headers = {
-        "content-type": "application/json",
-    }
-    response = requests.post(
-        "{}/extract_references_from_url".format(current_app.config["REFEXTRACT_SERVICE_URL"]),
-        headers=refextract_request_headers,
-        data=json.dumps({"url": url, "journal_kb_data": custom_kbs_file})
+    response = post_to_refextract_service(
+        "extract_references_from_url",
+        {"url": url},
+        custom_kbs_file,
     )
     if response.status_code != 200:
         LOGGER.info("Couldn't extract references from url!")
@@ -247,13 +272,10 @@ def extract_references_from_text(text, source=None, custom_kbs_file=None):
 )
 def extract_references_from_text_data(text, custom_kbs_file, source=None):
     """Extract references from text and return in INSPIRE format."""
-    refextract_request_headers = {
-        "content-type": "application/json",
-    }
-    response = requests.post(
-        "{}/extract_references_from_text".format(current_app.config["REFEXTRACT_SERVICE_URL"]),
-        headers=refextract_request_headers,
-        data=json.dumps({"text": text, "journal_kb_data": custom_kbs_file})
+    response = post_to_refextract_service(
+        "extract_references_from_text",
+        {"text": text},
+        custom_kbs_file,
     )
     extracted_text_references = response.json().get('extracted_references', [])
     return map_refextract_to_schema(extracted_text_references, source=source)
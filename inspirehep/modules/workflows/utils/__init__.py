@@ -80,6 +80,7 @@ def json_api_request(url, data, headers=None):
             url=url,
             headers=final_headers,
             data=json.dumps(data),
+            timeout=current_app.config['WORKFLOWS_JSON_API_REQUEST_TIMEOUT'],
         )
     except requests.exceptions.RequestException as err:
         current_app.logger.exception(err)
@@ -285,9 +286,7 @@ def get_document_in_workflow(obj):
         present, it prioritizes the fulltext. If several documents with the
         same priority are present, it takes the first one and logs an error.
     """
-    documents = obj.data.get("documents", [])
-    fulltexts = [document for document in documents if document.get("fulltext")]
-    documents = fulltexts or documents
+    documents = _get_documents_by_priority(obj)
 
     if not documents:
         obj.log.info("No document available")
@@ -302,6 +301,30 @@ def get_document_in_workflow(obj):
         yield local_file
 
 
+def get_document_checksum_in_workflow(obj):
+    """Return the checksum of the document attached to a workflow object.
+
+    The document is chosen as in :func:`get_document_in_workflow`, but it is
+    not copied out of the storage.
+
+    Arg:
+        obj: workflow object
+    Returns:
+        Optional[str]: The checksum of the document (e.g. ``md5:...``), or
+        ``None`` if there is no document or its checksum is unknown.
+    """
+    documents = _get_documents_by_priority(obj)
+    if not documents:
+        return None
+    return obj.files[documents[0]["key"]].file.checksum
+
+
+def _get_documents_by_priority(obj):
+    documents = obj.data.get("documents", [])
+    fulltexts = [document for document in documents if document.get("fulltext")]
+    return fulltexts or documents
+
+
 @with_debug_logging
 def copy_file_to_workflow(workflow, name, url):
     url = unquote(url)
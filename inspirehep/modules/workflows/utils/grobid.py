@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+"""Cache of the GROBID responses."""
+
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from flask import current_app
+from fs.opener import fsopen
+from inspire_utils.logging import getStackTraceLogger
+
+LOGGER = getStackTraceLogger(__name__)
+
+GROBID_WORKFLOW_FILE_SUFFIX = '.grobid.xml'
+
+
+def get_grobid_cache_key(document_checksum, grobid_api_path, params):
+    """Return the cache key of a GROBID response.
+
+    Args:
+        document_checksum (str): checksum of the processed document.
+        grobid_api_path (str): the GROBID API path, e.g.
+            ``api/processFulltextDocument``.
+        params (dict): the extra parameters sent to GROBID.
+
+    Returns:
+        Optional[str]: the cache key, or ``None`` if the checksum of the
+        document is unknown.
+    """
+    if not document_checksum:
+        return None
+
+    digest = hashlib.sha1(json.dumps(
+        [document_checksum, grobid_api_path, params], sort_keys=True
+    )).hexdigest()
+    return '{}-{}'.format(grobid_api_path.rsplit('/', 1)[-1], digest)
+
+
+def read_grobid_response(obj, cache_key):
+    """Read a GROBID response from the cache.
+
+    The local file store is looked up first, then the files of the workflow.
+
+    Args:
+        obj: a workflow object.
+        cache_key (str): the key returned by :func:`get_grobid_cache_key`.
+
+    Returns:
+        Optional[unicode]: the cached GROBID response, or ``None``.
+    """
+    if not cache_key:
+        return None
+
+    response = _read_local_grobid_response(cache_key)
+    if response is not None:
+        return response
+
+    filename = cache_key + GROBID_WORKFLOW_FILE_SUFFIX
+    if filename not in obj.files.keys:
+        return None
+
+    with fsopen(obj.files[filename].file.uri, mode='rb') as cached_file:
+        response = cached_file.read().decode('utf-8')
+    _write_local_grobid_response(cache_key, response)
+    return response
+
+
+def write_grobid_response(obj, cache_key, response):
+    """Store a GROBID response in the local file store and in the workflow files.
+
+    Args:
+        obj: a workflow object.
+        cache_key (str): the key returned by :func:`get_grobid_cache_key`.
+        response (unicode): the GROBID response.
+    """
+    if not cache_key:
+        return
+
+    _write_local_grobid_response(cache_key, response)
+    filename = cache_key + GROBID_WORKFLOW_FILE_SUFFIX
+    obj.files[filename] = io.BytesIO(response.encode('utf-8'))
+
+
+def _get_local_cache_path(cache_key):
+    cache_dir = current_app.config.get('WORKFLOWS_GROBID_CACHE_DIR')
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, cache_key + '.xml')
+
+
+def _read_local_grobid_response(cache_key):
+    path = _get_local_cache_path(cache_key)
+    if not path:
+        return None
+
+    try:
+        with io.open(path, encoding='utf-8') as cached_file:
+            response = cached_file.read()
+        # Touch the file, so that the eviction drops the least recently used.
+        os.utime(path, None)
+    except (IOError, OSError):
+        return None
+    return response
+
+
+def _write_local_grobid_response(cache_key, response):
+    path = _get_local_cache_path(cache_key)
+    if not path:
+        return
+
+    cache_dir = os.path.dirname(path)
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        # Write to a temporary file first, so that concurrent readers never
+        # see a partial response.
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with io.open(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.write(response)
+        os.rename(tmp_path, path)
+        _evict_local_grobid_responses(
+            cache_dir,
+            current_app.config['WORKFLOWS_GROBID_CACHE_MAX_SIZE'],
+        )
+    except (IOError, OSError):
+        LOGGER.warning('Cannot write the GROBID response %s in the local cache', cache_key)
+
+
+def _evict_local_grobid_responses(cache_dir, max_size):
+    """Delete the least recently used responses until the cache fits ``max_size`` bytes."""
+    entries = []
+    total_size = 0
+    for filename in os.listdir(cache_dir):
+        if not filename.endswith('.xml'):
+            continue
+        path = os.path.join(cache_dir, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total_size += stat.st_size
+
+    for _, size, path in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
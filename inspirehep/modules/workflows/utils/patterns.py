@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+"""Workflow patterns complementing the ones of ``workflow.patterns``."""
+
+from __future__ import absolute_import, division, print_function
+
+import copy
+import sys
+import time
+from functools import wraps
+from multiprocessing import TimeoutError
+from multiprocessing.pool import ThreadPool
+
+from flask import current_app
+from inspire_utils.logging import getStackTraceLogger
+from six import reraise
+
+LOGGER = getStackTraceLogger(__name__)
+
+_MISSING = object()
+
+
+class IsolatedWorkflowObject(object):
+    """Copy of a workflow object handed to a task run by :func:`PARALLEL`.
+
+    It carries deep copies of ``data`` and ``extra_data``, so that the tasks
+    running at the same time never see each other's changes, and it does not
+    give access to anything backed by the database (files, ``save``...).
+    """
+
+    def __init__(self, obj):
+        self.id = obj.id
+        self.id_user = getattr(obj, 'id_user', None)
+        self.data_type = getattr(obj, 'data_type', None)
+        if hasattr(obj, 'log'):
+            self.log = obj.log
+        self.data = copy.deepcopy(obj.data)
+        self.extra_data = copy.deepcopy(obj.extra_data)
+
+
+def WHEN(cond, task):
+    """Run ``task`` only if ``cond`` holds.
+
+    Unlike ``IF``, it does not rely on the workflow engine to jump over the
+    branch, so it can be used inside :func:`PARALLEL`.
+
+    Args:
+        cond (callable): the condition, called with ``obj`` and ``eng``.
+        task (callable): the task to run.
+
+    Returns:
+        callable: the conditional task.
+    """
+    @wraps(task)
+    def _when(obj, eng):
+        if cond(obj, eng):
+            return task(obj, eng)
+
+    return _when
+
+
+def FINALLY(tasks, cleanup):
+    """Run ``tasks`` one after the other, then ``cleanup`` in any case.
+
+    ``cleanup`` also runs when a task raises or halts the workflow, so it can
+    release the resources acquired by the tasks, like scratch space on the
+    worker. The tasks form a single step of the workflow: restarting it runs
+    all of them again.
+
+    Args:
+        tasks (list): the tasks to run, as callables taking ``obj`` and
+            ``eng``. They cannot use the patterns relying on the workflow
+            engine to jump, like ``IF``.
+        cleanup (callable): the task releasing the resources.
+
+    Returns:
+        callable: the workflow step running the tasks.
+    """
+    tasks = list(tasks)
+
+    def _finally(obj, eng):
+        try:
+            for task in tasks:
+                task(obj, eng)
+        finally:
+            cleanup(obj, eng)
+
+    _finally.__name__ = 'FINALLY'
+    return _finally
+
+
+def _get_changes(original, modified):
+    """Return the top level keys of ``original`` changed in ``modified``.
+
+    A key removed from ``modified`` is reported with the ``_MISSING`` value.
+    """
+    changes = {}
+    for key in set(original) | set(modified):
+        value = modified.get(key, _MISSING)
+        if original.get(key, _MISSING) != value:
+            changes[key] = value
+
+    return changes
+
+
+def _apply_changes(target, changes):
+    for key, value in changes.items():
+        if value is _MISSING:
+            target.pop(key, None)
+        else:
+            target[key] = value
+
+
+def _run_isolated(app, task, obj, eng):
+    with app.app_context():
+        try:
+            task(obj, eng)
+        except Exception:
+            return sys.exc_info()
+
+    return None
+
+
+def PARALLEL(tasks):
+    """Run independent tasks concurrently on a pool of threads.
+
+    Each task receives its own :class:`IsolatedWorkflowObject`, so the tasks
+    must only read and write ``obj.data`` and ``obj.extra_data`` and must not
+    depend on each other's output. This makes it suitable for tasks which
+    mostly wait on external services.
+
+    Once all the tasks are done, the top level keys of ``data`` and
+    ``extra_data`` changed by each task are copied to the workflow object in
+    the order in which the tasks are listed, so that the result does not
+    depend on which task finished first. If two tasks change the same key,
+    the last one in the list wins.
+
+    If a task raises, the changes of the tasks listed before it are kept, as
+    if they had run one after the other, and its exception is raised again. A
+    task still running after ``WORKFLOWS_PARALLEL_TASK_TIMEOUT`` seconds is
+    abandoned and fails in the same way with a ``TimeoutError``: the thread
+    running it cannot be stopped, so the tasks must bound their own requests.
+
+    Args:
+        tasks (list): the tasks to run, as callables taking ``obj`` and
+            ``eng``. Use :func:`WHEN` instead of ``IF`` for conditional tasks.
+
+    Returns:
+        callable: the workflow step running the tasks.
+    """
+    tasks = list(tasks)
+
+    def _parallel(obj, eng):
+        app = current_app._get_current_object()
+        timeout = app.config['WORKFLOWS_PARALLEL_TASK_TIMEOUT']
+        isolated_objs = [IsolatedWorkflowObject(obj) for _ in tasks]
+
+        pool = ThreadPool(len(tasks))
+        try:
+            async_results = [
+                pool.apply_async(_run_isolated, (app, task, isolated_obj, eng))
+                for task, isolated_obj in zip(tasks, isolated_objs)
+            ]
+            deadline = time.time() + timeout
+            outcomes = []
+            for task, async_result in zip(tasks, async_results):
+                try:
+                    outcomes.append(
+                        async_result.get(max(deadline - time.time(), 0))
+                    )
+                except TimeoutError:
+                    message = 'Task {} of workflow {} timed out after {} seconds.'.format(
+                        task.__name__, obj.id, timeout
+                    )
+                    outcomes.append((TimeoutError, TimeoutError(message), None))
+        finally:
+            # The abandoned threads are not waited for, they exit once done.
+            pool.close()
+
+        # The changes are all computed against the untouched workflow object
+        # before being applied, in the order in which the tasks are listed.
+        all_changes = []
+        exc_info = None
+        for task, isolated_obj, outcome in zip(tasks, isolated_objs, outcomes):
+            if outcome is not None:
+                exc_info = outcome
+                break
+            for attr in ('data', 'extra_data'):
+                changes = _get_changes(
+                    getattr(obj, attr), getattr(isolated_obj, attr)
+                )
+                all_changes.append((task.__name__, attr, changes))
+
+        changed_by = {}
+        for task_name, attr, changes in all_changes:
+            for key in changes:
+                if (attr, key) in changed_by:
+                    LOGGER.warning(
+                        'Tasks %s and %s of workflow %s both changed %s.%s, '
+                        'keeping the changes of %s.',
+                        changed_by[(attr, key)], task_name, obj.id, attr, key,
+                        task_name,
+                    )
+                changed_by[(attr, key)] = task_name
+            _apply_changes(getattr(obj, attr), changes)
+
+        if exc_info:
+            reraise(*exc_info)
+
+    _parallel.__name__ = 'PARALLEL'
+    return _parallel
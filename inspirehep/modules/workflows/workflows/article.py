@@ -33,7 +33,9 @@ from workflow.patterns.controlflow import (
 from inspirehep.modules.workflows.tasks.refextract import extract_journal_info
 from inspirehep.modules.workflows.tasks.arxiv import (
     arxiv_author_list,
+    arxiv_package_cleanup,
     arxiv_package_download,
+    arxiv_package_extract,
     arxiv_plot_extract,
     populate_arxiv_document,
 )
@@ -60,6 +62,7 @@ from inspirehep.modules.workflows.tasks.actions import (
     preserve_root,
     refextract,
     reject_record,
+    checkpoint_workflow,
     save_workflow,
     set_refereed_and_fix_document_type,
     update_inspire_categories,
@@ -132,6 +135,7 @@ from inspirehep.modules.workflows.tasks.submission import (
     send_to_legacy,
 )
 from inspirehep.modules.workflows.utils import do_not_repeat
+from inspirehep.modules.workflows.utils.patterns import FINALLY, PARALLEL, WHEN
 from inspirehep.modules.literaturesuggest.tasks import (
     curation_ticket_needed,
     check_source_publishing,
@@ -183,8 +187,14 @@ ENHANCE_RECORD = [
         [
             populate_arxiv_document,
             arxiv_package_download,
-            arxiv_plot_extract,
-            arxiv_author_list,
+            FINALLY(
+                [
+                    arxiv_package_extract,
+                    arxiv_plot_extract,
+                    arxiv_author_list,
+                ],
+                arxiv_package_cleanup,
+            ),
         ],
     ),
     IF(
@@ -197,30 +207,31 @@ ENHANCE_RECORD = [
         extract_authors_from_pdf,
     ),
     normalize_journal_titles,
-    save_workflow,
+    checkpoint_workflow,
     refextract,
-    save_workflow,
+    checkpoint_workflow,
     count_reference_coreness,
     extract_journal_info,
-    save_workflow,
+    checkpoint_workflow,
     populate_journal_coverage,
-    save_workflow,
+    checkpoint_workflow,
     classify_paper(
         only_core_tags=False,
         spires=True,
         with_author_keywords=True,
     ),
-    save_workflow,
+    checkpoint_workflow,
     filter_core_keywords,
-    guess_categories,
-    save_workflow,
-    IF(
-        is_experimental_paper,
-        guess_experiments,
-    ),
-    guess_keywords,
-    guess_coreness,
-    normalize_collaborations,
+    PARALLEL([
+        guess_categories,
+        WHEN(
+            is_experimental_paper,
+            guess_experiments,
+        ),
+        guess_keywords,
+        guess_coreness,
+        normalize_collaborations,
+    ]),
     save_workflow,
 ]
 
@@ -22,42 +22,61 @@
 
 from __future__ import absolute_import, division, print_function
 
+from flask import current_app
+from invenio_cache import current_cache
+
 from inspirehep.modules.search import LiteratureSearch
-from inspirehep.utils.jinja2 import render_template_to_string
+from inspirehep.utils.jinja2 import render_template_to_strings
+
+CITATIONS_CACHE_KEY = 'citations:ajax:{control_number}:{citation_count}'
+
+CITATIONS_SOURCE = [
+    'authors',
+    'citation_count',
+    'collaborations',
+    'control_number',
+    'corporate_author',
+    'earliest_date',
+    'publication_info',
+    'titles',
+]
+"""Fields of the citing records read by ``inspirehep_theme/citations.html``."""
 
 
 def get_and_format_citations(record):
-    """.. deprecated:: 2018-08-23"""
-    result = []
+    """.. deprecated:: 2018-08-23
+
+    The citing records are fetched with a single search, and the result is
+    cached until the citation count of the record changes.
+    """
+    cache_key = CITATIONS_CACHE_KEY.format(
+        control_number=record['control_number'],
+        citation_count=record.get('citation_count', 0),
+    )
+    result = current_cache.get(cache_key)
+    if result is not None:
+        return result
 
     citations = LiteratureSearch().query(
         'match', references__recid=record['control_number'],
     ).params(
-        _source=[
-            'citation_count',
-            'control_number',
-            'earliest_date',
-            'titles',
-        ]
+        _source=CITATIONS_SOURCE,
     ).execute().hits
 
-    for citation in citations:
-        citation_from_es = LiteratureSearch().get_source(citation.meta.id)
-        row = []
-
-        row.append(
-            render_template_to_string(
-                'inspirehep_theme/citations.html',
-                record=citation_from_es,
-            )
-        )
-
-        try:
-            citation_count = citation.citation_count
-        except AttributeError:
-            citation_count = 0
-        row.append(citation_count)
+    citations = [citation.to_dict() for citation in citations]
+    rendered_citations = render_template_to_strings(
+        'inspirehep_theme/citations.html',
+        [{'record': citation} for citation in citations],
+    )
 
-        result.append(row)
+    result = [
+        [rendered_citation, citation.get('citation_count', 0)]
+        for rendered_citation, citation in zip(rendered_citations, citations)
+    ]
+    current_cache.set(
+        cache_key,
+        result,
+        timeout=current_app.config['AJAX_CITATIONS_CACHE_TIMEOUT'],
+    )
 
     return result
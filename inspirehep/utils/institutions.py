@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+"""Data shown in the detailed view of the institutions."""
+
+from __future__ import absolute_import, division, print_function
+
+from elasticsearch_dsl import Q
+from flask import current_app
+from invenio_cache import current_cache
+
+from inspirehep.modules.search import (
+    AuthorsSearch,
+    ExperimentsSearch,
+    LiteratureSearch,
+)
+
+INSTITUTION_CACHE_KEY = 'institutions:ajax:{kind}:{recid}'
+
+
+def get_cached_institution_data(kind, recid, compute):
+    """Get some data of an institution, computing it only if not cached.
+
+    Args:
+        kind(str): the kind of data, e.g. ``people``.
+        recid(str): the id of the institution.
+        compute(Callable): function returning the data.
+
+    Returns:
+        the cached or computed data.
+    """
+    key = INSTITUTION_CACHE_KEY.format(kind=kind, recid=recid)
+    data = current_cache.get(key)
+    if data is None:
+        data = compute()
+        current_cache.set(
+            key,
+            data,
+            timeout=current_app.config['INSTITUTIONS_AJAX_CACHE_TIMEOUT'],
+        )
+    return data
+
+
+def get_institution_people(recid):
+    """Get the authors affiliated with an institution and their papers count.
+
+    A single aggregation counts the papers of each affiliated author, and
+    their names are fetched with a single terms query on their control
+    numbers.
+
+    Args:
+        recid(str): the id of the institution.
+
+    Returns:
+        List[Tuple[int, dict, int]]: the control number, the ``name`` and
+        the papers count of each author, most prolific first. The ``name``
+        is ``None`` if the author record is not indexed or has no name.
+    """
+    search = LiteratureSearch().query(
+        Q('nested', path='authors', query=Q('term', authors__affiliations__recid=recid))
+    )[:0]
+    search.aggs.bucket('authors', 'nested', path='authors')\
+        .bucket('affiliated', 'filter', term={'authors.affiliations.recid': recid})\
+        .bucket(
+            'byrecid',
+            'terms',
+            field='authors.recid',
+            size=current_app.config['INSTITUTIONS_PEOPLE_MAX_AUTHORS'],
+        )
+
+    buckets = search.execute().aggregations.authors.affiliated.byrecid.buckets
+    recids = [int(bucket.key) for bucket in buckets]
+    if not recids:
+        return []
+
+    authors = AuthorsSearch().filter(
+        'terms', control_number=recids
+    ).params(
+        size=len(recids),
+        _source=['control_number', 'name'],
+    ).execute()
+    names = {author.control_number: author.to_dict().get('name') for author in authors}
+
+    return [
+        (int(bucket.key), names.get(int(bucket.key)), bucket.doc_count)
+        for bucket in buckets
+    ]
+
+
+def get_institution_experiments(icn):
+    """Get the experiments of an institution.
+
+    To avoid killing ElasticSearch the number of experiments is limited.
+
+    Args:
+        icn(str): the canonical name of the institution.
+
+    Returns:
+        the hits of the experiments, most recent first.
+    """
+    query = {
+        "term": {"affiliation": icn}
+    }
+    search = ExperimentsSearch().query(query)[:100]
+    search = search.sort('-earliest_date')
+
+    return search.execute().hits
+
+
+def get_experiments_papers_count(recids):
+    """Get the papers count of several experiments with a single aggregation.
+
+    Args:
+        recids(List[int]): the ids of the experiments.
+
+    Returns:
+        dict: the papers count of each experiment, keyed by its id.
+    """
+    if not recids:
+        return {}
+
+    search = LiteratureSearch().filter(
+        'terms', accelerator_experiments__recid=recids
+    )[:0]
+    search.aggs.bucket(
+        'experiments',
+        'terms',
+        field='accelerator_experiments.recid',
+        include=recids,
+        size=len(recids),
+    )
+
+    buckets = search.execute().aggregations.experiments.buckets
+    return {int(bucket.key): bucket.doc_count for bucket in buckets}
@@ -42,3 +42,24 @@ def render_template_to_string(input, _from_string=False, **context):
     else:
         template = ctx.app.jinja_env.get_or_select_template(input)
     return template.render(context)
+
+
+def render_template_to_strings(input, contexts, **context):
+    """Render a template once for each of several contexts.
+
+    The template is loaded and the common context is built only once, so that
+    rendering many rows of a table costs a single template lookup.
+
+    :param input: the name of the template to be rendered, or an iterable
+    with template names the first one existing will be rendered
+    :param contexts: the variables specific to each rendering.
+    :param context: the variables shared by all the renderings.
+    :return: a list of strings, one per item of ``contexts``
+    """
+    ctx = _request_ctx_stack.top
+    ctx.app.update_template_context(context)
+    template = ctx.app.jinja_env.get_or_select_template(input)
+    return [
+        template.render(dict(context, **item_context))
+        for item_context in contexts
+    ]
@@ -25,10 +25,10 @@ from __future__ import absolute_import, division, print_function
 from invenio_indexer.api import current_record_to_index, RecordIndexer
 
 
-def create_index_op(record, version_type='external_gte'):
+def create_index_op(record, version_type='external_gte', prefetched=None):
     from inspirehep.modules.records.receivers import enhance_before_index
     index, doc_type = current_record_to_index(record)
-    enhance_before_index(record)
+    enhance_before_index(record, prefetched)
 
     return {
         '_op_type': 'index',
@@ -39,3 +39,14 @@ def create_index_op(record, version_type='external_gte'):
         'version_type': version_type,
         '_source': RecordIndexer._prepare_record(record, index, doc_type),
     }
+
+
+def create_delete_op(record):
+    index, doc_type = current_record_to_index(record)
+
+    return {
+        '_op_type': 'delete',
+        '_index': index,
+        '_type': doc_type,
+        '_id': str(record.id),
+    }
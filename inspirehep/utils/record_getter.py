@@ -24,15 +24,19 @@
 
 from __future__ import absolute_import, division, print_function
 
+from collections import namedtuple
 from functools import wraps
+from uuid import UUID
 
 from flask import current_app
-from sqlalchemy import tuple_
+from sqlalchemy import tuple_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
 from werkzeug.utils import import_string
 
 from inspire_dojson.utils import get_recid_from_ref
 from inspire_utils.record import get_value
-from invenio_pidstore.models import PersistentIdentifier
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_records.models import RecordMetadata
 
 from inspirehep.modules.pidstore.utils import get_endpoint_from_pid_type
@@ -140,6 +144,146 @@ def get_db_records(pids):
         yield record.json
 
 
+StreamedRecord = namedtuple('StreamedRecord', ['id', 'pid_type', 'pid_value', 'json'])
+
+
+def get_query_db_records(pid_types, fields=None, only_registered=False):
+    """Return a query on the records with the given pid types.
+
+    Args:
+        pid_types (Iterable[str]): pid types of the records.
+        fields (Optional[List[str]]): dotted paths of the JSON fields to fetch.
+            If ``None``, the full JSON is fetched.
+        only_registered (bool): if ``True``, skip records whose PID is not
+            registered, e.g. deleted or redirected ones.
+
+    Returns:
+        SQLAlchemy query with the record uuid, pid type and pid value as
+        first columns, followed by either the JSON or the requested fields.
+    """
+    columns = [
+        RecordMetadata.id,
+        PersistentIdentifier.pid_type,
+        PersistentIdentifier.pid_value,
+    ]
+    if fields is None:
+        columns.append(RecordMetadata.json)
+    else:
+        columns.extend(
+            type_coerce(RecordMetadata.json, JSONB)[tuple(field.split('.'))]
+            for field in fields
+        )
+
+    query = db.session.query(*columns).join(
+        PersistentIdentifier, RecordMetadata.id == PersistentIdentifier.object_uuid
+    ).filter(
+        PersistentIdentifier.object_type == 'rec',
+        PersistentIdentifier.pid_type.in_(pid_types),
+    )
+    if only_registered:
+        query = query.filter(PersistentIdentifier.status == PIDStatus.REGISTERED)
+
+    return query
+
+
+def _build_projected_json(fields, values):
+    json = {}
+    for field, value in zip(fields, values):
+        if value is None:
+            continue
+        keys = field.split('.')
+        parent = json
+        for key in keys[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[keys[-1]] = value
+
+    return json
+
+
+def stream_db_records(pid_types, fields=None, only_registered=False,
+                      start_after=None, end_before=None, page_size=10000):
+    """Stream the records with the given pid types from the DB, in uuid order.
+
+    The records are read in pages using keyset pagination on
+    ``RecordMetadata.id``, and each page is read through a server-side
+    cursor, so that late pages are as fast as the first ones and memory usage
+    does not depend on the page size.
+
+    Args:
+        pid_types (Iterable[str]): pid types of the records.
+        fields (Optional[List[str]]): dotted paths of the JSON fields to fetch,
+            the paths can only go through JSON objects. If ``None``, the full
+            JSON is fetched.
+        only_registered (bool): if ``True``, skip records whose PID is not
+            registered, e.g. deleted or redirected ones.
+        start_after (Optional[Union[str, UUID]]): only records after this
+            uuid are streamed.
+        end_before (Optional[Union[str, UUID]]): only records before this
+            uuid are streamed.
+        page_size (int): number of records fetched per keyset query.
+
+    Yields:
+        StreamedRecord: the record uuid, pid type, pid value and JSON, which
+        contains only the requested fields if ``fields`` was passed.
+
+    Example:
+        >>> for record in stream_db_records(['lit'], fields=['deleted']):
+        ...     if not record.json.get('deleted'):
+        ...         print(record.pid_value)
+    """
+    query = get_query_db_records(pid_types, fields, only_registered)
+    if end_before:
+        query = query.filter(RecordMetadata.id < UUID(str(end_before)))
+
+    last_id = UUID(str(start_after)) if start_after else None
+    while True:
+        page = query
+        if last_id:
+            page = page.filter(RecordMetadata.id > last_id)
+        page = page.order_by(RecordMetadata.id).limit(page_size).yield_per(
+            min(page_size, 1000))
+
+        count = 0
+        for row in page:
+            count += 1
+            last_id = row[0]
+            if fields is None:
+                json = row[3]
+            else:
+                json = _build_projected_json(fields, row[3:])
+            yield StreamedRecord(row[0], row[1], row[2], json)
+
+        if count < page_size:
+            return
+
+
+def get_db_records_projection(pids, fields):
+    """Get some fields of several records from the DB with a single query.
+
+    Args:
+        pids (Iterable[Tuple[str, Union[str, int]]): a list of (pid_type, pid_value) tuples.
+        fields (List[str]): dotted paths of the JSON fields to fetch.
+
+    Returns:
+        dict: the JSON of the records found in the database, containing only
+        the requested fields and keyed by their ``(pid_type, pid_value)``.
+    """
+    pids = set((pid_type, str(pid_value)) for (pid_type, pid_value) in pids)
+    if not pids:
+        return {}
+
+    query = get_query_db_records(
+        set(pid_type for pid_type, _ in pids), fields=fields
+    ).filter(
+        tuple_(PersistentIdentifier.pid_type, PersistentIdentifier.pid_value).in_(pids)
+    )
+
+    return {
+        (row[1], row[2]): _build_projected_json(fields, row[3:])
+        for row in query
+    }
+
+
 def get_conference_record(record, default=None):
     """Return the first Conference record associated with a record.
 
@@ -31,7 +31,7 @@ from inspire_utils.helpers import force_list
 from inspire_utils.dedupers import dedupe_list_of_dicts
 from inspire_utils.record import get_value
 
-from inspirehep.utils.jinja2 import render_template_to_string
+from inspirehep.utils.jinja2 import render_template_to_strings
 from inspirehep.utils.record_getter import get_es_records
 from inspirehep.utils.url import retrieve_uri
 
@@ -67,8 +67,8 @@ def get_and_format_references(record):
         recid_to_reference = {
             ref['control_number']: ref for ref in resolved_references
         }
+        contexts = []
         for reference in references:
-            row = []
             ref_record = recid_to_reference.get(
                 reference.get('recid'), {}
             )
@@ -79,13 +79,17 @@ def get_and_format_references(record):
                 reference['publication_info'] = force_list(
                     reference['publication_info']
                 )
-            row.append(render_template_to_string(
-                'inspirehep_theme/references.html',
-                record=ref_record,
-                reference=reference
-            ))
-            row.append(ref_record.get('citation_count', ''))
-            out.append(row)
+            contexts.append({'record': ref_record, 'reference': reference})
+
+        rendered_references = render_template_to_strings(
+            'inspirehep_theme/references.html',
+            contexts,
+        )
+        for rendered_reference, context in zip(rendered_references, contexts):
+            out.append([
+                rendered_reference,
+                context['record'].get('citation_count', ''),
+            ])
 
     return out
 
@@ -32,6 +32,7 @@ from .factory import create_app
 
 
 application = create_app()
+application.extensions['inspire-search'].warm_up_parsed_query_cache(application)
 if application.debug:
     application = DebuggedApplication(application, evalex=True)
 
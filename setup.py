@@ -144,11 +144,13 @@ setup(
             'inspire_orcid = inspirehep.modules.orcid.tasks',
             'inspire_records = inspirehep.modules.records.tasks',
             'inspire_refextract = inspirehep.modules.refextract.tasks',
+            'inspire_search = inspirehep.modules.search.tasks',
         ],
         'invenio_db.alembic': [
             'inspirehep = inspirehep:alembic',
         ],
         'invenio_db.models': [
+            'inspire_records = inspirehep.modules.records.models',
             'inspire_workflows_audit = inspirehep.modules.workflows.models',
         ],
         'invenio_jsonschemas.schemas': [
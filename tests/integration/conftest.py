@@ -100,6 +100,7 @@ def app():
         SECRET_KEY='secret!',
         RECORD_EDITOR_FILE_UPLOAD_FOLDER='tests/integration/editor/temp',
         TESTING=True,
+        WORKFLOWS_GROBID_CACHE_DIR=None,
     )
     app.extensions['invenio-search'].register_mappings('records', 'inspirehep.modules.records.mappings')
     with app.app_context(), mock.patch(
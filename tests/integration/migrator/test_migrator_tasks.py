@@ -36,6 +36,7 @@ from inspirehep.utils.record_getter import get_es_record, RecordGetterError
 from inspirehep.modules.migrator.models import LegacyRecordsMirror
 from inspirehep.modules.migrator.tasks import (
     _build_recid_to_uuid_map,
+    insert_into_mirror,
     migrate_from_file,
     migrate_and_insert_record,
 )
@@ -253,3 +254,46 @@ def test_migrate_from_mirror_doesnt_index_deleted_records(isolated_app):
     get_es_record('lit', 12345)
     with pytest.raises(RecordGetterError):
         get_es_record('lit', 1234)
+
+
+def test_insert_into_mirror_upserts_records(isolated_app):
+    raw_record = (
+        '<record>'
+        '  <controlfield tag="001">12345</controlfield>'
+        '  <datafield tag="245" ind1=" " ind2=" ">'
+        '    <subfield code="a">{}</subfield>'
+        '  </datafield>'
+        '</record>'
+    )
+    insert_into_mirror([raw_record.format('First title')])
+    prod_record = LegacyRecordsMirror.query.get(12345)
+    prod_record.valid = True
+    db.session.commit()
+
+    insert_into_mirror([
+        raw_record.format('Second title'),
+        raw_record.format('Third title'),
+    ])
+
+    prod_record = LegacyRecordsMirror.query.get(12345)
+    assert prod_record.valid is None
+    assert prod_record.marcxml == raw_record.format('Third title')
+
+
+def test_migrate_from_file_in_bulk(isolated_app):
+    record_fixture_path = pkg_resources.resource_filename(
+        __name__,
+        os.path.join('fixtures', 'dummy.xml')
+    )
+    record_fixture_path_deleted = pkg_resources.resource_filename(
+        __name__,
+        os.path.join('fixtures', 'deleted_record.xml')
+    )
+    migrate_from_file(record_fixture_path, bulk=True)
+    migrate_from_file(record_fixture_path_deleted, bulk=True)
+
+    prod_record = LegacyRecordsMirror.query.get(12345)
+    assert prod_record.valid is True
+    get_es_record('lit', 12345)
+    with pytest.raises(RecordGetterError):
+        get_es_record('lit', 1234)
@@ -104,6 +104,39 @@ class TestOrcidCache(object):
         self.cache.delete_work_putcode()
         assert not self.cache.read_work_putcode()
 
+    def test_read_works_putcodes(self):
+        self.cache.write_work_putcode(self.putcode, self.inspire_record)
+
+        result = OrcidCache.read_works_putcodes(self.orcid, [self.recid, '0000'])
+
+        putcode, cache = result[self.recid]
+        assert putcode == self.putcode
+        assert cache._cached_hash_value == self.hash_value
+        assert result['0000'][0] is None
+
+    def test_read_works_putcodes_content_changed_no_extra_read(self):
+        self.cache.write_work_putcode(self.putcode, self.inspire_record)
+
+        _, cache = OrcidCache.read_works_putcodes(self.orcid, [self.recid])[self.recid]
+        with mock.patch.object(cache, 'read_work_putcode') as mock_read:
+            assert not cache.has_work_content_changed(self.inspire_record)
+        mock_read.assert_not_called()
+
+    def test_write_works_putcodes(self):
+        self.cache.write_work_putcode(self.putcode, self.inspire_record)
+
+        OrcidCache.write_works_putcodes(self.orcid, {self.recid: '0000', '1111': '2222'})
+
+        result = OrcidCache.read_works_putcodes(self.orcid, [self.recid, '1111'])
+        assert result[self.recid][0] == '0000'
+        assert result[self.recid][1]._cached_hash_value == self.hash_value
+        assert result['1111'][0] == '2222'
+        OrcidCache(self.orcid, '1111').delete_work_putcode()
+
+    def test_write_works_putcodes_empty_putcode(self):
+        with pytest.raises(ValueError):
+            OrcidCache.write_works_putcodes(self.orcid, {self.recid: None})
+
     def test_delete_work_putcode_non_existing(self):
         recid = '0000'
         cache = OrcidCache(self.orcid, recid)
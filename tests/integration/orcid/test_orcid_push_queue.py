@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+from __future__ import absolute_import, division, print_function
+
+import mock
+import pytest
+
+from fqn_decorators.decorators import get_fqn
+
+from inspirehep.modules.orcid import domain_models, push_queue as push_queue_module, tasks
+from inspirehep.modules.orcid.push_queue import OrcidPushQueue
+
+
+@pytest.mark.usefixtures('isolated_app')
+class TestOrcidPushQueue(object):
+    def setup(self):
+        self.orcid = '0000-0002-76YY-56XX'
+        self.queue = OrcidPushQueue(self.orcid)
+
+    def setup_method(self, method):
+        push_queue_module.CACHE_PREFIX = get_fqn(method)
+
+    def teardown(self):
+        self.queue.pop_all()
+        push_queue_module.CACHE_PREFIX = None
+
+    def test_enqueue_schedules_once(self):
+        assert self.queue.enqueue(1, 3, window=10)
+        assert not self.queue.enqueue(2, 4, window=10)
+
+    def test_enqueue_coalesces_same_recid(self):
+        self.queue.enqueue(1, 3, window=10)
+        self.queue.enqueue(1, 5, window=10)
+        self.queue.enqueue(2, None, window=10)
+
+        assert self.queue.pop_all() == {'1': 5, '2': None}
+
+    def test_pop_all_empties_the_queue_and_the_flag(self):
+        self.queue.enqueue(1, 3, window=10)
+        self.queue.pop_all()
+
+        assert self.queue.pop_all() == {}
+        assert self.queue.enqueue(2, 4, window=10)
+
+    @mock.patch('inspirehep.modules.orcid.tasks.orcid_push_batch')
+    def test_enqueue_orcid_push(self, mock_orcid_push_batch):
+        tasks.enqueue_orcid_push(self.orcid, 1, 'mytoken', record_db_version=3)
+        tasks.enqueue_orcid_push(self.orcid, 2, 'mytoken', record_db_version=4)
+
+        mock_orcid_push_batch.apply_async.assert_called_once_with(
+            queue='orcid_push',
+            countdown=mock.ANY,
+            kwargs={'orcid': self.orcid, 'oauth_token': 'mytoken'},
+        )
+        assert self.queue.pop_all() == {'1': 3, '2': 4}
+
+    @mock.patch('inspirehep.modules.orcid.tasks.orcid_push')
+    @mock.patch('inspirehep.modules.orcid.domain_models.OrcidBatchPusher')
+    def test_orcid_push_batch_defers_to_orcid_push(self, mock_pusher_cls, mock_orcid_push, isolated_app):
+        mock_pusher = mock_pusher_cls.return_value
+        mock_pusher.push.return_value = {'1': '123'}
+        mock_pusher.deferred = {'2': 4}
+        self.queue.enqueue(1, 3, window=10)
+        self.queue.enqueue(2, 4, window=10)
+
+        with mock.patch.dict(isolated_app.config, {'FEATURE_FLAG_ENABLE_ORCID_PUSH': True}):
+            result = tasks.orcid_push_batch(self.orcid, 'mytoken')
+
+        assert result == {'1': '123'}
+        mock_pusher_cls.assert_called_once_with(self.orcid, 'mytoken', {'1': 3, '2': 4})
+        mock_orcid_push.apply_async.assert_called_once_with(
+            queue='orcid_push',
+            kwargs={
+                'orcid': self.orcid,
+                'rec_id': '2',
+                'oauth_token': 'mytoken',
+                'kwargs_to_pusher': {'record_db_version': 4},
+            },
+        )
+
+    @mock.patch('inspirehep.modules.orcid.domain_models.distributed_lock')
+    @mock.patch('inspirehep.modules.orcid.domain_models.OrcidPusher')
+    @mock.patch('inspirehep.modules.orcid.domain_models.OrcidCache.read_works_putcodes')
+    @mock.patch('inspirehep.modules.orcid.domain_models.OrcidBatchPusher._get_inspire_records')
+    def test_orcid_batch_pusher_defers_failed_records(
+            self, mock_get_inspire_records, mock_read_works_putcodes, mock_pusher_cls, mock_lock):
+        mock_get_inspire_records.return_value = {'1': mock.Mock(), '2': mock.Mock()}
+        mock_read_works_putcodes.return_value = {
+            '1': ('11', mock.Mock()),
+            '2': ('22', mock.Mock()),
+        }
+
+        def make_pusher(orcid, recid, oauth_token, **kwargs):
+            pusher = mock.Mock(
+                recid=recid,
+                record_db_version=kwargs['record_db_version'],
+                _do_force_cache_miss=False,
+                _is_record_deleted=False,
+            )
+            if recid == '1':
+                pusher.push_work.return_value = '11'
+            else:
+                pusher.push_work.side_effect = ValueError
+            return pusher
+
+        mock_pusher_cls.side_effect = make_pusher
+
+        pusher = domain_models.OrcidBatchPusher(self.orcid, 'mytoken', {'1': 3, '2': 4})
+
+        assert pusher.push() == {'1': '11'}
+        assert pusher.deferred == {'2': 4}
@@ -65,6 +65,20 @@ class TestOrcidPutcodeGetter(object):
             putcodes_recids = list(putcode_getter.get_all_inspire_putcodes_and_recids_iter())
         assert putcodes_recids == [('51341099', '20'), ('51341192', '20')]
 
+    def test_warm_up_putcodes_cache(self):
+        with override_config(ORCID_APP_CREDENTIALS={'consumer_key': self.source_client_id_path}):
+            putcode_getter = OrcidPutcodeGetter(self.orcid, self.oauth_token)
+            with mock.patch.object(
+                putcode_getter,
+                'get_all_inspire_putcodes_and_recids_iter',
+                return_value=iter([('51341099', 20), ('51341192', '21')]),
+            ), mock.patch('inspirehep.modules.orcid.putcode_getter.OrcidCache') as mock_cache:
+                putcodes_by_recid = putcode_getter.warm_up_putcodes_cache()
+
+        expected = {'20': '51341099', '21': '51341192'}
+        assert putcodes_by_recid == expected
+        mock_cache.write_works_putcodes.assert_called_once_with(self.orcid, expected)
+
     def test_token_invalid(self):
         token = 'invalid'
         putcode_getter = OrcidPutcodeGetter(self.orcid, token)
@@ -28,7 +28,11 @@ import mock
 from invenio_pidstore.models import PersistentIdentifier, RecordIdentifier
 from jsonschema import ValidationError
 
-from inspirehep.modules.records.api import InspireRecord
+from inspirehep.modules.records.api import (
+    InspireRecord,
+    rebuild_citations_count,
+    update_citations_count,
+)
 from inspirehep.utils.record_getter import get_db_record
 from factories.db.invenio_records import TestRecordMetadata
 
@@ -192,6 +196,52 @@ def test_citations_from_superseded_should_not_count_to_citation_count(isolated_a
     assert record.get_citations_count() == 2
 
 
+def test_update_citations_count_stores_counts_of_given_records(isolated_app):
+    cited = TestRecordMetadata.create_from_kwargs(
+        json={'control_number': 3210}).inspire_record
+    not_cited = TestRecordMetadata.create_from_kwargs(
+        json={'control_number': 3211}).inspire_record
+    assert cited.get_stored_citations_count() is None
+
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 3212,
+        'references': [{'record': {'$ref': cited._get_ref()}}],
+    })
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 3213,
+        'references': [{'record': {'$ref': cited._get_ref()}}],
+    })
+
+    assert update_citations_count([('lit', 3210), ('lit', 3211)]) == 2
+    assert cited.get_stored_citations_count() == 2
+    assert not_cited.get_stored_citations_count() == 0
+
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 3214,
+        'references': [{'record': {'$ref': cited._get_ref()}}],
+    })
+
+    assert update_citations_count([('lit', 3210)]) == 1
+    assert cited.get_stored_citations_count() == 3
+
+
+def test_rebuild_citations_count_matches_citations_count(isolated_app):
+    cited = TestRecordMetadata.create_from_kwargs(
+        json={'control_number': 3220}).inspire_record
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 3221,
+        'references': [{'record': {'$ref': cited._get_ref()}}],
+    })
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 3222,
+        'deleted': True,
+        'references': [{'record': {'$ref': cited._get_ref()}}],
+    })
+
+    assert rebuild_citations_count() > 0
+    assert cited.get_stored_citations_count() == cited.get_citations_count() == 1
+
+
 @mock.patch('inspirehep.modules.records.api.InspireRecord.files', return_value='350b55be-fde5-4a79-ae1f-398f1b0def96')
 def test_url_is_correctly_escaped(mock_files, isolated_app):
     record_json = {
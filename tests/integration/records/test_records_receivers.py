@@ -42,6 +42,7 @@ from invenio_search import current_search
 from invenio_records.signals import after_record_update
 
 from inspirehep.modules.migrator.tasks import migrate_and_insert_record
+from inspirehep.modules.orcid.push_queue import OrcidPushQueue
 from inspirehep.modules.records.api import InspireRecord
 from inspirehep.modules.records.errors import MissingInspireRecordError, MissingCitedRecordError
 from inspirehep.modules.records.tasks import index_modified_citations_from_record
@@ -266,6 +267,27 @@ def test_orcid_push_triggered_on_record_update_with_allow_push(mock_orcid_push_t
     mock_orcid_push_task.apply_async.assert_called_once_with(**expected_kwargs)
 
 
+@mock.patch('inspirehep.modules.orcid.tasks.orcid_push_batch')
+@mock.patch('inspirehep.modules.orcid.tasks.orcid_push')
+def test_orcid_push_queued_on_record_update_with_push_queue(mock_orcid_push_task, mock_orcid_push_batch_task, app, record, user_with_permission, enable_orcid_push_feature):
+    with mock.patch.dict(app.config, {'FEATURE_FLAG_ENABLE_ORCID_PUSH_QUEUE': True}):
+        record.commit()
+        record.commit()
+
+    mock_orcid_push_task.apply_async.assert_not_called()
+    mock_orcid_push_batch_task.apply_async.assert_called_once_with(
+        queue='orcid_push',
+        countdown=app.config['ORCID_PUSH_QUEUE_WINDOW'],
+        kwargs={
+            'orcid': user_with_permission['orcid'],
+            'oauth_token': user_with_permission['token'],
+        },
+    )
+
+    queue = OrcidPushQueue(user_with_permission['orcid'])
+    assert list(queue.pop_all()) == ['1608652']
+
+
 @mock.patch('inspirehep.modules.orcid.tasks.orcid_push')
 def test_orcid_push_triggered_on_create_record_with_multiple_authors_with_allow_push(mock_orcid_push_task, app, raw_record, two_users_with_permission, enable_orcid_push_feature):
     migrate_and_insert_record(raw_record, skip_files=True)
@@ -51,3 +51,23 @@ def test_marcxml_serializer_serialize_results(api_client):
 
     assert expected_701585 in result
     assert expected_1373790 in result
+
+
+def test_marcxml_export_streams_all_results(api_client):
+    response = api_client.get('/literature/export?q=title collider&format=marcxml')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/marcxml+xml'
+
+    result = response.data
+
+    assert result.startswith(b'<?xml')
+    assert result.count(b'<collection') == 1
+    assert b'<controlfield tag="001">701585</controlfield>' in result
+    assert b'<controlfield tag="001">1373790</controlfield>' in result
+
+
+def test_export_with_unknown_format(api_client):
+    response = api_client.get('/literature/export?q=title collider&format=foo')
+
+    assert response.status_code == 400
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+from flask import current_app
+from mock import patch
+from redis import StrictRedis
+
+from inspirehep.modules.records.tasks import (
+    CITATIONS_REINDEX_STATS_KEY,
+    PENDING_CITATIONS_REINDEX_KEY,
+    PROCESSING_CITATIONS_REINDEX_KEY,
+    get_citations_reindex_stats,
+    queue_citations_reindex,
+    reindex_pending_citations,
+)
+
+
+@pytest.fixture(scope='function')
+def redis_citations_reindex(app):
+    r = StrictRedis.from_url(current_app.config.get('CACHE_REDIS_URL'))
+    keys = (
+        CITATIONS_REINDEX_STATS_KEY,
+        PENDING_CITATIONS_REINDEX_KEY,
+        PROCESSING_CITATIONS_REINDEX_KEY,
+    )
+    r.delete(*keys)
+
+    with patch.dict(current_app.config, {'FEATURE_FLAG_ENABLE_CITATIONS_REINDEX_COALESCING': True}):
+        yield r
+
+    r.delete(*keys)
+
+
+def test_queue_citations_reindex_counts_saved_reindexes(redis_citations_reindex):
+    assert queue_citations_reindex(['uuid-1', 'uuid-2']) == 2
+    assert queue_citations_reindex(['uuid-2', 'uuid-3']) == 1
+
+    expected = {'requested': 4, 'saved': 1, 'reindexed': 0}
+    result = get_citations_reindex_stats()
+
+    assert expected == result
+
+
+@patch('inspirehep.modules.records.tasks.batch_reindex', return_value={'failures': []})
+def test_reindex_pending_citations_reindexes_each_record_once(mocked_batch_reindex, redis_citations_reindex):
+    queue_citations_reindex(['uuid-1', 'uuid-2'])
+    queue_citations_reindex(['uuid-2', 'uuid-3'])
+
+    reindex_pending_citations(batch_size=2)
+
+    reindexed = [uuid for call in mocked_batch_reindex.call_args_list for uuid in call[0][0]]
+
+    assert sorted(reindexed) == ['uuid-1', 'uuid-2', 'uuid-3']
+    assert mocked_batch_reindex.call_count == 2
+    assert get_citations_reindex_stats()['reindexed'] == 3
+    assert not redis_citations_reindex.exists(PENDING_CITATIONS_REINDEX_KEY)
+    assert not redis_citations_reindex.exists(PROCESSING_CITATIONS_REINDEX_KEY)
+
+
+@patch('inspirehep.modules.records.tasks.batch_reindex', return_value={'failures': []})
+def test_reindex_pending_citations_resumes_interrupted_run(mocked_batch_reindex, redis_citations_reindex):
+    redis_citations_reindex.sadd(PROCESSING_CITATIONS_REINDEX_KEY, 'uuid-1')
+    queue_citations_reindex(['uuid-2'])
+
+    reindex_pending_citations()
+
+    reindexed = sorted(mocked_batch_reindex.call_args[0][0])
+
+    assert reindexed == ['uuid-1', 'uuid-2']
+
+
+@patch('inspirehep.modules.records.tasks.batch_reindex')
+def test_reindex_pending_citations_keeps_the_failed_records(mocked_batch_reindex, redis_citations_reindex):
+    mocked_batch_reindex.return_value = {
+        'failures': [{'index': {'_id': 'uuid-2', 'status': 400, 'error': 'mapper_parsing_exception'}}],
+    }
+    queue_citations_reindex(['uuid-1', 'uuid-2'])
+
+    reindex_pending_citations()
+
+    assert get_citations_reindex_stats()['reindexed'] == 1
+    assert redis_citations_reindex.smembers(PROCESSING_CITATIONS_REINDEX_KEY) == {b'uuid-2'}
+
+
+@patch('inspirehep.modules.records.tasks.batch_reindex')
+def test_reindex_pending_citations_does_nothing_without_coalescing(mocked_batch_reindex, redis_citations_reindex):
+    queue_citations_reindex(['uuid-1'])
+
+    with patch.dict(current_app.config, {'FEATURE_FLAG_ENABLE_CITATIONS_REINDEX_COALESCING': False}):
+        reindex_pending_citations()
+
+    mocked_batch_reindex.assert_not_called()
+    assert redis_citations_reindex.smembers(PENDING_CITATIONS_REINDEX_KEY) == {b'uuid-1'}
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, division, print_function
+
+from datetime import timedelta
+
+import pytest
+from invenio_db import db
+from mock import patch
+
+from inspirehep.modules.refextract import resolver
+from inspirehep.modules.refextract.resolver import (
+    get_recids_by_identifiers,
+    resolve_references_by_identifiers,
+)
+
+from factories.db.invenio_records import TestRecordMetadata
+
+
+@pytest.fixture(autouse=True)
+def clear_identifiers_cache():
+    resolver._clear_identifiers_cache()
+    resolver._identifiers_cache_state.clear()
+    yield
+    resolver._clear_identifiers_cache()
+    resolver._identifiers_cache_state.clear()
+
+
+def test_resolve_references_by_identifiers(isolated_app):
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 1,
+        'arxiv_eprints': [{'value': '1812.09293'}],
+        'dois': [{'value': '10.1007/JHEP04(2019)113'}],
+    })
+    references = [
+        {'reference': {'arxiv_eprint': '1812.09293'}},
+        {'reference': {'arxiv_eprint': '1812.09293', 'dois': ['10.1007/JHEP04(2019)113']}},
+        {'reference': {'arxiv_eprint': '1812.09293', 'dois': ['10.1000/unknown']}},
+        {'reference': {'title': {'title': 'No identifiers'}}},
+    ]
+
+    assert resolve_references_by_identifiers(references) == [1, 1, None, None]
+
+
+def test_resolve_references_by_identifiers_shared_by_two_records(isolated_app):
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 1,
+        'arxiv_eprints': [{'value': '1812.09293'}],
+    })
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 2,
+        'dois': [{'value': '10.1007/JHEP04(2019)113'}],
+    })
+    references = [
+        {'reference': {'arxiv_eprint': '1812.09293', 'dois': ['10.1007/JHEP04(2019)113']}},
+    ]
+
+    assert resolve_references_by_identifiers(references) == [None]
+
+
+@patch.object(resolver, 'IDENTIFIERS_CACHE_REFRESH_INTERVAL', timedelta(0))
+def test_get_recids_by_identifiers_follows_new_records(isolated_app):
+    TestRecordMetadata.create_from_kwargs(json={'control_number': 1})
+    identifier = ('report_numbers', 'CERN-TH-2019-001')
+
+    assert get_recids_by_identifiers([identifier]) == {identifier: ()}
+
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 2,
+        'report_numbers': [{'value': 'CERN-TH-2019-001'}],
+    })
+
+    assert get_recids_by_identifiers([identifier]) == {identifier: (2,)}
+
+
+@patch.object(resolver, 'IDENTIFIERS_CACHE_REFRESH_INTERVAL', timedelta(0))
+def test_get_recids_by_identifiers_follows_removed_identifiers(isolated_app):
+    record = TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 1,
+        'dois': [{'value': '10.1007/JHEP04(2019)113'}],
+    }).record_metadata
+    identifier = ('dois', '10.1007/JHEP04(2019)113')
+
+    assert get_recids_by_identifiers([identifier]) == {identifier: (1,)}
+
+    record.json = dict(record.json, dois=[])
+    db.session.flush()
+
+    assert get_recids_by_identifiers([identifier]) == {identifier: ()}
+
+
+def test_get_recids_by_identifiers_refreshes_the_cache_once_per_interval(isolated_app):
+    TestRecordMetadata.create_from_kwargs(json={'control_number': 1})
+    identifier = ('report_numbers', 'CERN-TH-2019-001')
+
+    assert get_recids_by_identifiers([identifier]) == {identifier: ()}
+
+    TestRecordMetadata.create_from_kwargs(json={
+        'control_number': 2,
+        'report_numbers': [{'value': 'CERN-TH-2019-001'}],
+    })
+
+    assert get_recids_by_identifiers([identifier]) == {identifier: ()}
@@ -27,7 +27,11 @@ from flask import current_app
 from mock import patch
 
 from inspirehep.modules.records.api import InspireRecord
-from inspirehep.modules.refextract.tasks import create_journal_kb_file
+from inspirehep.modules.refextract.tasks import (
+    _journal_kb_cache,
+    create_journal_kb_dict,
+    create_journal_kb_file,
+)
 from inspirehep.utils.record_getter import get_db_record
 
 
@@ -107,3 +111,44 @@ def test_create_journal_kb_file_handles_deleted_journals(jhep_deleted, tmpdir):
     journal_kb = journal_kb_fd.read().splitlines()
 
     assert '---JHEP' not in journal_kb
+
+
+def test_create_journal_kb_dict(app):
+    journal_kb = create_journal_kb_dict()
+
+    assert journal_kb['JHEP'] == 'JHEP'
+    assert journal_kb['THE JOURNAL OF HIGH ENERGY PHYSICS JHEP'] == 'JHEP'
+    assert journal_kb['JOURNAL OF HIGH ENERGY PHYSICS'] == 'JHEP'
+
+
+def test_create_journal_kb_dict_is_built_once_per_version(app):
+    expected = create_journal_kb_dict()
+
+    with patch('inspirehep.modules.refextract.tasks.build_journal_kb_dict') as mock_build:
+        result = create_journal_kb_dict()
+        _journal_kb_cache.clear()
+        result_from_redis = create_journal_kb_dict()
+
+    mock_build.assert_not_called()
+    assert expected == result == result_from_redis
+    assert expected.version == result.version == result_from_redis.version
+
+
+def test_create_journal_kb_dict_is_rebuilt_when_journals_change(app):
+    version = create_journal_kb_dict().version
+
+    record = get_db_record('jou', 1213103)
+    record['title_variants'].append('A NEW TITLE VARIANT')
+    record = InspireRecord.create_or_update(record)
+    record.commit()
+
+    try:
+        journal_kb = create_journal_kb_dict()
+
+        assert journal_kb.version != version
+        assert journal_kb['A NEW TITLE VARIANT'] == 'JHEP'
+    finally:
+        record = get_db_record('jou', 1213103)
+        record['title_variants'] = record['title_variants'][:-1]
+        record = InspireRecord.create_or_update(record)
+        record.commit()
@@ -32,6 +32,16 @@ def test_downgrade(isolated_app):
     alembic = Alembic(isolated_app)
     alembic.upgrade()
 
+    alembic.downgrade(target='5a0e2405b624')
+    assert 'ix_records_metadata_json_arxiv_eprints' not in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_json_dois' not in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_json_isbns' not in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_json_report_numbers' not in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_updated' not in _get_indexes('records_metadata')
+
+    alembic.downgrade(target='2dd443feeb63')
+    assert 'records_citations_count' not in _get_table_names()
+
     # downgrade 0bc0a6ee1bc0 == downgrade to 2f5368ff6d20
 
     alembic.downgrade(target='0bc0a6ee1bc0')
@@ -180,6 +190,20 @@ def test_upgrade(app):
     assert 'ix_records_metadata_json_referenced_records' not in _get_indexes(
         'records_metadata')
 
+    # 5a0e2405b624
+
+    alembic.upgrade(target='5a0e2405b624')
+    assert 'records_citations_count' in _get_table_names()
+
+    # a70f02f4cec5
+
+    alembic.upgrade(target='a70f02f4cec5')
+    assert 'ix_records_metadata_json_arxiv_eprints' in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_json_dois' in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_json_isbns' in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_json_report_numbers' in _get_indexes('records_metadata')
+    assert 'ix_records_metadata_updated' in _get_indexes('records_metadata')
+
 
 def _get_indexes(tablename):
     query = text('''
@@ -22,8 +22,22 @@
 
 from __future__ import absolute_import, division, print_function
 
+import json
+
+from mock import patch
+
 
 def test_citations(app_client):
     """Tests if citation datatables work for records."""
     response = app_client.get('/ajax/citations?recid=712925&endpoint=literature')
     assert response.status_code == 200
+
+
+def test_citations_are_cached_while_citation_count_is_unchanged(app_client):
+    response = app_client.get('/ajax/citations?recid=712925&endpoint=literature')
+
+    with patch('inspirehep.utils.citations.LiteratureSearch') as mock_literature_search:
+        cached_response = app_client.get('/ajax/citations?recid=712925&endpoint=literature')
+
+    mock_literature_search.assert_not_called()
+    assert json.loads(cached_response.data) == json.loads(response.data)
@@ -28,8 +28,11 @@ import zlib
 
 import pytest
 from flask import current_app
+from mock import patch
 from redis import StrictRedis
 
+from invenio_db import db
+
 from inspirehep.modules.migrator.models import LegacyRecordsMirror
 from inspirehep.modules.migrator.tasks import continuous_migration
 from inspirehep.utils.record_getter import get_db_record
@@ -148,3 +151,26 @@ def test_continuous_migration_handles_record_updates(app, record_1502656_and_upd
     result = LegacyRecordsMirror.query.get(1502656).marcxml
 
     assert expected == result
+
+
+def test_continuous_migration_handles_multiple_batches(app, record_1502655_and_1502656):
+    r = StrictRedis.from_url(current_app.config.get('CACHE_REDIS_URL'))
+
+    with patch.dict(current_app.config, {'RECORDS_MIGRATION_CONTINUOUS_BATCH_SIZE': 1}):
+        continuous_migration()
+
+    assert r.lrange('legacy_records', 0, 0) == []
+
+    get_db_record('aut', 1502655)  # Does not raise.
+    get_db_record('lit', 1502656)  # Does not raise.
+
+
+def test_continuous_migration_keeps_records_that_failed_to_be_committed(app, record_1502656):
+    r = StrictRedis.from_url(current_app.config.get('CACHE_REDIS_URL'))
+
+    with patch('inspirehep.modules.migrator.tasks.db.session.commit', side_effect=Exception):
+        with pytest.raises(Exception):
+            continuous_migration()
+    db.session.rollback()
+
+    assert r.lrange('legacy_records', 0, 0) != []
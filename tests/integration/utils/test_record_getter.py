@@ -24,7 +24,9 @@ from __future__ import absolute_import, division, print_function
 
 from inspirehep.utils.record_getter import (
     get_db_records,
+    get_db_records_projection,
     get_es_records,
+    stream_db_records,
 )
 
 
@@ -77,3 +79,45 @@ def test_get_db_records_accept_multiple_pid_types(app):
     results = list(get_db_records(records))
 
     assert len(results) == 3
+
+
+def test_stream_db_records_yields_records_in_uuid_order(app):
+    records = list(stream_db_records(['lit'], page_size=3))
+    uuids = [record.id for record in records]
+
+    assert len(records) > 3
+    assert uuids == sorted(uuids)
+    assert len(set(uuids)) == len(uuids)
+    assert all(record.pid_type == 'lit' for record in records)
+
+
+def test_stream_db_records_projects_fields(app):
+    records = {
+        record.pid_value: record.json
+        for record in stream_db_records(
+            ['lit'], fields=['control_number', 'titles'])
+    }
+
+    assert set(records['4328']) == {'control_number', 'titles'}
+    assert records['4328']['control_number'] == 4328
+
+
+def test_stream_db_records_resumes_after_uuid(app):
+    uuids = [record.id for record in stream_db_records(['lit'], fields=[])]
+
+    result = [
+        record.id for record in
+        stream_db_records(['lit'], fields=[], start_after=uuids[1], end_before=uuids[-1])
+    ]
+
+    assert result == uuids[2:-1]
+
+
+def test_get_db_records_projection(app):
+    records = [('lit', 1498175), ('aut', 983059), ('lit', 0)]
+
+    result = get_db_records_projection(records, ['control_number', 'titles'])
+
+    assert set(result) == {('lit', '1498175'), ('aut', '983059')}
+    assert set(result[('lit', '1498175')]) == {'control_number', 'titles'}
+    assert result[('aut', '983059')] == {'control_number': 983059}
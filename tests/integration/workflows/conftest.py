@@ -113,6 +113,7 @@ def workflow_app(higgs_ontology):
             LEGACY_ROBOTUPLOAD_URL=("http://localhost:1234"),
             MAGPIE_API_URL="http://example.com/magpie",
             WORKFLOWS_FILE_LOCATION="/",
+            WORKFLOWS_GROBID_CACHE_DIR=None,
             WORKFLOWS_MATCH_REMOTE_SERVER_URL="http://legacy_search.endpoint/",
             WTF_CSRF_ENABLED=False,
         )
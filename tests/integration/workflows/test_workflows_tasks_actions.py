@@ -44,7 +44,8 @@ from workflow_utils import build_workflow
 
 from inspirehep.modules.workflows.tasks.actions import (
     affiliations_for_hidden_collections, core_selection_wf_already_created,
-    create_core_selection_wf, link_institutions_with_affiliations,
+    create_core_selection_wf, get_journals_by_short_title,
+    link_institutions_with_affiliations,
     load_from_source_data, normalize_author_affiliations,
     normalize_collaborations, normalize_journal_titles, refextract,
     remove_inspire_categories_derived_from_core_arxiv_categories,
@@ -1584,3 +1585,23 @@ def test_extract_journal_info_hep_request(workflow_app):
 
             assert validate(result, subschema) is None
             assert expected == result
+
+
+def test_get_journals_by_short_title(workflow_app, insert_journals_in_db):
+    journals = get_journals_by_short_title({'Test.Jou.1', 'Unknown.Jou'})
+
+    assert list(journals) == ['Test.Jou.1']
+    assert journals['Test.Jou.1']['self'] == {
+        '$ref': 'http://localhost:5000/api/journals/1936475'
+    }
+    assert {'term': 'Astrophysics'} in journals['Test.Jou.1']['inspire_categories']
+
+
+def test_get_journals_by_short_title_caches_journals(workflow_app, insert_journals_in_db):
+    expected = get_journals_by_short_title({'Test.Jou.1', 'Unknown.Jou'})
+
+    with mock.patch('inspirehep.modules.workflows.tasks.actions.RecordMetadata') as mock_record_metadata:
+        result = get_journals_by_short_title({'Test.Jou.1', 'Unknown.Jou'})
+
+    mock_record_metadata.query.with_entities.assert_not_called()
+    assert expected == result
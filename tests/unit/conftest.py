@@ -55,6 +55,7 @@ def app():
         TESTING=True,
         PRODUCTION_MODE=True,
         WORKFLOWS_MAX_AUTHORS_COUNT_FOR_GROBID_EXTRACTION=50,
+        WORKFLOWS_GROBID_CACHE_DIR=None,
     )
 
     with app.app_context():
@@ -25,7 +25,7 @@ from __future__ import absolute_import, division, print_function
 import os
 import pkg_resources
 
-from inspirehep.modules.migrator.tasks import read_file
+from inspirehep.modules.migrator.tasks import read_file, split_stream
 
 
 def test_read_file_reads_xml_file_correctly():
@@ -64,3 +64,49 @@ def test_read_file_reads_prodsync_file_correctly():
     result = list(read_file(prodsync_file))
 
     assert expected == result
+
+
+def test_read_file_reads_prodsync_file_in_blocks():
+    xml_files = [
+        pkg_resources.resource_filename(__name__, os.path.join('fixtures', '1663923.xml')),
+        pkg_resources.resource_filename(__name__, os.path.join('fixtures', '1663924.xml')),
+    ]
+
+    prodsync_file = pkg_resources.resource_filename(__name__, os.path.join('fixtures', 'micro-prodsync.tar'))
+
+    expected = b''
+    for xml_file in xml_files:
+        with open(xml_file, 'rb') as f:
+            expected += f.read()
+    result = list(read_file(prodsync_file, block_size=100))
+
+    assert expected == b''.join(result)
+    assert all(len(block) <= 100 for block in result)
+
+
+def test_split_stream_splits_records_cut_anywhere():
+    stream = [
+        b'<collection><record><controlfield tag="001">1</controlfield></rec',
+        b'ord><record>',
+        b'<controlfield tag="001">2</controlfield></record',
+        b'></collection>',
+    ]
+
+    expected = [
+        b'<record><controlfield tag="001">1</controlfield></record>',
+        b'<record><controlfield tag="001">2</controlfield></record>',
+    ]
+    result = list(split_stream(stream))
+
+    assert expected == result
+
+
+def test_split_stream_splits_records_of_file():
+    xml_file = pkg_resources.resource_filename(__name__, os.path.join('fixtures', '1663924.xml'))
+
+    result = list(split_stream(read_file(xml_file, block_size=7)))
+
+    assert len(result) == 1
+    assert result[0].startswith(b'<record')
+    assert result[0].endswith(b'</record>')
+    assert b'<controlfield tag="001">1663924</controlfield>' in result[0]
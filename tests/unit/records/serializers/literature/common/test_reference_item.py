@@ -225,9 +225,9 @@ def test_returns_no_misc_if_title_persent():
     assert expected == json.loads(result)
 
 
-@mock.patch('inspirehep.modules.records.serializers.schemas.json.literature.common.reference_item.get_linked_records_in_field')
+@mock.patch('inspirehep.modules.records.serializers.linked_records.get_db_records_projection')
 def test_returns_no_misc_if_titles_persent_in_the_resolved_record(record):
-    record.return_value = [{
+    record.return_value = {('lit', '123'): {
         'control_number': 123,
         'titles': [
             {
@@ -239,7 +239,7 @@ def test_returns_no_misc_if_titles_persent_in_the_resolved_record(record):
                 'title': 'Fundamental level of residual amplitude modulation in phase modulation processes'
             },
         ],
-    }]
+    }}
 
     hep_schema = load_schema('hep')
     subschema = hep_schema['properties']['references']
@@ -286,16 +286,16 @@ def test_returns_only_first_misc():
     assert expected == json.loads(result)
 
 
-@mock.patch('inspirehep.modules.records.serializers.schemas.json.literature.common.reference_item.get_linked_records_in_field')
+@mock.patch('inspirehep.modules.records.serializers.linked_records.get_db_records_projection')
 def test_returns_dois_from_the_resolved_record(record):
-    record.return_value = [{
+    record.return_value = {('lit', '123'): {
         'control_number': 123,
         'dois': [
             {
                 'value': '10.1103/PhysRevD.94.054021',
             },
         ],
-    }]
+    }}
 
     hep_schema = load_schema('hep')
     subschema = hep_schema['properties']['references']
@@ -319,9 +319,9 @@ def test_returns_dois_from_the_resolved_record(record):
     assert expected == json.loads(result)
 
 
-@mock.patch('inspirehep.modules.records.serializers.schemas.json.literature.common.reference_item.get_linked_records_in_field')
+@mock.patch('inspirehep.modules.records.serializers.linked_records.get_db_records_projection')
 def test_returns_arxiv_eprints_from_the_resolved_record(record):
-    record.return_value = [{
+    record.return_value = {('lit', '123'): {
         'control_number': 123,
         'arxiv_eprints': [
             {
@@ -329,7 +329,7 @@ def test_returns_arxiv_eprints_from_the_resolved_record(record):
                 'categories': 'hep',
             },
         ]
-    }]
+    }}
 
     hep_schema = load_schema('hep')
     subschema = hep_schema['properties']['references']
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, division, print_function
+
+import json
+from uuid import UUID
+
+from mock import Mock
+
+from inspirehep.modules.records.cli import (
+    IndexingCheckpoint,
+    IndexingStats,
+    get_uuid_partitions,
+)
+
+
+def test_get_uuid_partitions_covers_the_whole_uuid_space():
+    partitions = get_uuid_partitions(4)
+
+    assert len(partitions) == 4
+    assert partitions[0][0] is None
+    assert partitions[-1][1] is None
+    assert partitions[1] == (
+        UUID('40000000-0000-0000-0000-000000000000'),
+        UUID('80000000-0000-0000-0000-000000000000'),
+    )
+    for (_, upper), (lower, _) in zip(partitions[:-1], partitions[1:]):
+        assert upper == lower
+
+
+def test_get_uuid_partitions_with_a_single_partition():
+    assert get_uuid_partitions(1) == [(None, None)]
+
+
+def _make_task(ready, successful=True, failures=None):
+    return Mock(
+        result={'failures': failures or []},
+        **{'ready.return_value': ready, 'successful.return_value': successful}
+    )
+
+
+def test_indexing_checkpoint_only_moves_past_consecutive_finished_batches(tmpdir):
+    checkpoint_path = str(tmpdir.join('checkpoint.json'))
+    checkpoint = IndexingCheckpoint(checkpoint_path)
+    first = _make_task(ready=True)
+    second = _make_task(ready=False)
+    third = _make_task(ready=True)
+
+    checkpoint.add_batch('lit:0/1', first, 'uuid-1')
+    checkpoint.add_batch('lit:0/1', second, 'uuid-2')
+    checkpoint.add_batch('lit:0/1', third, 'uuid-3')
+    checkpoint.update()
+
+    assert checkpoint.get('lit:0/1') == 'uuid-1'
+
+    second.ready.return_value = True
+    checkpoint.update()
+
+    assert checkpoint.get('lit:0/1') == 'uuid-3'
+    with open(checkpoint_path) as checkpoint_file:
+        assert json.load(checkpoint_file) == {'lit:0/1': 'uuid-3'}
+
+    assert IndexingCheckpoint(checkpoint_path).get('lit:0/1') == 'uuid-3'
+
+
+def test_indexing_checkpoint_stops_before_failed_batches(tmpdir):
+    checkpoint = IndexingCheckpoint(str(tmpdir.join('checkpoint.json')))
+    first = _make_task(ready=True)
+    failed = _make_task(ready=True, successful=False)
+    with_failures = _make_task(ready=True, failures=[{'index': {'_id': 'uuid-4'}}])
+
+    checkpoint.add_batch('lit:0/2', first, 'uuid-1')
+    checkpoint.add_batch('lit:0/2', failed, 'uuid-2')
+    checkpoint.add_batch('lit:0/2', _make_task(ready=True), 'uuid-3')
+    checkpoint.add_batch('lit:1/2', with_failures, 'uuid-4')
+    checkpoint.update()
+
+    assert checkpoint.get('lit:0/2') == 'uuid-1'
+    assert checkpoint.get('lit:1/2') is None
+
+
+def test_indexing_checkpoint_clear_removes_the_file(tmpdir):
+    checkpoint_path = tmpdir.join('checkpoint.json')
+    checkpoint_path.write('{"lit:0/1": "uuid-1"}')
+
+    IndexingCheckpoint(str(checkpoint_path)).clear()
+
+    assert not checkpoint_path.exists()
+
+
+def test_indexing_stats_reports_latency_percentiles_and_failures():
+    stats = IndexingStats()
+    for took in range(1, 11):
+        stats.add_result({'success': 9, 'failures': ['failure'], 'took': float(took)})
+    stats.add_batch_error()
+
+    assert stats.successes == 90
+    assert stats.failures == 10
+    assert stats.percentile(90) == 9.0
+    assert stats.percentile(99) == 10.0
+    assert '10.00% failed' in str(stats)
+    assert '1 batches errored' in str(stats)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+from __future__ import absolute_import, division, print_function
+
+from mock import Mock, patch
+
+from inspirehep.modules.records.serializers.cache import (
+    get_export_cache_key,
+    serialize_with_cache,
+)
+
+
+def test_get_export_cache_key():
+    expected = 'records:export:bibtex:1:a-uuid:3'
+    result = get_export_cache_key('bibtex', 1, 'a-uuid', 3)
+
+    assert expected == result
+
+
+def test_get_export_cache_key_without_revision():
+    assert get_export_cache_key('bibtex', 1, 'a-uuid', None) is None
+
+
+@patch('inspirehep.modules.records.serializers.cache.current_cache')
+def test_serialize_with_cache_serializes_only_missing_records(mock_cache):
+    mock_cache.get_many.return_value = ['cached 1', None]
+    serialize_record = Mock(side_effect=lambda record: 'serialized {}'.format(record['control_number']))
+    records = [
+        (1, 'uuid-1', 1, {'control_number': 1}),
+        (2, 'uuid-2', 1, {'control_number': 2}),
+        (3, None, None, {'control_number': 3}),
+    ]
+
+    expected = ['cached 1', 'serialized 2', 'serialized 3']
+    result = serialize_with_cache('bibtex', records, serialize_record)
+
+    assert expected == result
+    assert serialize_record.call_count == 2
+    mock_cache.get_many.assert_called_once_with(
+        'records:export:bibtex:1:uuid-1:1',
+        'records:export:bibtex:2:uuid-2:1',
+    )
+    mock_cache.set_many.assert_called_once_with(
+        {'records:export:bibtex:2:uuid-2:1': 'serialized 2'},
+        timeout=7 * 24 * 60 * 60,
+    )
+
+
+@patch('inspirehep.modules.records.serializers.schemas.latex.datetime')
+def test_latex_cache_revision_changes_with_citations_and_date(mock_datetime):
+    from inspirehep.modules.records.serializers import latex_v1_EU
+
+    mock_datetime.datetime.now.return_value.strftime.return_value = '18 Oct 2026'
+
+    assert latex_v1_EU.get_cache_revision(3, {'citation_count': 7}) == '3:7:18 Oct 2026'
+    assert latex_v1_EU.get_cache_revision(None, {'citation_count': 7}) is None
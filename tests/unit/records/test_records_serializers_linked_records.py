@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+from __future__ import absolute_import, division, print_function
+
+from mock import patch
+
+from inspirehep.modules.records.serializers.linked_records import (
+    LinkedRecordsResolver,
+    add_linked_records,
+    get_linked_records_resolver,
+)
+
+
+@patch('inspirehep.modules.records.serializers.linked_records.get_db_records_projection')
+def test_resolve_fetches_the_added_records_at_once(mock_get_db_records_projection):
+    mock_get_db_records_projection.return_value = {
+        ('lit', '1'): {'control_number': 1},
+        ('exp', '2'): {'control_number': 2, 'legacy_name': 'EXP'},
+    }
+    resolver = LinkedRecordsResolver()
+
+    resolver.add(['http://localhost:5000/api/experiments/2'], ['legacy_name'])
+    result = resolver.resolve(
+        ['http://localhost:5000/api/literature/1', 'http://localhost:5000/api/literature/3'],
+        ['control_number'],
+    )
+    experiments = resolver.resolve(['http://localhost:5000/api/experiments/2'], ['legacy_name'])
+
+    assert result == {'http://localhost:5000/api/literature/1': {'control_number': 1}}
+    assert experiments == {
+        'http://localhost:5000/api/experiments/2': {'control_number': 2, 'legacy_name': 'EXP'},
+    }
+    mock_get_db_records_projection.assert_called_once_with(
+        {('lit', '1'), ('lit', '3'), ('exp', '2')},
+        ['control_number', 'legacy_name'],
+    )
+
+
+@patch('inspirehep.modules.records.serializers.linked_records.get_db_records_projection')
+def test_resolve_does_not_fetch_records_again(mock_get_db_records_projection):
+    mock_get_db_records_projection.return_value = {}
+    resolver = LinkedRecordsResolver()
+
+    resolver.resolve(['http://localhost:5000/api/literature/1'], ['titles'])
+    result = resolver.resolve(['http://localhost:5000/api/literature/1'], ['titles'])
+
+    assert result == {}
+    assert mock_get_db_records_projection.call_count == 1
+
+
+@patch('inspirehep.modules.records.serializers.linked_records.get_db_records_projection')
+def test_resolve_returns_copies_of_the_records(mock_get_db_records_projection):
+    mock_get_db_records_projection.return_value = {('lit', '1'): {'control_number': 1}}
+    resolver = LinkedRecordsResolver()
+    ref = 'http://localhost:5000/api/literature/1'
+
+    resolver.resolve([ref], ['control_number'])[ref]['label'] = '1'
+    result = resolver.resolve([ref], ['control_number'])
+
+    assert result == {ref: {'control_number': 1}}
+
+
+@patch('inspirehep.modules.records.serializers.linked_records.get_db_records_projection')
+def test_add_linked_records_registers_the_links_of_all_records(mock_get_db_records_projection, app):
+    mock_get_db_records_projection.return_value = {}
+    records = [
+        {'references': [{'record': {'$ref': 'http://localhost:5000/api/literature/1'}}]},
+        {'references': [
+            {'record': {'$ref': 'http://localhost:5000/api/literature/2'}},
+            {'reference': {'title': {'title': 'Not linked'}}},
+        ]},
+    ]
+
+    with app.test_request_context():
+        add_linked_records(records, {'references.record': ['titles']})
+        get_linked_records_resolver().resolve(['http://localhost:5000/api/literature/1'], ['titles'])
+
+    mock_get_db_records_projection.assert_called_once_with(
+        {('lit', '1'), ('lit', '2')},
+        ['titles'],
+    )
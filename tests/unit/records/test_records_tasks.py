@@ -24,7 +24,10 @@ from __future__ import absolute_import, division, print_function
 
 from mock import patch
 
-from inspirehep.modules.records.tasks import batch_reindex
+from invenio_records.models import RecordMetadata
+
+from inspirehep.modules.records.api import InspireRecord
+from inspirehep.modules.records.tasks import batch_refresh_ui_display, batch_reindex
 
 
 def record_generator(uuid):
@@ -33,7 +36,11 @@ def record_generator(uuid):
     }
     if uuid.endswith("_deleted"):
         record['deleted'] = True
-    return record
+    return InspireRecord(record, model=RecordMetadata(id=uuid, json=record))
+
+
+def records_generator(uuids):
+    return [record_generator(uuid) for uuid in uuids]
 
 
 def mocked_bulk(es, records, **kwargs):
@@ -43,10 +50,11 @@ def mocked_bulk(es, records, **kwargs):
     return (count, 0)
 
 
-@patch('inspirehep.modules.records.tasks.InspireRecord.get_record', side_effect=record_generator)
+@patch('inspirehep.modules.records.tasks.prefetch_enhancement_data', return_value={})
+@patch('inspirehep.modules.records.tasks.InspireRecord.get_records', side_effect=records_generator)
 @patch('inspirehep.modules.records.tasks.create_index_op', side_effect=None)
 @patch('inspirehep.modules.records.tasks.bulk', side_effect=mocked_bulk)
-def test_record_task_batch_logic_check_reindex_records_count(get_record, create_index_op, mocked_bulk):
+def test_record_task_batch_logic_check_reindex_records_count(get_records, create_index_op, mocked_bulk, prefetch_enhancement_data):
     records = ['000', 'aaa', 'bbb', 'ccc']
     output = batch_reindex(uuids=records)
     assert create_index_op.call_count == 4
@@ -54,10 +62,11 @@ def test_record_task_batch_logic_check_reindex_records_count(get_record, create_
     assert output['failures'] == []
 
 
-@patch('inspirehep.modules.records.tasks.InspireRecord.get_record', side_effect=record_generator)
+@patch('inspirehep.modules.records.tasks.prefetch_enhancement_data', return_value={})
+@patch('inspirehep.modules.records.tasks.InspireRecord.get_records', side_effect=records_generator)
 @patch('inspirehep.modules.records.tasks.create_index_op', side_effect=None)
 @patch('inspirehep.modules.records.tasks.bulk', side_effect=mocked_bulk)
-def test_record_task_batch_logic_reindex_skips_deleted_records(get_record, create_index_op, mocked_bulk):
+def test_record_task_batch_logic_reindex_skips_deleted_records(get_records, create_index_op, mocked_bulk, prefetch_enhancement_data):
     records = ['000', 'aaa_deleted', 'bbb', 'ccc']
     output = batch_reindex(uuids=records)
     assert create_index_op.call_count == 3
@@ -65,10 +74,11 @@ def test_record_task_batch_logic_reindex_skips_deleted_records(get_record, creat
     assert output['failures'] == []
 
 
-@patch('inspirehep.modules.records.tasks.InspireRecord.get_record', side_effect=record_generator)
+@patch('inspirehep.modules.records.tasks.prefetch_enhancement_data', return_value={})
+@patch('inspirehep.modules.records.tasks.InspireRecord.get_records', side_effect=records_generator)
 @patch('inspirehep.modules.records.tasks.create_index_op', side_effect=None)
 @patch('inspirehep.modules.records.tasks.bulk', side_effect=mocked_bulk)
-def test_record_task_batch_logic_reindex_only_deleted_records(get_record, create_index_op, mocked_bulk):
+def test_record_task_batch_logic_reindex_only_deleted_records(get_records, create_index_op, mocked_bulk, prefetch_enhancement_data):
     records = ['000_deleted', 'aaa_deleted', 'bbb_deleted', 'ccc_deleted']
     output = batch_reindex(uuids=records)
     assert create_index_op.call_count == 0
@@ -76,12 +86,64 @@ def test_record_task_batch_logic_reindex_only_deleted_records(get_record, create
     assert output['failures'] == []
 
 
-@patch('inspirehep.modules.records.tasks.InspireRecord.get_record', side_effect=record_generator)
+@patch('inspirehep.modules.records.tasks.prefetch_enhancement_data', return_value={})
+@patch('inspirehep.modules.records.tasks.InspireRecord.get_records', side_effect=records_generator)
 @patch('inspirehep.modules.records.tasks.create_index_op', side_effect=None)
 @patch('inspirehep.modules.records.tasks.bulk', side_effect=mocked_bulk)
-def test_record_task_batch_logic_nothing_to_reindex(get_record, create_index_op, mocked_bulk):
+def test_record_task_batch_logic_nothing_to_reindex(get_records, create_index_op, mocked_bulk, prefetch_enhancement_data):
     records = []
     output = batch_reindex(uuids=records)
     assert create_index_op.call_count == 0
     assert output['success'] == 0
     assert output['failures'] == []
+
+
+@patch('inspirehep.modules.records.tasks.prefetch_enhancement_data', return_value={'citations_counts': {}})
+@patch('inspirehep.modules.records.tasks.InspireRecord.get_records', side_effect=records_generator)
+@patch('inspirehep.modules.records.tasks.create_index_op', side_effect=None)
+@patch('inspirehep.modules.records.tasks.bulk', side_effect=mocked_bulk)
+def test_record_task_batch_logic_prefetches_data_once_per_batch(bulk, create_index_op, get_records, prefetch_enhancement_data):
+    records = ['000', 'aaa_deleted', 'bbb']
+    batch_reindex(uuids=records)
+
+    get_records.assert_called_once_with(records)
+    prefetch_enhancement_data.assert_called_once()
+    prefetched_records = prefetch_enhancement_data.call_args[0][0]
+    assert [record.id for record in prefetched_records] == ['000', 'bbb']
+    for call in create_index_op.call_args_list:
+        assert call[1]['prefetched'] == {'citations_counts': {}}
+
+
+def mocked_create_index_op(record, **kwargs):
+    record['_ui_display_fingerprint'] = 'fingerprint-{}'.format(record.id)
+    return {'_id': record.id, '_index': 'records-hep'}
+
+
+@patch('inspirehep.modules.records.tasks.prefetch_enhancement_data')
+@patch('inspirehep.modules.records.tasks.InspireRecord.get_records', side_effect=records_generator)
+@patch('inspirehep.modules.records.tasks.create_index_op', side_effect=mocked_create_index_op)
+@patch('inspirehep.modules.records.tasks.bulk', side_effect=mocked_bulk)
+def test_batch_refresh_ui_display_reindexes_only_outdated_records(bulk, create_index_op, get_records, prefetch_enhancement_data):
+    def get_records_with_control_number(uuids):
+        records = records_generator(uuids)
+        for control_number, record in enumerate(records):
+            record['control_number'] = control_number
+        return records
+
+    get_records.side_effect = get_records_with_control_number
+    prefetch_enhancement_data.return_value = {
+        'indexed_ui_displays': {
+            0: {'_ui_display_fingerprint': 'fingerprint-000'},
+            2: {'_ui_display_fingerprint': 'outdated'},
+        },
+    }
+
+    output = batch_refresh_ui_display(uuids=['000', 'aaa_deleted', 'bbb', 'ccc'])
+
+    assert output['checked'] == 3
+    assert output['refreshed'] == 2
+    indexed_ops = list(bulk.call_args[0][1])
+    assert indexed_ops == [
+        {'_id': 'bbb', '_index': 'records-hep'},
+        {'_id': 'ccc', '_index': 'records-hep'},
+    ]
@@ -31,6 +31,7 @@ from inspirehep.modules.records.api import InspireRecord
 from invenio_records.models import RecordMetadata
 from inspirehep.modules.records.utils import (
     get_endpoint_from_record,
+    get_linked_records_in_field,
     get_pid_from_record_uri,
     populate_abstract_source_suggest,
     populate_affiliation_suggest,
@@ -38,6 +39,7 @@ from inspirehep.modules.records.utils import (
     populate_authors_full_name_unicode_normalized,
     populate_authors_name_variations,
     populate_bookautocomplete,
+    populate_citations_count,
     populate_earliest_date,
     populate_experiment_suggest,
     populate_inspire_document_type,
@@ -46,7 +48,10 @@ from inspirehep.modules.records.utils import (
     populate_number_of_references,
     populate_facet_author_name,
     get_author_with_record_facet_author_name,
+    get_ui_display_fingerprint,
+    populate_ui_display,
 )
+from inspirehep.modules.records.serializers.schemas.json import RecordMetadataSchemaV1
 
 
 def test_populate_number_references():
@@ -1056,3 +1061,164 @@ def test_get_author_with_record_facet_author_name():
     author3_facet_author_name = 'BAI_John Doe'
     result = get_author_with_record_facet_author_name(author3)
     assert result == author3_facet_author_name
+
+
+@patch('inspirehep.modules.records.api.InspireRecord.get_citations_count', return_value=3)
+@patch('inspirehep.modules.records.api.InspireRecord.get_stored_citations_count', return_value=5)
+def test_populate_citations_count_uses_stored_count(mocked_stored_count, mocked_count):
+    record = InspireRecord({
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+    }, model=RecordMetadata)
+    populate_citations_count(record)
+
+    assert record['citation_count'] == 5
+    mocked_count.assert_not_called()
+
+
+@patch('inspirehep.modules.records.api.InspireRecord.get_citations_count', return_value=3)
+@patch('inspirehep.modules.records.api.InspireRecord.get_stored_citations_count', return_value=None)
+def test_populate_citations_count_falls_back_to_counting_citations(mocked_stored_count, mocked_count):
+    record = InspireRecord({
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+    }, model=RecordMetadata)
+    populate_citations_count(record)
+
+    assert record['citation_count'] == 3
+
+
+def test_populate_facet_author_name_with_prefetched_authors():
+    linked_authors = {
+        ('aut', '111'): {
+            '$schema': 'http://localhost:5000/records/schemas/authors.json',
+            'name': {'value': 'Silk, James Brian'},
+            'ids': [{'schema': 'INSPIRE BAI', 'value': 'James.Brian.1'}],
+            'control_number': 111,
+        },
+    }
+    record = {
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+        'authors': [
+            {
+                'full_name': 'Silk, James Brian',
+                'record': {'$ref': 'https://labs.inspirehep.net/api/authors/111'}
+            },
+            {
+                'full_name': 'Rohan, George',
+            },
+        ],
+    }
+    populate_facet_author_name(record, linked_authors)
+
+    expected = [u'James.Brian.1_James Brian Silk', u'BAI_George Rohan']
+
+    assert record['facet_author_name'] == expected
+
+
+def test_get_ui_display_fingerprint_ignores_fields_not_displayed():
+    record = {
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+        'titles': [{'title': 'A title'}],
+    }
+    fingerprint = get_ui_display_fingerprint(record, RecordMetadataSchemaV1)
+
+    record['_private_notes'] = [{'value': 'A note'}]
+
+    assert get_ui_display_fingerprint(record, RecordMetadataSchemaV1) == fingerprint
+
+    record['titles'] = [{'title': 'Another title'}]
+
+    assert get_ui_display_fingerprint(record, RecordMetadataSchemaV1) != fingerprint
+
+
+def test_get_ui_display_fingerprint_changes_with_linked_conference_revision():
+    record = {
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+        'publication_info': [
+            {'conference_record': {'$ref': 'http://localhost:5000/api/conferences/1'}},
+        ],
+        'references': [
+            {'record': {'$ref': 'http://localhost:5000/api/literature/2'}},
+        ],
+    }
+    linked_revisions = {('con', '1'): ('ed2b0ad5-cc4b-4d1d-9b52-b3a5a2e6d2a4', 2)}
+    fingerprint = get_ui_display_fingerprint(record, RecordMetadataSchemaV1, linked_revisions)
+
+    linked_revisions[('lit', '2')] = ('3ee0ba73-2d7d-4c8d-9a0c-40fc4e7bd6a3', 1)
+
+    assert get_ui_display_fingerprint(record, RecordMetadataSchemaV1, linked_revisions) == fingerprint
+
+    linked_revisions[('con', '1')] = ('ed2b0ad5-cc4b-4d1d-9b52-b3a5a2e6d2a4', 3)
+
+    assert get_ui_display_fingerprint(record, RecordMetadataSchemaV1, linked_revisions) != fingerprint
+
+
+def test_get_ui_display_fingerprint_without_linked_revisions():
+    record = {
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+        'titles': [{'title': 'A title'}],
+    }
+
+    assert get_ui_display_fingerprint(record, RecordMetadataSchemaV1) == \
+        get_ui_display_fingerprint(record, RecordMetadataSchemaV1, {})
+
+    record['publication_info'] = [
+        {'conference_record': {'$ref': 'http://localhost:5000/api/conferences/1'}},
+    ]
+
+    assert get_ui_display_fingerprint(record, RecordMetadataSchemaV1) != \
+        get_ui_display_fingerprint(record, RecordMetadataSchemaV1, {})
+
+
+def test_populate_ui_display_reuses_indexed_ui_display_if_fingerprint_matches():
+    record = {
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+        'titles': [{'title': 'A title'}],
+    }
+    fingerprint = get_ui_display_fingerprint(record, RecordMetadataSchemaV1)
+    indexed_ui_display = {
+        '_ui_display': '{"titles": [{"title": "A title"}]}',
+        '_ui_display_fingerprint': fingerprint,
+    }
+
+    with patch.object(RecordMetadataSchemaV1, 'dumps') as mock_dumps:
+        populate_ui_display(record, RecordMetadataSchemaV1, indexed_ui_display)
+
+    mock_dumps.assert_not_called()
+    assert record['_ui_display'] == indexed_ui_display['_ui_display']
+    assert record['_ui_display_fingerprint'] == fingerprint
+
+
+def test_populate_ui_display_serializes_record_if_fingerprint_differs():
+    record = {
+        '$schema': 'http://localhost:5000/records/schemas/hep.json',
+        'titles': [{'title': 'A new title'}],
+    }
+    indexed_ui_display = {
+        '_ui_display': '{"titles": [{"title": "A title"}]}',
+        '_ui_display_fingerprint': 'outdated',
+    }
+
+    populate_ui_display(record, RecordMetadataSchemaV1, indexed_ui_display)
+
+    assert 'A new title' in record['_ui_display']
+    assert record['_ui_display_fingerprint'] == get_ui_display_fingerprint(record, RecordMetadataSchemaV1)
+
+
+def test_get_linked_records_in_field_with_prefetched_records_keeps_the_record_order():
+    record = {
+        'authors': [
+            {'record': {'$ref': 'http://localhost:5000/api/authors/3'}},
+            {'record': {'$ref': 'http://localhost:5000/api/authors/1'}},
+            {'record': {'$ref': 'http://localhost:5000/api/authors/3'}},
+            {'record': {'$ref': 'http://localhost:5000/api/authors/2'}},
+        ],
+    }
+    linked_records = {
+        ('aut', '1'): {'control_number': 1},
+        ('aut', '3'): {'control_number': 3},
+    }
+
+    expected = [{'control_number': 3}, {'control_number': 1}]
+    result = list(get_linked_records_in_field(record, 'authors.record', linked_records))
+
+    assert expected == result
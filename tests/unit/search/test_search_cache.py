@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, division, print_function
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+from mock import patch
+
+from inspirehep.modules.search.cache import CachedSearchMixin, bump_search_generations
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, timeout, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class CachedSearch(CachedSearchMixin, Search):
+    pass
+
+
+def execute_search(search, ignore_cache=False):
+    return Response(search, {'hits': {'hits': [], 'total': {'value': 1}}})
+
+
+@patch('inspirehep.modules.search.cache._get_redis')
+@patch('elasticsearch_dsl.Search.execute', autospec=True, side_effect=execute_search)
+def test_cached_search_executes_the_same_search_once(mock_execute, mock_get_redis):
+    mock_get_redis.return_value = FakeRedis()
+    search = CachedSearch(index='records-hep').query('match', titles='foo')
+
+    first = search.cache_results().params(preference='a').execute()
+    second = search.params(preference='b').cache_results().execute()
+
+    assert mock_execute.call_count == 1
+    assert first.to_dict() == second.to_dict()
+
+
+@patch('inspirehep.modules.search.tasks.bump_search_generations_after_refresh')
+@patch('inspirehep.modules.search.cache._get_redis')
+@patch('elasticsearch_dsl.Search.execute', autospec=True, side_effect=execute_search)
+def test_cached_search_is_invalidated_by_bumping_the_index_generation(
+    mock_execute, mock_get_redis, mock_bump_after_refresh, app
+):
+    mock_get_redis.return_value = FakeRedis()
+    search = CachedSearch(index='records-hep').query('match', titles='foo').cache_results()
+
+    with patch.dict(app.config, {'FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE': True}):
+        search.execute()
+        bump_search_generations(['records-authors'])
+        search.execute()
+        bump_search_generations(['records-hep'])
+        search.execute()
+
+    assert mock_execute.call_count == 2
+
+
+@patch('inspirehep.modules.search.cache._get_redis')
+@patch('elasticsearch_dsl.Search.execute', autospec=True, side_effect=execute_search)
+def test_search_without_cache_results_is_not_cached(mock_execute, mock_get_redis):
+    search = CachedSearch(index='records-hep').query('match', titles='foo')
+
+    search.execute()
+    search.execute()
+
+    assert mock_execute.call_count == 2
+    mock_get_redis.assert_not_called()
+
+
+@patch('inspirehep.modules.search.tasks.bump_search_generations_after_refresh')
+@patch('inspirehep.modules.search.cache._get_redis')
+def test_bump_search_generations_bumps_again_after_refresh(mock_get_redis, mock_bump_after_refresh, app):
+    redis = FakeRedis()
+    mock_get_redis.return_value = redis
+
+    config = {
+        'FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE': True,
+        'SEARCH_RESULTS_CACHE_REFRESH_DELAY': 5,
+    }
+    with patch.dict(app.config, config):
+        bump_search_generations(['records-hep'])
+
+    assert redis.get('search:generation:records-hep') == 1
+    mock_bump_after_refresh.apply_async.assert_called_once_with(
+        args=[['records-hep']],
+        countdown=5,
+    )
+
+
+@patch('inspirehep.modules.search.tasks.bump_search_generations_after_refresh')
+@patch('inspirehep.modules.search.cache._get_redis')
+def test_bump_search_generations_does_nothing_without_the_cache(mock_get_redis, mock_bump_after_refresh, app):
+    with patch.dict(app.config, {'FEATURE_FLAG_ENABLE_SEARCH_RESULTS_CACHE': False}):
+        bump_search_generations(['records-hep'])
+
+    mock_get_redis.assert_not_called()
+    mock_bump_after_refresh.apply_async.assert_not_called()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2018 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, division, print_function
+import io
+
+from mock import patch
+
+from inspirehep.modules.search.query_factory import ParsedQueryCache, read_queries_log
+
+
+@patch('inspirehep.modules.search.query_factory.inspire_query_parser.parse_query')
+def test_parsed_query_cache_parses_each_query_once(mock_parse_query):
+    mock_parse_query.return_value = {'match': {'titles.full_title': 'foo'}}
+    cache = ParsedQueryCache()
+
+    first = cache.get('t foo', 'LiteratureSearch')
+    first['match']['titles.full_title'] = 'modified'
+    second = cache.get('t foo', 'LiteratureSearch')
+
+    assert second == {'match': {'titles.full_title': 'foo'}}
+    mock_parse_query.assert_called_once_with('t foo')
+    assert cache.stats() == {
+        'hits': 1,
+        'misses': 1,
+        'evictions': 0,
+        'entries': 1,
+        'bytes': len('{"match": {"titles.full_title": "foo"}}') + len('t foo'),
+    }
+
+
+@patch('inspirehep.modules.search.query_factory.inspire_query_parser.parse_query')
+def test_parsed_query_cache_keys_by_search_class(mock_parse_query):
+    mock_parse_query.return_value = {'match_all': {}}
+    cache = ParsedQueryCache()
+
+    cache.get('foo', 'LiteratureSearch')
+    cache.get('foo', 'AuthorsSearch')
+
+    assert mock_parse_query.call_count == 2
+
+
+@patch('inspirehep.modules.search.query_factory.inspire_query_parser.parse_query')
+def test_parsed_query_cache_evicts_least_recently_used(mock_parse_query):
+    mock_parse_query.side_effect = lambda query_string: {'match': {'_all': query_string}}
+    cache = ParsedQueryCache(max_entries=2)
+
+    cache.get('a', 'LiteratureSearch')
+    cache.get('b', 'LiteratureSearch')
+    cache.get('a', 'LiteratureSearch')
+    cache.get('c', 'LiteratureSearch')
+    cache.get('a', 'LiteratureSearch')
+    cache.get('b', 'LiteratureSearch')
+
+    assert mock_parse_query.call_count == 4
+    assert cache.stats()['evictions'] == 2
+
+
+@patch('inspirehep.modules.search.query_factory.inspire_query_parser.parse_query')
+def test_parsed_query_cache_is_bounded_in_size(mock_parse_query):
+    mock_parse_query.side_effect = lambda query_string: {'match': {'_all': query_string}}
+    cache = ParsedQueryCache(max_bytes=100)
+
+    cache.get('a' * 200, 'LiteratureSearch')
+    cache.get('b' * 20, 'LiteratureSearch')
+    cache.get('c' * 20, 'LiteratureSearch')
+
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] <= 100
+
+
+@patch('inspirehep.modules.search.query_factory.inspire_query_parser.parse_query')
+def test_parsed_query_cache_warm_up(mock_parse_query, tmpdir):
+    mock_parse_query.return_value = {'match_all': {}}
+    queries_log = tmpdir.join('queries.log')
+    with io.open(str(queries_log), 'w', encoding='utf-8') as log:
+        log.write(u'refersto:recid:1\nAuthorsSearch\tJ.Smith.1\n\n')
+    cache = ParsedQueryCache()
+
+    count = cache.warm_up(read_queries_log(str(queries_log)))
+    cache.get('refersto:recid:1', 'LiteratureSearch')
+    cache.get('J.Smith.1', 'AuthorsSearch')
+
+    assert count == 2
+    assert mock_parse_query.call_count == 2
+    assert cache.stats()['hits'] == 2
+
+
+@patch('inspirehep.modules.search.query_factory.inspire_query_parser.parse_query')
+def test_parsed_query_cache_warm_up_evicts_the_least_frequent_queries_first(mock_parse_query):
+    mock_parse_query.return_value = {'match_all': {}}
+    cache = ParsedQueryCache(max_entries=2)
+
+    cache.warm_up([('a', 'LiteratureSearch'), ('b', 'LiteratureSearch'), ('c', 'LiteratureSearch')])
+    cache.get('d', 'LiteratureSearch')
+    cache.get('a', 'LiteratureSearch')
+
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, division, print_function
+from elasticsearch_dsl.response import Response
+from elasticsearch_dsl.search import Search
+from mock import Mock, patch
+
+from inspirehep.utils.institutions import (
+    get_cached_institution_data,
+    get_experiments_papers_count,
+    get_institution_people,
+)
+
+
+@patch('inspirehep.utils.institutions.current_cache')
+def test_get_cached_institution_data_computes_and_caches_missing_data(mock_cache):
+    mock_cache.get.return_value = None
+    compute = Mock(return_value=[['row']])
+
+    result = get_cached_institution_data('people', '902725', compute)
+
+    assert result == [['row']]
+    mock_cache.get.assert_called_once_with('institutions:ajax:people:902725')
+    mock_cache.set.assert_called_once_with(
+        'institutions:ajax:people:902725', [['row']], timeout=5 * 60)
+
+
+@patch('inspirehep.utils.institutions.current_cache')
+def test_get_cached_institution_data_does_not_compute_cached_data(mock_cache):
+    mock_cache.get.return_value = [['cached row']]
+    compute = Mock()
+
+    result = get_cached_institution_data('people', '902725', compute)
+
+    assert result == [['cached row']]
+    compute.assert_not_called()
+
+
+@patch('inspirehep.utils.institutions.LiteratureSearch.execute')
+def test_get_experiments_papers_count(mock_execute):
+    mock_execute.return_value = Response(
+        Search(),
+        {
+            'hits': {'hits': [], 'total': 3},
+            'aggregations': {
+                'experiments': {
+                    'buckets': [
+                        {'key': 1, 'doc_count': 2},
+                        {'key': 2, 'doc_count': 1},
+                    ],
+                },
+            },
+        },
+    )
+
+    result = get_experiments_papers_count([1, 2, 3])
+
+    assert result == {1: 2, 2: 1}
+    mock_execute.assert_called_once()
+
+
+def test_get_experiments_papers_count_without_experiments():
+    assert get_experiments_papers_count([]) == {}
+
+
+@patch('inspirehep.utils.institutions.AuthorsSearch.execute')
+@patch('inspirehep.utils.institutions.LiteratureSearch.execute')
+def test_get_institution_people_with_author_without_name(mock_literature_execute, mock_authors_execute):
+    mock_literature_execute.return_value = Response(
+        Search(),
+        {
+            'hits': {'hits': [], 'total': 3},
+            'aggregations': {
+                'authors': {
+                    'affiliated': {
+                        'byrecid': {
+                            'buckets': [
+                                {'key': 1, 'doc_count': 2},
+                                {'key': 2, 'doc_count': 1},
+                            ],
+                        },
+                    },
+                },
+            },
+        },
+    )
+    mock_authors_execute.return_value = Response(
+        Search(),
+        {
+            'hits': {
+                'hits': [
+                    {'_source': {'control_number': 1, 'name': {'value': 'Doe, John'}}},
+                    {'_source': {'control_number': 2}},
+                ],
+                'total': 2,
+            },
+        },
+    )
+
+    result = get_institution_people('902725')
+
+    assert result == [(1, {'value': 'Doe, John'}, 2), (2, None, 1)]
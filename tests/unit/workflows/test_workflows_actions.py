@@ -674,6 +674,7 @@ def test_check_if_germany_in_fulltext_when_deutschland_in_text_body(mocked_get_d
 def test_check_if_uk_in_fulltext(mocked_get_document, app):
     fake_grobid_response = "<country key=\"UK\">England</country>"
     obj = MagicMock()
+    obj.data = {}
     obj.extra_data = {}
     eng = None
     new_config = {"GROBID_URL": "http://grobid_url.local"}
@@ -697,6 +698,7 @@ def test_check_if_uk_in_fulltext(mocked_get_document, app):
 def test_check_if_uk_in_fulltext_case_insensitive(mocked_get_document, app):
     fake_grobid_response = "<country>unitEd KiNgdOm</country>"
     obj = MagicMock()
+    obj.data = {}
     obj.extra_data = {}
     eng = None
     new_config = {"GROBID_URL": "http://grobid_url.local"}
@@ -716,6 +718,48 @@ def test_check_if_uk_in_fulltext_case_insensitive(mocked_get_document, app):
     assert uk_in_fulltext_and_core
 
 
+def _get_obj_with_document(checksum):
+    obj = MagicMock()
+    obj.data = {'documents': [{'key': 'fulltext.pdf', 'fulltext': True}]}
+    obj.extra_data = {}
+    obj.files.__getitem__.return_value.file.checksum = checksum
+    obj.files.keys = []
+    return obj
+
+
+@patch("inspirehep.modules.workflows.tasks.actions.get_document_in_workflow")
+def test_fulltext_checks_post_the_document_to_grobid_once(mocked_get_document, app, tmpdir):
+    fake_grobid_response = "<country key=\"DE\">Germany</country>"
+    obj = _get_obj_with_document('md5:fulltext-checks-once')
+    eng = None
+
+    new_config = {
+        "GROBID_URL": "http://grobid_url.local",
+        "WORKFLOWS_GROBID_CACHE_DIR": str(tmpdir),
+    }
+    with patch.dict(current_app.config, new_config):
+        with requests_mock.Mocker() as requests_mocker:
+            requests_mocker.register_uri(
+                'POST', 'http://grobid_url.local/api/processFulltextDocument',
+                text=fake_grobid_response,
+                headers={'content-type': 'application/xml'},
+                status_code=200,
+            )
+            with tempfile.NamedTemporaryFile() as tmp_file:
+                mocked_get_document.return_value.__enter__.return_value = tmp_file.name
+                assert not check_if_france_in_fulltext(obj, eng)
+                assert check_if_germany_in_fulltext(obj, eng)
+                assert not check_if_uk_in_fulltext(obj, eng)
+
+                # Another workflow with the same document hits the local cache.
+                other_obj = _get_obj_with_document('md5:fulltext-checks-once')
+                assert check_if_germany_in_fulltext(other_obj, eng)
+
+    assert requests_mocker.call_count == 1
+    assert obj.files.__setitem__.call_count == 1
+    assert len(tmpdir.listdir()) == 1
+
+
 def test_check_if_uk_in_affiliations(app):
     obj = MagicMock()
     obj.extra_data = {}
@@ -23,7 +23,7 @@
 from __future__ import absolute_import, division, print_function
 
 import os
-from mock import patch
+from mock import MagicMock, patch
 import pkg_resources
 import pytest
 import requests_mock
@@ -34,6 +34,7 @@ from inspire_schemas.api import load_schema, validate
 from inspirehep.modules.workflows.tasks.actions import (
     _is_auto_rejected,
     add_core,
+    checkpoint_workflow,
     download_documents,
     fix_submission_number,
     halt_record,
@@ -45,11 +46,13 @@ from inspirehep.modules.workflows.tasks.actions import (
     is_record_relevant,
     is_submission,
     mark,
+    match_references_hep_in_bulk,
     populate_journal_coverage,
     populate_submission_document,
     preserve_root,
     reject_record,
     refextract,
+    save_workflow,
     set_refereed_and_fix_document_type,
     shall_halt_workflow,
     validate_record,
@@ -1583,3 +1586,102 @@ def test_populate_submission_document_without_documents():
 
         assert populate_submission_document(obj, eng) is None
         assert 'documents' not in obj.data
+
+
+@patch('inspirehep.modules.workflows.tasks.actions.db')
+def test_checkpoint_workflow_saves_only_changed_workflows(mock_db):
+    obj = MockObj({'titles': [{'title': 'foo'}]}, {})
+    obj.model = MagicMock()
+    obj.save = MagicMock()
+    eng = MockEng()
+
+    config = {
+        'FEATURE_FLAG_ENABLE_WORKFLOW_CHECKPOINTS': True,
+        'WORKFLOWS_CHECKPOINT_MAX_SKIPPED': 3,
+    }
+    with patch.dict(current_app.config, config):
+        checkpoint_workflow(obj, eng)
+        obj.extra_data['_task_history'] = ['checkpoint_workflow']
+        checkpoint_workflow(obj, eng)
+        obj.data['titles'].append({'title': 'bar'})
+        checkpoint_workflow(obj, eng)
+
+    assert mock_db.session.commit.call_count == 2
+    assert obj.save.call_count == 0
+    assert obj.extra_data['_checkpoints'] == {'skipped': 1, 'unindexed': 2}
+
+
+@patch('inspirehep.modules.workflows.tasks.actions.db')
+def test_checkpoint_workflow_saves_after_too_many_skipped(mock_db):
+    obj = MockObj({}, {})
+    obj.model = MagicMock()
+    eng = MockEng()
+
+    config = {
+        'FEATURE_FLAG_ENABLE_WORKFLOW_CHECKPOINTS': True,
+        'WORKFLOWS_CHECKPOINT_MAX_SKIPPED': 1,
+    }
+    with patch.dict(current_app.config, config):
+        save_workflow(obj, eng)
+        checkpoint_workflow(obj, eng)
+        checkpoint_workflow(obj, eng)
+
+    assert mock_db.session.commit.call_count == 2
+    assert obj.extra_data['_checkpoints'] == {'skipped': 1, 'unindexed': 1}
+
+
+@patch('inspirehep.modules.workflows.tasks.actions.db')
+def test_checkpoint_workflow_saves_everything_without_feature_flag(mock_db):
+    obj = MockObj({}, {})
+    obj.save = MagicMock()
+    eng = MockEng()
+
+    with patch.dict(current_app.config, {'FEATURE_FLAG_ENABLE_WORKFLOW_CHECKPOINTS': False}):
+        checkpoint_workflow(obj, eng)
+        checkpoint_workflow(obj, eng)
+
+    assert obj.save.call_count == 2
+    assert mock_db.session.commit.call_count == 2
+    assert '_checkpoints' not in obj.extra_data
+
+
+@patch('inspirehep.modules.workflows.tasks.actions.match_references_hep')
+@patch('inspirehep.modules.workflows.tasks.actions.resolve_references_by_identifiers')
+def test_match_references_hep_in_bulk(mock_resolve, mock_match):
+    arxiv_reference = {'reference': {'arxiv_eprint': '1812.09293'}}
+    title_reference = {'reference': {'title': {'title': 'Foo'}}}
+    other_title_reference = {'reference': {'title': {'title': 'Bar'}}}
+    mock_resolve.return_value = [1, None, None]
+    mock_match.side_effect = lambda references: [
+        dict(reference, record={'$ref': 'http://localhost:5000/api/literature/2'})
+        for reference in references
+    ]
+
+    config = {
+        'FEATURE_FLAG_ENABLE_REFERENCES_LOCAL_RESOLUTION': True,
+        'REFEXTRACT_MATCHER_CHUNK_SIZE': 1,
+    }
+    with patch.dict(current_app.config, config):
+        pdf_references, text_references = match_references_hep_in_bulk([
+            [arxiv_reference, title_reference],
+            [title_reference, other_title_reference],
+        ])
+
+    assert mock_resolve.call_args[0][0] == [arxiv_reference, title_reference, other_title_reference]
+    assert mock_match.call_count == 2
+    assert pdf_references[0]['reference'] == {'arxiv_eprint': '1812.09293'}
+    assert pdf_references[0]['record']['$ref'].endswith('/api/literature/1')
+    assert pdf_references[1] == text_references[0]
+    assert text_references[1]['reference'] == {'title': {'title': 'Bar'}}
+    assert 'record' not in arxiv_reference
+
+
+@patch('inspirehep.modules.workflows.tasks.actions.match_references_hep')
+def test_match_references_hep_in_bulk_without_feature_flag(mock_match):
+    mock_match.side_effect = lambda references: references
+
+    with patch.dict(current_app.config, {'FEATURE_FLAG_ENABLE_REFERENCES_LOCAL_RESOLUTION': False}):
+        result = match_references_hep_in_bulk([[{'reference': {}}], None])
+
+    assert result == [[{'reference': {}}], []]
+    assert mock_match.call_count == 1
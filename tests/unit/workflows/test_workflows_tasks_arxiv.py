@@ -33,11 +33,15 @@ from mock import patch
 from inspire_schemas.api import load_schema, validate
 from inspirehep.modules.workflows.tasks.arxiv import (
     arxiv_author_list,
+    arxiv_package_cleanup,
     arxiv_package_download,
+    arxiv_package_extract,
     arxiv_plot_extract,
+    has_author_list,
     populate_arxiv_document,
     extract_authors_from_xml
 )
+from plotextractor.converter import untar
 from plotextractor.errors import InvalidTarball
 from inspirehep.modules.workflows.errors import DownloadError
 
@@ -582,9 +586,9 @@ def test_arxiv_plot_extract_retries_on_io_error(mock_os, tmpdir):
             assert mock_open.call_count == 5
 
 
-@patch('inspirehep.modules.workflows.tasks.arxiv.process_tarball')
-def test_arxiv_plot_extract_logs_when_tarball_is_invalid(mock_process_tarball):
-    mock_process_tarball.side_effect = InvalidTarball
+@patch('inspirehep.modules.workflows.tasks.arxiv.untar')
+def test_arxiv_plot_extract_logs_when_tarball_is_invalid(mock_untar):
+    mock_untar.side_effect = InvalidTarball
 
     schema = load_schema('hep')
     subschema = schema['properties']['arxiv_eprints']
@@ -619,8 +623,8 @@ def test_arxiv_plot_extract_logs_when_tarball_is_invalid(mock_process_tarball):
     assert '1612.00626' in obj.log._info.getvalue()
 
 
-@patch('inspirehep.modules.workflows.tasks.arxiv.process_tarball')
-def test_arxiv_plot_extract_no_file(mock_process_tarball):
+@patch('inspirehep.modules.workflows.tasks.arxiv.untar')
+def test_arxiv_plot_extract_no_file(mock_untar):
 
     schema = load_schema('hep')
     subschema = schema['properties']['arxiv_eprints']
@@ -642,7 +646,7 @@ def test_arxiv_plot_extract_no_file(mock_process_tarball):
     eng = MockEng()
 
     assert arxiv_plot_extract(obj, eng) is None
-    mock_process_tarball.assert_not_called()
+    mock_untar.assert_not_called()
 
 
 def test_arxiv_author_list_with_missing_tarball():
@@ -863,6 +867,74 @@ def test_arxiv_author_list_handles_multiple_author_xml_files():
     assert obj.data['authors'] == expected_authors
 
 
+@patch('plotextractor.api.os')
+def test_arxiv_package_is_extracted_once_for_plots_and_author_list(mock_os):
+    filename = pkg_resources.resource_filename(
+        __name__, os.path.join('fixtures', '1703.09986.tar.gz'))
+
+    data = {
+        'arxiv_eprints': [
+            {
+                'categories': [
+                    'hep-ex',
+                ],
+                'value': '1703.09986',
+            },
+        ],
+    }  # record/1519995
+    extra_data = {}
+    files = MockFiles({
+        '1703.09986.tar.gz': AttrDict({
+            'file': AttrDict({
+                'uri': filename,
+            })
+        })
+    })
+
+    obj = MockObj(data, extra_data, files=files)
+    eng = MockEng()
+
+    with patch('inspirehep.modules.workflows.tasks.arxiv.untar', wraps=untar) as mock_untar:
+        arxiv_package_extract(obj, eng)
+        scratch_space = mock_untar.call_args[0][1]
+
+        arxiv_plot_extract(obj, eng)
+        arxiv_author_list(obj, eng)
+
+        assert mock_untar.call_count == 1
+        assert obj.data['authors'][0]['full_name'] == 'Sirunyan, Albert M.'
+
+        arxiv_package_cleanup(obj, eng)
+
+    assert not os.path.exists(scratch_space)
+
+
+def test_has_author_list_with_tags_split_across_chunks(tmpdir):
+    xml_file = tmpdir.join('authors.xml')
+    xml_file.write(
+        '<?xml version="1.0"?>\n'
+        '<collaborationauthorlist xmlns:foaf="http://xmlns.com/foaf/0.1/">'
+        '<foaf:Person/>'
+        '</collaborationauthorlist>'
+    )
+
+    assert has_author_list(str(xml_file), chunk_size=7)
+
+
+def test_has_author_list_without_closing_tag(tmpdir):
+    xml_file = tmpdir.join('authors.xml')
+    xml_file.write('<collaborationauthorlist><foaf:Person/>')
+
+    assert not has_author_list(str(xml_file), chunk_size=7)
+
+
+def test_has_author_list_with_other_xml(tmpdir):
+    xml_file = tmpdir.join('figure.xml')
+    xml_file.write('<svg></svg>')
+
+    assert not has_author_list(str(xml_file))
+
+
 def test_arxiv_author_list_does_not_produce_latex():
     schema = load_schema('hep')
 
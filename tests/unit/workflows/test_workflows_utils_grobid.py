@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+
+from __future__ import absolute_import, division, print_function
+
+import os
+
+from flask import current_app
+from mock import MagicMock, patch
+
+from inspirehep.modules.workflows.utils.grobid import (
+    _evict_local_grobid_responses,
+    get_grobid_cache_key,
+    read_grobid_response,
+    write_grobid_response,
+)
+
+
+def test_get_grobid_cache_key():
+    key = get_grobid_cache_key('md5:123', 'api/processHeaderDocument', {'consolidateHeader': '1'})
+
+    assert key.startswith('processHeaderDocument-')
+    assert key != get_grobid_cache_key('md5:123', 'api/processFulltextDocument', {'consolidateHeader': '1'})
+    assert key != get_grobid_cache_key('md5:123', 'api/processHeaderDocument', {})
+    assert key != get_grobid_cache_key('md5:456', 'api/processHeaderDocument', {'consolidateHeader': '1'})
+
+
+def test_get_grobid_cache_key_without_checksum():
+    assert get_grobid_cache_key(None, 'api/processHeaderDocument', {}) is None
+
+
+def test_write_and_read_grobid_response(app, tmpdir):
+    obj = MagicMock()
+    obj.files.keys = []
+
+    with patch.dict(current_app.config, {'WORKFLOWS_GROBID_CACHE_DIR': str(tmpdir)}):
+        assert read_grobid_response(obj, 'key') is None
+        write_grobid_response(obj, 'key', u'<TEI>caf\xe9</TEI>')
+        assert read_grobid_response(obj, 'key') == u'<TEI>caf\xe9</TEI>'
+
+    assert obj.files.__setitem__.call_count == 1
+    assert obj.files.__setitem__.call_args[0][0] == 'key.grobid.xml'
+
+
+def test_read_grobid_response_without_key(app):
+    obj = MagicMock()
+
+    assert read_grobid_response(obj, None) is None
+
+
+def test_evict_local_grobid_responses_drops_least_recently_used(tmpdir):
+    for index, name in enumerate(['old', 'recent', 'newest']):
+        path = tmpdir.join(name + '.xml')
+        path.write('x' * 10)
+        os.utime(str(path), (index, index))
+
+    _evict_local_grobid_responses(str(tmpdir), 20)
+
+    assert sorted(path.basename for path in tmpdir.listdir()) == ['newest.xml', 'recent.xml']
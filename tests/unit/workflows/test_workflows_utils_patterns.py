@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, division, print_function
+
+import threading
+import time
+from multiprocessing import TimeoutError
+
+import pytest
+from flask import current_app
+from mock import patch
+
+from inspirehep.modules.workflows.utils.patterns import FINALLY, PARALLEL, WHEN
+
+from mocks import MockEng, MockObj
+
+
+def set_categories(obj, eng):
+    obj.extra_data['categories_prediction'] = ['Theory-HEP']
+
+
+def set_keywords(obj, eng):
+    obj.extra_data['keywords_prediction'] = ['QCD']
+
+
+def normalize_title(obj, eng):
+    obj.data['titles'] = [{'title': 'Normalized'}]
+
+
+def drop_collaborations(obj, eng):
+    del obj.data['collaborations']
+
+
+def test_parallel_merges_the_changes_of_all_tasks(app):
+    obj = MockObj({'titles': [{'title': 'Original'}], 'collaborations': [{'value': 'CMS'}]}, {})
+    eng = MockEng()
+
+    PARALLEL([set_categories, set_keywords, normalize_title, drop_collaborations])(obj, eng)
+
+    assert obj.data == {'titles': [{'title': 'Normalized'}]}
+    assert obj.extra_data == {
+        'categories_prediction': ['Theory-HEP'],
+        'keywords_prediction': ['QCD'],
+    }
+
+
+def test_parallel_runs_the_tasks_concurrently(app):
+    barrier = {'count': 0}
+    condition = threading.Condition()
+
+    def wait_for_the_others(obj, eng):
+        with condition:
+            barrier['count'] += 1
+            condition.notify_all()
+            while barrier['count'] < 3:
+                condition.wait(1)
+        obj.extra_data['seen'] = barrier['count']
+
+    obj = MockObj({}, {})
+    eng = MockEng()
+
+    PARALLEL([wait_for_the_others] * 3)(obj, eng)
+
+    assert obj.extra_data == {'seen': 3}
+
+
+def test_parallel_isolates_the_tasks(app):
+    def read_categories(obj, eng):
+        time.sleep(0.1)
+        obj.extra_data['seen_categories'] = 'categories_prediction' in obj.extra_data
+
+    obj = MockObj({}, {})
+    eng = MockEng()
+
+    PARALLEL([set_categories, read_categories])(obj, eng)
+
+    assert obj.extra_data == {
+        'categories_prediction': ['Theory-HEP'],
+        'seen_categories': False,
+    }
+
+
+def test_parallel_last_task_wins_on_conflicts(app):
+    def first(obj, eng):
+        obj.extra_data['prediction'] = 'first'
+
+    def second(obj, eng):
+        time.sleep(0.1)
+        obj.extra_data['prediction'] = 'second'
+
+    obj = MockObj({}, {})
+    eng = MockEng()
+
+    PARALLEL([second, first])(obj, eng)
+
+    assert obj.extra_data == {'prediction': 'first'}
+
+
+def test_parallel_keeps_the_tasks_before_the_failing_one(app):
+    def fail(obj, eng):
+        obj.extra_data['failed'] = True
+        raise ValueError('boom')
+
+    obj = MockObj({}, {})
+    eng = MockEng()
+
+    with pytest.raises(ValueError):
+        PARALLEL([set_categories, fail, set_keywords])(obj, eng)
+
+    assert obj.extra_data == {'categories_prediction': ['Theory-HEP']}
+
+
+def test_parallel_fails_on_the_tasks_timing_out(app):
+    def hang(obj, eng):
+        time.sleep(2)
+        obj.extra_data['hung'] = True
+
+    obj = MockObj({}, {})
+    eng = MockEng()
+
+    with patch.dict(current_app.config, {'WORKFLOWS_PARALLEL_TASK_TIMEOUT': 0.2}):
+        with pytest.raises(TimeoutError):
+            PARALLEL([set_keywords, hang, set_categories])(obj, eng)
+
+    assert obj.extra_data == {'keywords_prediction': ['QCD']}
+
+
+def test_when_runs_the_task_only_if_the_condition_holds(app):
+    obj = MockObj({}, {})
+    eng = MockEng()
+
+    PARALLEL([
+        WHEN(lambda obj, eng: False, set_categories),
+        WHEN(lambda obj, eng: True, set_keywords),
+    ])(obj, eng)
+
+    assert obj.extra_data == {'keywords_prediction': ['QCD']}
+
+
+def test_finally_runs_the_cleanup_when_a_task_fails(app):
+    def fail(obj, eng):
+        raise ValueError('boom')
+
+    def cleanup(obj, eng):
+        obj.extra_data['cleaned_up'] = True
+
+    obj = MockObj({}, {})
+    eng = MockEng()
+
+    with pytest.raises(ValueError):
+        FINALLY([set_categories, fail, set_keywords], cleanup)(obj, eng)
+
+    assert obj.extra_data == {
+        'categories_prediction': ['Theory-HEP'],
+        'cleaned_up': True,
+    }